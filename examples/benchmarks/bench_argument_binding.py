@@ -0,0 +1,119 @@
+"""参数绑定吞吐基准
+
+一条带 30 个选项、2 个选项组、10 个命名参数的命令, 消息同时使用多个选项和命名参数.
+分词结果已缓存在事件上, 只统计绑定本身:
+- 旧实现: 每次调用 inspect.signature 计算必需参数, 逐个遍历选项/参数规格查找
+- 预编译绑定表: 字典查找和逐位置转换函数
+"""
+
+import inspect
+import time
+
+from ncatbot.core.event import BaseMessageEvent
+from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.registry import (
+    option,
+    option_group,
+    param,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.registry.registry import (
+    CommandGroup,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.trigger.binder import (
+    ArgumentBinder,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.trigger.context import (
+    get_parse_context,
+)
+from ncatbot.utils.testing import EventFactory
+
+OPTIONS = 30
+PARAMS = 10
+ROUNDS = 20000
+
+
+def build_spec():
+    names = [f"opt{i}" for i in range(OPTIONS)]
+    params = [f"par{i}" for i in range(PARAMS)]
+    signature = ", ".join(
+        ["self", "event: BaseMessageEvent", "app: str", "replicas: int"]
+        + [f"{n}: bool = False" for n in names]
+        + ['fmt: str = "xml"', 'level: str = "low"']
+        + [f"{p}: int = 0" for p in params]
+    )
+    namespace = {"BaseMessageEvent": BaseMessageEvent}
+    exec(f"async def big({signature}):\n    pass", namespace)
+    func = namespace["big"]
+
+    root = CommandGroup("root", prefixes=["/"])
+    decorated = func
+    for i, name in enumerate(names):
+        decorated = option(f"o{i}", name)(decorated)
+    decorated = option_group(["xml", "yaml", "json"], "fmt", "xml")(decorated)
+    decorated = option_group(["low", "mid", "high"], "level", "low")(decorated)
+    for p in params:
+        decorated = param(p, default=0)(decorated)
+    root.command("big")(decorated)
+    return root.commands["big"]
+
+
+def legacy_bind(spec, parsed):
+    """旧实现的查找部分: 每次计算签名, 线性查找选项和参数"""
+    elements = list(parsed.elements)[1:]
+    sig = inspect.signature(spec.func)
+    required = [
+        name
+        for name, p in sig.parameters.items()
+        if p.default is inspect.Parameter.empty
+        and p.kind
+        in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    ]
+    assert len(elements) >= len(required) - 2
+    kwargs = {}
+    for k, v in parsed.named_params.items():
+        kwargs.update(spec.get_param_binding(k, v))
+    for o in parsed.options:
+        kwargs.update(spec.get_kw_binding(o))
+    args = []
+    for idx, element in enumerate(elements):
+        t = spec.args_types[idx]
+        if t is bool:
+            args.append(element.content.lower() not in ["false", "0"])
+        elif t in (str, float, int):
+            args.append(t(element.content))
+        else:
+            args.append(element.content)
+    return tuple(args), kwargs
+
+
+def main():
+    spec = build_spec()
+    text = (
+        "/big web 3 "
+        + " ".join(f"--opt{i}" for i in range(0, OPTIONS, 3))
+        + " --yaml --high "
+        + " ".join(f"--par{i}={i}" for i in range(PARAMS))
+    )
+    event = EventFactory.create_group_message(text)
+    parsed = get_parse_context(event).parsed
+    binder = ArgumentBinder()
+    result = binder.bind(spec, event, ("big",), ["/"])
+    assert (result.args, result.named_args) == legacy_bind(spec, parsed)
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        legacy_bind(spec, parsed)
+    legacy = (time.perf_counter() - start) / ROUNDS * 1e6
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        binder.bind(spec, event, ("big",), ["/"])
+    compiled = (time.perf_counter() - start) / ROUNDS * 1e6
+
+    print(
+        f"{len(parsed.options)} 个选项, {len(parsed.named_params)} 个命名参数: "
+        f"旧实现 {legacy:.1f} us/次, 预编译 {compiled:.1f} us/次"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+重复发送 2 MB 本地图片的 base64 编码基准
+
+NapCat 不在本机时, 本地图片需要编码为 base64 上传. 对比每次重新读取编码与使用
+base64_cache 缓存两种情况下单条消息序列化的耗时.
+"""
+
+import base64
+import os
+import tempfile
+import time
+
+from ncatbot.core.event.message_segment import MessageArray, Image
+from ncatbot.core.event.message_segment.media_cache import base64_cache
+from ncatbot.utils import ncatbot_config
+
+SENDS = 200
+SIZE = 2 * 1024 * 1024
+
+
+def encode_uncached(path: str) -> str:
+    with open(path, "rb") as f:
+        return "base64://" + base64.b64encode(f.read()).decode("utf-8")
+
+
+def main():
+    # 模拟远程 NapCat, 强制走 base64 上传
+    ncatbot_config.napcat.ws_host = "192.0.2.1"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sticker.png")
+        with open(path, "wb") as f:
+            f.write(os.urandom(SIZE))
+
+        start = time.perf_counter()
+        for _ in range(SENDS):
+            encode_uncached(path)
+        uncached = time.perf_counter() - start
+
+        base64_cache.clear()
+        start = time.perf_counter()
+        for _ in range(SENDS):
+            # 每次构造新的消息, 排除 MessageArray.to_list 自身缓存的影响
+            MessageArray(Image(file=path)).to_list()
+        cached = time.perf_counter() - start
+
+    print(f"重复发送 {SENDS} 次 {SIZE // 1024} KB 图片")
+    print(f"无缓存: {uncached * 1000:.1f} ms ({uncached / SENDS * 1000:.3f} ms/次)")
+    print(f"有缓存: {cached * 1000:.1f} ms ({cached / SENDS * 1000:.3f} ms/次)")
+    print(f"加速比: {uncached / cached:.1f}x")
+    print(f"缓存统计: {base64_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""命令分发基准
+
+注册 1000 条命令(含命令组和别名), 统计:
+- 普通聊天消息被排除的耗时: 旧实现逐条检查首词 vs 前缀树首词查找
+- 命令消息从首词检查、分词到解析出命令的耗时
+"""
+
+import random
+import time
+
+from ncatbot.core.event import BaseMessageEvent
+from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.lexer import (
+    StringTokenizer,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.registry.registry import (
+    CommandGroup,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.trigger.resolver import (
+    CommandResolver,
+)
+
+COMMANDS = 1000
+GROUPS = 20
+MESSAGES = 20000
+
+
+def _handler():
+    async def handler(self, event: BaseMessageEvent, target: str = ""):
+        pass
+
+    return handler
+
+
+def build_resolver() -> CommandResolver:
+    root = CommandGroup("root", prefixes=["/", "!"])
+    groups = [root.group(f"grp{g}") for g in range(GROUPS)]
+    for i in range(COMMANDS):
+        if i % 2:
+            groups[i % GROUPS].command(f"sub{i}")(_handler())
+        else:
+            root.command(f"cmd{i}", aliases=[f"c{i}"])(_handler())
+    resolver = CommandResolver(
+        case_sensitive=False, prefixes=["/", "!"], allow_hierarchical=False
+    )
+    resolver.build_index(root.get_all_commands(), root.get_all_aliases())
+    return resolver
+
+
+def linear_hit(resolver: CommandResolver, text: str) -> bool:
+    """旧实现: 对每条命令检查首词是否以命令首词结尾"""
+    first = text.split(" ")[0]
+    return any(first.endswith(c.path_words[0]) for c in resolver.get_commands())
+
+
+def timeit(func, texts) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        func(text)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def main():
+    resolver = build_resolver()
+    print(f"已注册 {len(resolver.get_commands())} 条命令路径(含别名)")
+
+    chats = [
+        f"{random.choice(['今天', '有人', 'hello', '哈哈'])}{i} 随便聊聊"
+        for i in range(MESSAGES)
+    ]
+    linear = timeit(lambda t: linear_hit(resolver, t), chats[:2000])
+    trie = timeit(resolver.match_first_word, chats)
+    print(f"排除普通消息: 逐条检查 {linear:.2f} us/条, 前缀树 {trie:.3f} us/条")
+
+    commands = [
+        random.choice(
+            [f"/cmd{i} 参数 -v", f"!c{i} 参数", f"/grp{(i + 1) % GROUPS} sub{i + 1} x"]
+        )
+        for i in range(0, COMMANDS, 2)
+    ]
+
+    def dispatch(text):
+        if resolver.match_first_word(text):
+            tokens = StringTokenizer(text).tokenize()
+            return resolver.resolve_from_tokens(tokens)
+
+    assert all(dispatch(t)[1] is not None for t in commands)
+    print(f"命令消息分词并解析: {timeit(dispatch, commands * 10):.2f} us/条")
+
+
+if __name__ == "__main__":
+    main()
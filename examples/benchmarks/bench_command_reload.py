@@ -0,0 +1,127 @@
+"""命令热重载基准
+
+20 个插件共注册 2000 条命令(含命令组和别名), 卸载并重新加载其中一个插件, 统计:
+- 旧实现: 全量重建索引, 两两比较路径做前缀冲突检测
+- 全量重建: 逐条插入路径树做冲突检测
+- 增量更新: 对比全部命令, 只删除和插入有变化的路径
+- 按插件增量: 只对比被重载插件的命令
+"""
+
+import time
+from typing import Dict, Tuple
+
+from ncatbot.core.event import BaseMessageEvent
+from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.registry.registry import (
+    CommandGroup,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.utils import (
+    CommandSpec,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.trigger.resolver import (
+    CommandResolver,
+)
+
+PLUGINS = 20
+COMMANDS = 2000
+ROUNDS = 20
+
+
+def _handler():
+    async def handler(self, event: BaseMessageEvent, target: str = ""):
+        pass
+
+    return handler
+
+
+def build_plugin(index: int) -> CommandGroup:
+    """一个插件的命令: 一半是顶层命令(带别名), 一半在插件自己的命令组下"""
+    root = CommandGroup(f"plugin{index}", prefixes=["/", "!"])
+    group = root.group(f"p{index}")
+    for i in range(index, COMMANDS, PLUGINS):
+        if i % 2:
+            group.command(f"sub{i}")(_handler())
+        else:
+            root.command(f"cmd{i}", aliases=[f"c{i}"])(_handler())
+    # 基准中的函数不在插件目录下, 手动指定所属插件
+    for spec in root.get_all_commands().values():
+        spec.plugin_name = f"plugin{index}"
+    return root
+
+
+def plugin_entries(root: CommandGroup):
+    return [*root.get_all_commands().items(), *root.get_all_aliases().items()]
+
+
+def collect(plugins) -> Tuple[Dict, Dict]:
+    commands: Dict[Tuple[str, ...], CommandSpec] = {}
+    aliases: Dict[Tuple[str, ...], CommandSpec] = {}
+    for root in plugins:
+        commands.update(root.get_all_commands())
+        aliases.update(root.get_all_aliases())
+    return commands, aliases
+
+
+def legacy_check(resolver: CommandResolver, commands, aliases) -> None:
+    """旧实现: 任意两条路径两两比较"""
+    paths = [resolver._path_to_norm(p) for p in [*commands, *aliases]]
+    for i in range(len(paths)):
+        for j in range(i + 1, len(paths)):
+            a, b = paths[i], paths[j]
+            min_len = min(len(a), len(b))
+            if a[:min_len] == b[:min_len] and a != b:
+                raise ValueError(f"命令前缀冲突: {' '.join(a)} vs {' '.join(b)}")
+
+
+def _resolver() -> CommandResolver:
+    return CommandResolver(
+        case_sensitive=False, prefixes=["/", "!"], allow_hierarchical=False
+    )
+
+
+def timeit(func, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1e3
+
+
+def main():
+    plugins = [build_plugin(i) for i in range(PLUGINS)]
+    commands, aliases = collect(plugins)
+    resolver = _resolver()
+    resolver.build_index(commands, aliases)
+    print(f"已注册 {len(resolver.get_commands())} 条命令路径(含别名)")
+
+    # 重载第一个插件: 卸载后得到新的 CommandSpec 对象
+    without = collect(plugins[1:])
+    reloaded_root = build_plugin(0)
+    reloaded = collect([reloaded_root] + plugins[1:])
+
+    def legacy():
+        for state in (without, reloaded):
+            legacy_check(resolver, *state)
+            _resolver().build_index(*state)
+
+    def rebuild():
+        for state in (without, reloaded):
+            _resolver().build_index(*state)
+
+    def incremental():
+        for state in (without, reloaded):
+            resolver.sync(*state)
+
+    def per_plugin():
+        resolver.sync_plugin("plugin0", [])
+        resolver.sync_plugin("plugin0", plugin_entries(reloaded_root))
+
+    print(f"旧实现(两两比较): {timeit(legacy, 1):.1f} ms/次")
+    print(f"全量重建: {timeit(rebuild, ROUNDS):.2f} ms/次")
+    print(f"增量更新: {timeit(incremental, ROUNDS):.3f} ms/次")
+    print(f"按插件增量: {timeit(per_plugin, ROUNDS):.3f} ms/次")
+    assert {e.path_words for e in resolver.get_commands()} == {
+        resolver._path_to_norm(p) for p in [*reloaded[0], *reloaded[1]]
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+CQ 码解析基准
+
+对比旧版 parse_cq_code_to_onebot11(每次调用编译正则, 四次 str.replace 反转义)
+与模块级预编译的新实现, 输入为大段混合文本和 CQ 码.
+"""
+
+import random
+import re
+import time
+
+from ncatbot.core.event.message_segment.cq_code import (
+    parse_cq_code_to_onebot11,
+    encode_onebot11_to_cq,
+)
+
+ROUNDS = 200
+
+
+def legacy_parse(cq_string: str):
+    cq_pattern = re.compile(r"\[CQ:([^,\]]+)(?:,([^\]]+))?\]")
+    message_segments = []
+    last_pos = 0
+    html_unescape_map = {"&amp;": "&", "&#91;": "[", "&#93;": "]", "&#44;": ","}
+
+    def unescape_cq(text: str) -> str:
+        for escaped, unescaped in html_unescape_map.items():
+            text = text.replace(escaped, unescaped)
+        return text
+
+    for match in cq_pattern.finditer(cq_string):
+        text_before = cq_string[last_pos : match.start()]
+        if text_before:
+            message_segments.append(
+                {"type": "text", "data": {"text": unescape_cq(text_before)}}
+            )
+        cq_type = match.group(1)
+        cq_params_str = match.group(2) or ""
+        params = {}
+        for param in cq_params_str.split(","):
+            if "=" in param:
+                key, value = param.split("=", 1)
+                params[key] = unescape_cq(value)
+        message_segments.append({"type": cq_type, "data": params})
+        last_pos = match.end()
+    text_after = cq_string[last_pos:]
+    if text_after:
+        message_segments.append(
+            {"type": "text", "data": {"text": unescape_cq(text_after)}}
+        )
+    return message_segments
+
+
+def build_input(rng: random.Random, segments: int) -> str:
+    message = []
+    for i in range(segments):
+        if i % 2 == 0:
+            text = "".join(
+                rng.choice("abcdef 你好[]&,") for _ in range(rng.randint(5, 60))
+            )
+            message.append({"type": "text", "data": {"text": text}})
+        else:
+            message.append(
+                rng.choice(
+                    [
+                        {"type": "at", "data": {"qq": str(rng.randint(10000, 99999))}},
+                        {"type": "face", "data": {"id": str(rng.randint(1, 300))}},
+                        {
+                            "type": "image",
+                            "data": {"file": "abc.jpg", "url": "http://x/?a=1&b=2"},
+                        },
+                    ]
+                )
+            )
+    return encode_onebot11_to_cq(message)
+
+
+def bench(func, data: str) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(data)
+    return time.perf_counter() - start
+
+
+def main():
+    rng = random.Random(0)
+    for segments in (10, 200, 2000):
+        data = build_input(rng, segments)
+        assert legacy_parse(data) == parse_cq_code_to_onebot11(data)
+        old = bench(legacy_parse, data)
+        new = bench(parse_cq_code_to_onebot11, data)
+        print(
+            f"{segments:5d} 段 ({len(data) // 1024} KB): "
+            f"旧 {old / ROUNDS * 1e6:9.1f} us/次, 新 {new / ROUNDS * 1e6:9.1f} us/次, "
+            f"加速 {old / new:.2f}x"
+        )
+
+    short = "[CQ:at,qq=123] hello"
+    old = bench(legacy_parse, short) / ROUNDS
+    new = bench(parse_cq_code_to_onebot11, short) / ROUNDS
+    print(f"短消息: 旧 {old * 1e6:.2f} us/次, 新 {new * 1e6:.2f} us/次")
+
+
+if __name__ == "__main__":
+    main()
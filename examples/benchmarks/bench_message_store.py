@@ -0,0 +1,64 @@
+"""消息存储写入吞吐基准
+
+向 MessageStore 连续写入 100000 条群消息, 统计:
+- 事件循环一侧 append 的耗时(只是入队)
+- 后台批量写入日志和 sqlite 索引的持续吞吐
+- 写入后按 message_id 查询和按群/发送者查询最近消息的延迟
+"""
+
+import random
+import tempfile
+import time
+
+from ncatbot.core.api import MessageStore
+from ncatbot.core.api.tests.test_message_store import NOW, make_message
+
+MESSAGES = 100000
+GROUPS = 50
+USERS = 2000
+LOOKUPS = 2000
+
+
+def main():
+    raws = [
+        make_message(
+            i,
+            group_id=100 + i % GROUPS,
+            user_id=10000 + i % USERS,
+            t=NOW + i // 100,
+            text=f"消息 {i} " + "内容" * 20,
+        )
+        for i in range(MESSAGES)
+    ]
+    with tempfile.TemporaryDirectory() as path:
+        store = MessageStore(path)
+
+        start = time.perf_counter()
+        for raw in raws:
+            store.append(raw)
+        enqueue = time.perf_counter() - start
+        store.flush()
+        total = time.perf_counter() - start
+        print(
+            f"{MESSAGES} 条消息: append {enqueue / MESSAGES * 1e6:.2f} us/条, "
+            f"写入完成 {total:.2f} s, 吞吐 {MESSAGES / total:.0f} 条/s"
+        )
+
+        ids = random.sample(range(MESSAGES), LOOKUPS)
+        start = time.perf_counter()
+        for message_id in ids:
+            assert store.get_sync(message_id) is not None
+        lookup = (time.perf_counter() - start) / LOOKUPS
+        print(f"按 message_id 查询: {lookup * 1e6:.1f} us/次")
+
+        start = time.perf_counter()
+        for message_id in ids:
+            raw = raws[message_id]
+            store.recent_sync(raw["group_id"], raw["user_id"], limit=20)
+        recent = (time.perf_counter() - start) / LOOKUPS
+        print(f"查询某人在某群的最近 20 条消息: {recent * 1e6:.1f} us/次")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
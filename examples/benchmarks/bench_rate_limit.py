@@ -0,0 +1,87 @@
+"""限流基准
+
+10 万个不同用户各发送若干条消息(每人每分钟限 5 次), 统计:
+- 滑动窗口日志: 每个用户保存窗口内所有时间戳的 deque
+- GCRA: 每个用户只保存一个理论到达时间, 过期的键随访问清除
+对比每次检查的耗时和常驻内存.
+"""
+
+import random
+import time
+import tracemalloc
+from collections import deque
+
+from ncatbot.plugin_system.builtin_plugin.unified_registry.filter_system import (
+    GCRALimiter,
+)
+
+USERS = 100_000
+REQUESTS = 500_000
+RATE = 5
+PER = 60.0
+
+
+class SlidingLog:
+    """对照实现: 记录窗口内每次请求的时间戳"""
+
+    def __init__(self, rate: int, per: float, clock):
+        self.rate = rate
+        self.per = per
+        self.clock = clock
+        self._logs = {}
+
+    def acquire(self, key):
+        now = self.clock()
+        log = self._logs.setdefault(key, deque())
+        while log and log[0] <= now - self.per:
+            log.popleft()
+        if len(log) >= self.rate:
+            return False, log[0] + self.per - now
+        log.append(now)
+        return True, 0.0
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def run(limiter, clock, keys) -> float:
+    start = time.perf_counter()
+    for i, key in enumerate(keys):
+        # 50 万条消息均匀分布在 2 分钟内
+        clock.now = i * 120.0 / len(keys)
+        limiter.acquire(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def measure(name, factory, keys):
+    clock = Clock()
+    cost = run(factory(clock), clock, keys)
+    # 内存单独测量, tracemalloc 会拖慢检查
+    clock = Clock()
+    tracemalloc.start()
+    limiter = factory(clock)
+    run(limiter, clock, keys)
+    memory = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    tracemalloc.stop()
+    print(f"{name}: {cost:.2f} us/次, 常驻内存 {memory:.1f} MB")
+
+
+def main():
+    random.seed(0)
+    keys = [str(random.randrange(USERS)) for _ in range(REQUESTS)]
+    measure("滑动窗口日志", lambda c: SlidingLog(RATE, PER, c), keys)
+    measure("GCRA", lambda c: GCRALimiter(RATE, PER, clock=c), keys)
+    measure(
+        "GCRA(max_keys=20000)",
+        lambda c: GCRALimiter(RATE, PER, max_keys=20_000, clock=c),
+        keys,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+群成员名册筛选基准
+
+合成 3000 人的群, 对比:
+- 旧方式: 每次 get_group_member_list 构造 GroupMemberList, 再用 filter_* 链式筛选
+- GroupRoster: 名册加载一次, 按列扫描筛选
+
+典型查询为"超过 30 天未发言的普通成员, 排除白名单".
+"""
+
+import time
+
+from ncatbot.core.api import GroupRoster
+from ncatbot.core.api.api_group import GroupMemberList
+from ncatbot.core.api.tests.test_roster import NOW, make_members
+
+ROUNDS = 200
+MEMBERS = 3000
+INACTIVE = 86400 * 30
+
+
+def legacy_query(raw, whitelist: GroupMemberList):
+    members = GroupMemberList(raw)
+    members = members.filter_by_role("member")
+    members = GroupMemberList._from_members(
+        [m for m in members.members if m.last_sent_time <= NOW - INACTIVE]
+    )
+    return [m.user_id for m in members.filter_by_another_list_not_in(whitelist).members]
+
+
+def roster_query(roster: GroupRoster, whitelist):
+    return roster.filter(
+        role="member", inactive_for=INACTIVE, exclude=whitelist, now=NOW
+    )
+
+
+def bench(func, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(*args)
+    return (time.perf_counter() - start) / ROUNDS
+
+
+def main():
+    raw = make_members(MEMBERS)
+    whitelist_raw = raw[::10]
+    whitelist = GroupMemberList(whitelist_raw)
+    whitelist_ids = [m["user_id"] for m in whitelist_raw]
+
+    start = time.perf_counter()
+    roster = GroupRoster("100", raw)
+    build = time.perf_counter() - start
+
+    assert sorted(legacy_query(raw, whitelist)) == sorted(
+        roster_query(roster, whitelist_ids)
+    )
+    old = bench(legacy_query, raw, whitelist)
+    new = bench(roster_query, roster, whitelist_ids)
+    print(f"{MEMBERS} 人, 名册构建 {build * 1e3:.2f} ms (仅一次)")
+    print(
+        f"不活跃成员查询: 旧 {old * 1e3:.3f} ms/次, 名册 {new * 1e3:.3f} ms/次, 加速 {old / new:.1f}x"
+    )
+
+    start = time.perf_counter()
+    for i in range(ROUNDS):
+        roster.remove(10000 + i)
+        roster.upsert(raw[i])
+    update = (time.perf_counter() - start) / ROUNDS
+    print(f"增量更新(退群 + 入群): {update * 1e6:.1f} us/次")
+
+    old = bench(lambda: GroupMemberList(raw).filter_by_role("admin"))
+    new = bench(roster.filter, "admin")
+    print(
+        f"按身份查询: 旧 {old * 1e3:.3f} ms/次, 名册 {new * 1e3:.3f} ms/次, 加速 {old / new:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+同步接口调用开销基准
+
+在线程池中(同步事件处理器所在的位置)反复调用 `send_group_text_sync`, 对比:
+- 旧实现 run_coroutine: 每次调用新建线程和事件循环
+- loop_bridge: 提交到已在运行的主事件循环
+
+API 回调直接返回固定结果, 不产生网络开销, 结果即为同步桥接本身的延迟.
+"""
+
+import asyncio
+import statistics
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from ncatbot.core.api import BotAPI
+from ncatbot.utils import run_coroutine
+from ncatbot.utils.thread_pool import LoopBridge
+
+CALLS = 500
+WORKERS = 8
+
+
+async def fake_callback(path: str, params: dict = None) -> dict:
+    return {"retcode": 0, "data": {"message_id": "1"}}
+
+
+def measure(call) -> list:
+    latencies = []
+
+    def one(_):
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(WORKERS) as pool:
+        list(pool.map(one, range(CALLS)))
+    return latencies
+
+
+def report(name: str, latencies: list, elapsed: float):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{name:14s} 平均 {statistics.mean(latencies) * 1e3:7.3f} ms, "
+        f"p99 {p99 * 1e3:7.3f} ms, 吞吐 {CALLS / elapsed:8.0f} 次/秒"
+    )
+
+
+def main():
+    api = BotAPI(fake_callback)
+
+    # 模拟 BotClient 的主事件循环
+    main_loop = asyncio.new_event_loop()
+    threading.Thread(target=main_loop.run_forever, daemon=True).start()
+    bridge = LoopBridge()
+    bridge.set_main_loop(main_loop)
+
+    warnings.simplefilter("ignore", DeprecationWarning)
+    start = time.perf_counter()
+    old = measure(lambda: run_coroutine(api.send_group_text, 123, "hi"))
+    report("run_coroutine", old, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    new = measure(lambda: bridge.run(api.send_group_text, 123, "hi"))
+    report("loop_bridge", new, time.perf_counter() - start)
+
+    print(f"平均延迟降低 {statistics.mean(old) / statistics.mean(new):.1f}x")
+    main_loop.call_soon_threadsafe(main_loop.stop)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""分词器基准
+
+对比逐字符拼接的旧版 StringTokenizer 与基于正则切片的新实现,
+输入是以命令词开头的约 10 KB 长消息(粘贴的代码、日志、中文长文本).
+"""
+
+import random
+import time
+from typing import List, Optional
+
+from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.lexer.tokenizer import (
+    InvalidEscapeSequenceError,
+    StringTokenizer,
+    Token,
+    TokenType,
+)
+
+SIZE = 10 * 1024
+ROUNDS = 50
+
+
+class LegacyTokenizer(StringTokenizer):
+    """旧实现: 逐字符判断并用 += 拼接"""
+
+    def tokenize(self) -> List[Token]:
+        self.tokens = []
+        self.position = 0
+
+        while self.position < self.length:
+            self._skip_whitespace()
+            if self.position >= self.length:
+                break
+
+            char = self.text[self.position]
+
+            # 检查引号字符串
+            if char == '"':
+                self._parse_quoted_string()
+            # 检查长选项 --
+            elif char == "-" and self._peek() == "-":
+                self._parse_long_option()
+            # 检查短选项 -
+            elif char == "-" and self._peek() and self._peek() != "-":
+                self._parse_short_option()
+            # 检查分隔符 =
+            elif char == "=":
+                self._add_token(TokenType.SEPARATOR, char)
+                self.position += 1
+            # 普通单词
+            else:
+                self._parse_word()
+
+        # 添加 EOF 标记
+        self._add_token(TokenType.EOF, "")
+        return self.tokens
+
+    def _peek(self, offset: int = 1) -> Optional[str]:
+        peek_pos = self.position + offset
+        if peek_pos < self.length:
+            return self.text[peek_pos]
+        return None
+
+    def _skip_whitespace(self):
+        while self.position < self.length and self.text[self.position].isspace():
+            self.position += 1
+
+    def _add_token(self, token_type: TokenType, value: str):
+        token = Token(token_type, value, self.position - len(value))
+        self.tokens.append(token)
+
+    def _parse_quoted_string(self):
+        start_pos = self.position
+        self.position += 1  # 跳过开始引号
+
+        value = ""
+        while self.position < self.length:
+            char = self.text[self.position]
+
+            if char == '"':
+                # 结束引号
+                self.position += 1
+                self._add_token(TokenType.QUOTED_STRING, value)
+                return
+            elif char == "\\":
+                # 转义序列
+                self.position += 1
+                if self.position >= self.length:
+                    raise InvalidEscapeSequenceError(self.position - 1, "EOF")
+
+                escape_char = self.text[self.position]
+                if escape_char in self.ESCAPE_SEQUENCES:
+                    value += self.ESCAPE_SEQUENCES[escape_char]
+                else:
+                    raise InvalidEscapeSequenceError(self.position - 1, escape_char)
+                self.position += 1
+            else:
+                value += char
+                self.position += 1
+
+        # 到达字符串末尾但没有找到结束引号
+        self._add_token(TokenType.WORD, self.text[start_pos : self.position])
+        return
+
+    def _parse_long_option(self):
+        start_pos = self.position
+        self.position += 2  # 跳过 --
+
+        # 读取选项名
+        option_name = ""
+        while (
+            self.position < self.length
+            and not self.text[self.position].isspace()
+            and self.text[self.position] != "="
+        ):
+            option_name += self.text[self.position]
+            self.position += 1
+
+        if not option_name:
+            while (
+                self.position < self.length and not self.text[self.position].isspace()
+            ):
+                self.position += 1
+            self._add_token(TokenType.WORD, self.text[start_pos : self.position])
+            return
+
+        # 检查是否有参数赋值
+        if self.position < self.length and self.text[self.position] == "=":
+            # 有赋值，解析为 LONG_OPTION=value
+            self._add_token(TokenType.LONG_OPTION, option_name)
+            # 分隔符会在下一次循环中处理
+        else:
+            # 无赋值，纯选项
+            self._add_token(TokenType.LONG_OPTION, option_name)
+
+    def _parse_short_option(self):
+        start_pos = self.position
+        self.position += 1  # 跳过 -
+
+        # 读取选项字符
+        options = ""
+        while self.position < self.length and self.text[self.position].isalpha():
+            options += self.text[self.position]
+            self.position += 1
+
+        if not options:
+            while (
+                self.position < self.length and not self.text[self.position].isspace()
+            ):
+                self.position += 1
+            self._add_token(TokenType.WORD, self.text[start_pos : self.position])
+            return
+
+        # 检查是否有参数赋值（只对单个选项）
+        if (
+            len(options) == 1
+            and self.position < self.length
+            and self.text[self.position] == "="
+        ):
+            # 单个选项有赋值
+            self._add_token(TokenType.SHORT_OPTION, options)
+            # 分隔符会在下一次循环中处理
+        else:
+            # 多个选项组合或无赋值
+            self._add_token(TokenType.SHORT_OPTION, options)
+
+    def _parse_word(self):
+        value = ""
+        while (
+            self.position < self.length
+            and not self.text[self.position].isspace()
+            and self.text[self.position] not in '="'
+        ):
+            value += self.text[self.position]
+            self.position += 1
+
+        if value:
+            self._add_token(TokenType.WORD, value)
+
+
+def make_inputs():
+    random.seed(0)
+    code = ["def f(x):", '    return "a\\tb" + str(x)', "print(f(1)) # -v --flag=1"]
+    logs = [
+        f"2024-01-01 12:00:{i % 60:02d} INFO worker-{i % 8} key=value{i} took {i}ms"
+        for i in range(50)
+    ]
+    words = ["今天", "天气", "不错", "我们", "一起", "出去", "玩吧", "，", "。"]
+    inputs = {}
+    for name, pieces in (("代码", code), ("日志", logs), ("中文", words)):
+        parts = ["/run"]
+        while sum(len(p) + 1 for p in parts) < SIZE:
+            parts.append(random.choice(pieces))
+        inputs[name] = " ".join(parts)
+    return inputs
+
+
+def tokens_of(cls, text):
+    return [(t.type, t.value, t.position) for t in cls(text).tokenize()]
+
+
+def main():
+    for name, text in make_inputs().items():
+        assert tokens_of(LegacyTokenizer, text) == tokens_of(StringTokenizer, text)
+        timings = []
+        for cls in (LegacyTokenizer, StringTokenizer):
+            start = time.perf_counter()
+            for _ in range(ROUNDS):
+                cls(text).tokenize()
+            timings.append((time.perf_counter() - start) / ROUNDS * 1e3)
+        print(
+            f"{name} {len(text)} 字符: 旧实现 {timings[0]:.2f} ms, "
+            f"新实现 {timings[1]:.2f} ms, 提升 {timings[0] / timings[1]:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""功能触发基准
+
+注册 500 个旧式功能(300 个前缀触发、200 个正则触发), 统计:
+- 找出所有命中功能: 逐个 startswith / re.match 与前缀树 + 分块合并正则一次匹配对比
+- 每条消息经过所有功能处理器的耗时: 原先每个处理器先做权限检查再过滤,
+  现在不命中的处理器查表后直接返回
+- 增删一个功能后重新匹配的耗时
+"""
+
+import random
+import time
+
+from ncatbot.plugin_system.builtin_mixin.func_mixin import create_filter
+from ncatbot.plugin_system.builtin_mixin.trigger_engine import TriggerEngine
+from ncatbot.plugin_system.rbac.rbac_manager import RBACManager
+from ncatbot.utils.testing import EventFactory
+
+PREFIXES = 300
+REGEXES = 200
+MESSAGES = 2000
+
+
+def build_chains():
+    chains = [create_filter(prefix=f"关键词{i}") for i in range(PREFIXES)]
+    chains += [create_filter(regex=rf"查询{i}\s+(\S+)") for i in range(REGEXES)]
+    return chains
+
+
+def timeit(func, events) -> float:
+    start = time.perf_counter()
+    for event in events:
+        func(event)
+    return (time.perf_counter() - start) / len(events) * 1e6
+
+
+def main():
+    random.seed(0)
+    chains = build_chains()
+    engine = TriggerEngine()
+    for chain in chains:
+        engine.add_chain(chain)
+
+    texts = [
+        random.choice(
+            [
+                f"关键词{random.randrange(PREFIXES)} 你好",
+                f"查询{random.randrange(REGEXES)} 北京",
+                f"今天{i} 随便聊聊",
+            ]
+        )
+        for i in range(MESSAGES)
+    ]
+    events = [EventFactory.create_group_message(t) for t in texts]
+
+    def linear(event):
+        return [chain for chain in chains if chain.check(event)]
+
+    def compiled(event):
+        event.__dict__.pop("_trigger_matches", None)
+        return [chain for chain in chains if chain in engine.matches(event)]
+
+    assert all(linear(e) == compiled(e) for e in events)
+    print(f"已注册 {len(engine)} 个功能")
+    print(f"找出命中功能: 逐个检查 {timeit(linear, events):.1f} us/条, ", end="")
+    print(f"一次匹配 {timeit(lambda e: engine.match(e.raw_message), events):.1f} us/条")
+
+    rbac = RBACManager("__bench_rbac_not_exists__.json")
+    for i in range(len(chains)):
+        rbac.assign_permissions_to_role("user", f"bench.f{i}", "white")
+
+    def old_handlers(event):
+        for i, chain in enumerate(chains):
+            if rbac.check_permission(event.user_id, f"bench.f{i}"):
+                chain.check(event)
+
+    def new_handlers(event):
+        event.__dict__.pop("_trigger_matches", None)
+        for i, chain in enumerate(chains):
+            if not engine.may_match(chain, event):
+                continue
+            if rbac.check_permission(event.user_id, f"bench.f{i}"):
+                engine.check(chain, event)
+
+    sample = events[:500]
+    print(f"经过所有处理器: 原实现 {timeit(old_handlers, sample):.0f} us/条, ", end="")
+    print(f"触发引擎 {timeit(new_handlers, sample):.0f} us/条")
+
+    def reload():
+        engine.remove_chain(chains[PREFIXES])
+        engine.add_chain(chains[PREFIXES])
+        engine.match(texts[0])
+
+    start = time.perf_counter()
+    for _ in range(100):
+        reload()
+    print(f"增删一个正则功能并重新匹配: {(time.perf_counter() - start) * 10:.2f} ms/次")
+
+
+if __name__ == "__main__":
+    main()
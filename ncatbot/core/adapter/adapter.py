@@ -4,7 +4,7 @@ import traceback
 from typing import Dict, Callable, Optional, Literal
 import uuid
 from threading import Lock
-from queue import Queue
+from concurrent.futures import Future
 import websockets
 from .nc.launch import napcat_service_ok
 from websockets.exceptions import ConnectionClosedError
@@ -18,7 +18,7 @@ from ncatbot.core.event import (
     MetaEvent,
     BaseEventData,
 )
-from ncatbot.utils import get_log, ncatbot_config
+from ncatbot.utils import get_log, ncatbot_config, loop_bridge
 from ncatbot.utils import (
     OFFICIAL_PRIVATE_MESSAGE_EVENT,
     OFFICIAL_GROUP_MESSAGE_EVENT,
@@ -35,9 +35,11 @@ LOG = get_log("Adapter")
 
 class Adapter:
     def __init__(self):
-        self.pending_requests: Dict[str, Queue] = {}
+        self.pending_requests: Dict[str, Future] = {}
         self.client: Optional[websockets.ClientConnection] = None
         self.event_callback: Dict[str, Callable[[BaseEventData], None]] = {}
+        # 收到消息类事件时以原始数据调用, 用于本地消息存储
+        self.raw_message_callback: Optional[Callable[[dict], None]] = None
         self._lock = Lock()
 
     def start_websocket(self):
@@ -54,12 +56,12 @@ class Adapter:
         """异步发送消息并等待响应"""
         # send 函数可能会在其它事件循环被调用, 需要使用线程安全通信方式
         echo = str(uuid.uuid4())
-        queue = Queue(maxsize=1)
+        future = Future()
         LOG.debug(f"向 {path} 发送请求: {echo}")
         LOG.debug(f"请求参数: {params}")
 
         with self._lock:
-            self.pending_requests[echo] = queue
+            self.pending_requests[echo] = future
 
         try:
             if not self.client:
@@ -75,9 +77,8 @@ class Adapter:
                 )
             )
 
-            # 为了避免使用异步队列的心智开销使用线程池
-            result = await asyncio.to_thread(queue.get, timeout=timeout)
-            return result
+            # wrap_future 可以跨事件循环等待, 超时或取消时不会占用线程
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
 
         finally:
             with self._lock:
@@ -85,6 +86,8 @@ class Adapter:
 
     async def connect_websocket(self) -> bool:
         """连接 ws 客户端"""
+        # 其它线程中的同步接口调用会被提交到当前事件循环执行
+        loop_bridge.set_main_loop(asyncio.get_running_loop())
         uri_with_token = ncatbot_config.get_uri_with_token()
         self.client = await websockets.connect(
             uri_with_token, close_timeout=0.2, max_size=2**30, open_timeout=1
@@ -132,11 +135,12 @@ class Adapter:
     async def _handle_response(self, message: dict):
         """处理API响应, 不能阻塞"""
         with self._lock:
-            queue = self.pending_requests.get(message.get("echo"))
-            if queue is None:
+            future = self.pending_requests.get(message.get("echo"))
+            if future is None:
                 LOG.warning(f"收到未匹配的响应: {message.get('echo')}")
                 return
-            queue.put(message)
+            if not future.done():
+                future.set_result(message)
 
     async def _handle_event(self, message: dict):
         """处理事件, 不能阻塞"""
@@ -148,6 +152,12 @@ class Adapter:
 
             callback = None
 
+            if (
+                post_type in ("message", "message_sent")
+                and self.raw_message_callback is not None
+            ):
+                self.raw_message_callback(message)
+
             if post_type == "message":
                 message_type: Literal["private", "group"] = message.get("message_type")
                 if message_type == "private":
@@ -4,6 +4,18 @@ from .api_group import GroupAPI
 from .api_message import MessageAPI
 from .api_private import PrivateAPI
 from .api_support import SupportAPI
+from .cache import APICache
+from .roster import GroupRoster, RosterStore
+from .message_store import MessageStore
+from .coalescer import MessageCoalescer
+from .scheduler import OutboundScheduler, lane
+from .policy import CallPolicy, CircuitBreaker, APITimeoutError, CircuitOpenError
+from .pagination import (
+    MessageRecord,
+    MessageHistoryIterator,
+    GroupFileEntry,
+    GroupFileWalker,
+)
 from .utils import (
     BaseAPI,
     APIReturnStatus,
@@ -20,6 +32,21 @@ __all__ = [
     "MessageAPI",
     "PrivateAPI",
     "SupportAPI",
+    "APICache",
+    "GroupRoster",
+    "RosterStore",
+    "MessageStore",
+    "MessageCoalescer",
+    "OutboundScheduler",
+    "lane",
+    "CallPolicy",
+    "CircuitBreaker",
+    "APITimeoutError",
+    "CircuitOpenError",
+    "MessageRecord",
+    "MessageHistoryIterator",
+    "GroupFileEntry",
+    "GroupFileWalker",
     "BaseAPI",
     "APIReturnStatus",
     "MessageAPIReturnStatus",
@@ -1,9 +1,18 @@
-from typing import Callable
+from typing import Callable, Dict, Optional
+from ncatbot.utils import ncatbot_config
+from ncatbot.utils.config import APIPolicyConfig
+from ncatbot.core.helper import ChunkedSender
 from .api_account import AccountAPI
 from .api_group import GroupAPI
 from .api_message import MessageAPI
 from .api_private import PrivateAPI
 from .api_support import SupportAPI
+from .cache import APICache
+from .coalescer import MessageCoalescer
+from .message_store import MessageStore
+from .policy import CallPolicy
+from .roster import RosterStore
+from .scheduler import OutboundScheduler, Lane, lane
 
 
 class BotAPI(AccountAPI, GroupAPI, MessageAPI, PrivateAPI, SupportAPI):
@@ -12,3 +21,140 @@ class BotAPI(AccountAPI, GroupAPI, MessageAPI, PrivateAPI, SupportAPI):
     def __init__(self, async_callback: Callable[[str, dict], dict]):
         # 由于多重继承，只需要初始化一次 BaseAPI
         super().__init__(async_callback)
+        self._transport = async_callback
+        self.cache: Optional[APICache] = None
+        self.scheduler: Optional[OutboundScheduler] = None
+        self.policy: Optional[CallPolicy] = None
+        self.roster = RosterStore(self)
+        self.message_store: Optional[MessageStore] = None
+        self.coalescer: Optional[MessageCoalescer] = None
+        # 超长文本和合并转发的分段发送, 可替换为自定义参数的 ChunkedSender
+        self.chunker = ChunkedSender(self)
+        if ncatbot_config.api.enable:
+            self.enable_policy()
+
+    def _rebuild_callback(self):
+        """按 缓存 -> 调度 -> 调用策略 -> 发送 的顺序组装 async_callback
+
+        缓存命中不占用发送额度, 重试在获得发送机会后进行, 不重新排队.
+        """
+        callback = self._transport
+        if self.policy is not None:
+            self.policy.callback = callback
+            callback = self.policy.call
+        if self.scheduler is not None:
+            self.scheduler.callback = callback
+            callback = self.scheduler.call
+        if self.cache is not None:
+            self.cache.callback = callback
+            callback = self.cache.call
+        self.async_callback = callback
+
+    def enable_cache(
+        self, ttl: Optional[Dict[str, Optional[float]]] = None, max_entries: int = 4096
+    ) -> APICache:
+        """开启查询类接口的缓存
+
+        Args:
+            ttl: 接口 -> TTL(秒), 如 {"/get_group_member_info": 30}, 与默认值合并
+            max_entries: 最多缓存的条目数
+        """
+        if self.cache is None:
+            self.cache = APICache(self._transport, ttl, max_entries)
+        else:
+            self.cache.ttl.update(ttl or {})
+            self.cache.max_entries = max_entries
+        self._rebuild_callback()
+        return self.cache
+
+    def disable_cache(self):
+        """关闭缓存"""
+        self.cache = None
+        self._rebuild_callback()
+
+    def enable_scheduler(self, **options) -> OutboundScheduler:
+        """开启出站请求的优先级调度, 参数见 OutboundScheduler"""
+        self.scheduler = OutboundScheduler(self._transport, **options)
+        self._rebuild_callback()
+        return self.scheduler
+
+    def disable_scheduler(self):
+        """关闭出站调度, 已排队的请求仍会按原调度器发送"""
+        self.scheduler = None
+        self._rebuild_callback()
+
+    def enable_policy(self, config: Optional[APIPolicyConfig] = None) -> CallPolicy:
+        """开启超时预算、重试和熔断, 默认使用 ncatbot_config.api"""
+        self.policy = CallPolicy(self._transport, config or ncatbot_config.api)
+        self._rebuild_callback()
+        return self.policy
+
+    def disable_policy(self):
+        """关闭调用策略, 调用使用 Adapter 的默认超时"""
+        self.policy = None
+        self._rebuild_callback()
+
+    def enable_message_store(
+        self, path: str = "data/message_store", **options
+    ) -> MessageStore:
+        """开启本地消息存储, get_msg / get_forward_msg 优先从本地查询
+
+        Args:
+            path: 存储目录
+            **options: 保留天数等参数, 见 MessageStore
+        """
+        if self.message_store is None:
+            self.message_store = MessageStore(path, **options)
+        return self.message_store
+
+    def disable_message_store(self):
+        """关闭消息存储, 写完已收到的消息"""
+        store, self.message_store = self.message_store, None
+        if store is not None:
+            store.close()
+
+    def record_message(self, raw: dict):
+        """记录收到的消息事件原始数据, 未开启消息存储时忽略"""
+        if self.message_store is not None:
+            self.message_store.append(raw)
+
+    def enable_coalescing(
+        self, window: float = 0.3, max_messages: int = 10, separator: str = "\n"
+    ) -> MessageCoalescer:
+        """开启出站消息合并, 发往同一目标的 post_group_msg / post_private_msg 在窗口期内合并发送
+
+        Args:
+            window: 合并窗口(秒)
+            max_messages: 一批最多合并的消息数
+            separator: 相邻消息之间插入的文本
+        """
+        self.coalescer = MessageCoalescer(self, window, max_messages, separator)
+        return self.coalescer
+
+    def disable_coalescing(self):
+        """关闭消息合并, 等待中的消息立即发送"""
+        coalescer, self.coalescer = self.coalescer, None
+        if coalescer is not None:
+            coalescer.flush_all()
+
+    def metrics(self) -> dict:
+        """缓存、出站调度、调用策略(含熔断器状态)、消息合并和消息存储的统计, 未开启的部分为 None"""
+        return {
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "scheduler": self.scheduler.stats() if self.scheduler is not None else None,
+            "policy": self.policy.stats() if self.policy is not None else None,
+            "coalescer": (
+                self.coalescer.stats() if self.coalescer is not None else None
+            ),
+            "message_store": (
+                self.message_store.stats() if self.message_store is not None else None
+            ),
+        }
+
+    @staticmethod
+    def lane(name: Lane):
+        """指定上下文中 API 调用的通道, 如 `with api.lane("bulk"): ...`
+
+        未开启出站调度时没有效果.
+        """
+        return lane(name)
@@ -1,6 +1,7 @@
-from typing import Literal, Union, List
+from typing import Literal, Union, List, Optional
 from .utils import BaseAPI, APIReturnStatus
-from ncatbot.utils import run_coroutine
+from ncatbot.utils import loop_bridge
+from .pagination import FolderCursor, GroupFileWalker
 from ncatbot.core.event import File, MessageArray
 from dataclasses import dataclass
 import time
@@ -101,6 +102,12 @@ class GroupMemberList:
     def __init__(self, data: List[dict]):
         self.members = [GroupMemberInfo(**item) for item in data]
 
+    @classmethod
+    def _from_members(cls, members: List[GroupMemberInfo]) -> "GroupMemberList":
+        obj = cls([])
+        obj.members = members
+        return obj
+
     @classmethod
     def from_shut_list(cls, shut_list_dict: List[dict]) -> "GroupMemberList":
         obj = cls([])
@@ -115,22 +122,24 @@ class GroupMemberList:
     def filter_by_another_list_not_in(
         self, another_list: "GroupMemberList"
     ) -> "GroupMemberList":
-        return GroupMemberList(
-            [member for member in self.members if member not in another_list.members]
+        # 按 user_id 建立集合, 避免逐个比较 dataclass 的 O(n*m) 开销
+        excluded = {member.user_id for member in another_list.members}
+        return GroupMemberList._from_members(
+            [member for member in self.members if member.user_id not in excluded]
         )
 
     def filter_by_level_ge(self, level: int) -> "GroupMemberList":
-        return GroupMemberList(
+        return GroupMemberList._from_members(
             [member for member in self.members if member.level >= level]
         )
 
     def filter_by_level_le(self, level: int) -> "GroupMemberList":
-        return GroupMemberList(
+        return GroupMemberList._from_members(
             [member for member in self.members if member.level <= level]
         )
 
     def filter_by_last_sent_time_upto_now(self, seconds: int) -> "GroupMemberList":
-        return GroupMemberList(
+        return GroupMemberList._from_members(
             [
                 member
                 for member in self.members
@@ -141,19 +150,21 @@ class GroupMemberList:
     def filter_by_role(
         self, role: Literal["admin", "owner", "member"]
     ) -> "GroupMemberList":
-        return GroupMemberList(
+        return GroupMemberList._from_members(
             [member for member in self.members if member.role == role]
         )
 
     def filter_by_role_not_in(
         self, roles: List[Literal["admin", "owner", "member"]]
     ) -> "GroupMemberList":
-        return GroupMemberList(
+        return GroupMemberList._from_members(
             [member for member in self.members if member.role not in roles]
         )
 
     def filter_by_have_title(self) -> "GroupMemberList":
-        return GroupMemberList([member for member in self.members if member.title])
+        return GroupMemberList._from_members(
+            [member for member in self.members if member.title]
+        )
 
     def __repr__(self) -> str:
         return f"GroupMemberList(members={self.members})"
@@ -453,6 +464,23 @@ class GroupAPI(BaseAPI):
         status = APIReturnStatus(result)
         return status.data
 
+    def walk_group_files(
+        self,
+        group_id: Union[str, int],
+        folder_id: Optional[str] = None,
+        file_count: int = 500,
+        concurrency: int = 4,
+        cursor: Optional[List[FolderCursor]] = None,
+    ) -> GroupFileWalker:
+        """递归遍历群文件, 多个目录并发拉取
+
+        用法: `async for entry in api.walk_group_files(group_id): ...`,
+        迭代器的 cursor 可传入 cursor 参数续传.
+        """
+        return GroupFileWalker(
+            self, group_id, folder_id, file_count, concurrency, cursor
+        )
+
     async def get_group_file_url(self, group_id: Union[str, int], file_id: str) -> str:
         result = await self.async_callback(
             "/get_group_file_url", {"group_id": group_id, "file_id": file_id}
@@ -631,7 +659,7 @@ class GroupAPI(BaseAPI):
         user_id: Union[str, int],
         reject_add_request: bool = False,
     ) -> None:
-        return run_coroutine(
+        return loop_bridge.run(
             self.set_group_kick_members, group_id, user_id, reject_add_request
         )
 
@@ -641,7 +669,9 @@ class GroupAPI(BaseAPI):
         user_id: Union[str, int],
         reject_add_request: bool = False,
     ) -> None:
-        return run_coroutine(self.set_group_kick, group_id, user_id, reject_add_request)
+        return loop_bridge.run(
+            self.set_group_kick, group_id, user_id, reject_add_request
+        )
 
     def set_group_ban_sync(
         self,
@@ -649,20 +679,20 @@ class GroupAPI(BaseAPI):
         user_id: Union[str, int],
         duration: int = 30 * 60,
     ) -> None:
-        return run_coroutine(self.set_group_ban, group_id, user_id, duration)
+        return loop_bridge.run(self.set_group_ban, group_id, user_id, duration)
 
     def set_group_whole_ban_sync(self, group_id: Union[str, int], enable: bool) -> None:
-        return run_coroutine(self.set_group_whole_ban, group_id, enable)
+        return loop_bridge.run(self.set_group_whole_ban, group_id, enable)
 
     def set_group_admin_sync(
         self, group_id: Union[str, int], user_id: Union[str, int], enable: bool
     ) -> None:
-        return run_coroutine(self.set_group_admin, group_id, user_id, enable)
+        return loop_bridge.run(self.set_group_admin, group_id, user_id, enable)
 
     def set_group_leave_sync(
         self, group_id: Union[str, int], is_dismiss: bool = False
     ) -> None:
-        return run_coroutine(self.set_group_leave, group_id, is_dismiss)
+        return loop_bridge.run(self.set_group_leave, group_id, is_dismiss)
 
     def set_group_special_title_sync(
         self,
@@ -670,28 +700,28 @@ class GroupAPI(BaseAPI):
         user_id: Union[str, int],
         special_title: str = "",
     ) -> None:
-        return run_coroutine(
+        return loop_bridge.run(
             self.set_group_special_title, group_id, user_id, special_title
         )
 
     def set_group_add_request_sync(
         self, flag: str, approve: bool, reason: str = None
     ) -> None:
-        return run_coroutine(self.set_group_add_request, flag, approve, reason)
+        return loop_bridge.run(self.set_group_add_request, flag, approve, reason)
 
     def set_group_card_sync(
         self, group_id: Union[str, int], user_id: Union[str, int], card: str = ""
     ) -> None:
-        return run_coroutine(self.set_group_card, group_id, user_id, card)
+        return loop_bridge.run(self.set_group_card, group_id, user_id, card)
 
     def set_essence_msg_sync(self, message_id: Union[str, int]) -> None:
-        return run_coroutine(self.set_essence_msg, message_id)
+        return loop_bridge.run(self.set_essence_msg, message_id)
 
     def delete_essence_msg_sync(self, message_id: Union[str, int]) -> None:
-        return run_coroutine(self.delete_essence_msg, message_id)
+        return loop_bridge.run(self.delete_essence_msg, message_id)
 
     def get_group_essence_msg_sync(self, group_id: Union[str, int]) -> List[dict]:
-        return run_coroutine(self.get_group_essence_msg, group_id)
+        return loop_bridge.run(self.get_group_essence_msg, group_id)
 
     def post_group_file_sync(
         self,
@@ -701,7 +731,9 @@ class GroupAPI(BaseAPI):
         video: str = None,
         file: str = None,
     ) -> str:
-        return run_coroutine(self.post_group_file, group_id, image, record, video, file)
+        return loop_bridge.run(
+            self.post_group_file, group_id, image, record, video, file
+        )
 
     def move_group_file_sync(
         self,
@@ -710,7 +742,7 @@ class GroupAPI(BaseAPI):
         current_parent_directory: str,
         target_parent_directory: str,
     ) -> None:
-        return run_coroutine(
+        return loop_bridge.run(
             self.move_group_file,
             group_id,
             file_id,
@@ -719,92 +751,92 @@ class GroupAPI(BaseAPI):
         )
 
     def trans_group_file_sync(self, group_id: Union[str, int], file_id: str) -> None:
-        return run_coroutine(self.trans_group_file, group_id, file_id)
+        return loop_bridge.run(self.trans_group_file, group_id, file_id)
 
     def rename_group_file_sync(
         self, group_id: Union[str, int], file_id: str, new_name: str
     ) -> None:
-        return run_coroutine(self.rename_group_file, group_id, file_id, new_name)
+        return loop_bridge.run(self.rename_group_file, group_id, file_id, new_name)
 
     def get_file_sync(self, file_id: str, file: str) -> File:
-        return run_coroutine(self.get_file, file_id, file)
+        return loop_bridge.run(self.get_file, file_id, file)
 
     def upload_group_file_sync(
         self, group_id: Union[str, int], file: str, name: str, folder
     ) -> str:
-        return run_coroutine(self.upload_group_file, group_id, file, name, folder)
+        return loop_bridge.run(self.upload_group_file, group_id, file, name, folder)
 
     def create_group_file_folder_sync(
         self, group_id: Union[str, int], folder_name: str
     ) -> None:
-        return run_coroutine(self.create_group_file_folder, group_id, folder_name)
+        return loop_bridge.run(self.create_group_file_folder, group_id, folder_name)
 
     def group_file_folder_makedir_sync(
         self, group_id: Union[str, int], path: str
     ) -> str:
-        return run_coroutine(self.group_file_folder_makedir, group_id, path)
+        return loop_bridge.run(self.group_file_folder_makedir, group_id, path)
 
     def delete_group_file_sync(self, group_id: Union[str, int], file_id: str) -> None:
-        return run_coroutine(self.delete_group_file, group_id, file_id)
+        return loop_bridge.run(self.delete_group_file, group_id, file_id)
 
     def delete_group_folder_sync(
         self, group_id: Union[str, int], folder_id: str
     ) -> None:
-        return run_coroutine(self.delete_group_folder, group_id, folder_id)
+        return loop_bridge.run(self.delete_group_folder, group_id, folder_id)
 
     def get_group_root_files_sync(
         self, group_id: Union[str, int], file_count: int = 50
     ) -> dict:
-        return run_coroutine(self.get_group_root_files, group_id, file_count)
+        return loop_bridge.run(self.get_group_root_files, group_id, file_count)
 
     def get_group_files_by_folder_sync(
         self, group_id: Union[str, int], folder_id: str, file_count: int = 50
     ) -> dict:
-        return run_coroutine(
+        return loop_bridge.run(
             self.get_group_files_by_folder, group_id, folder_id, file_count
         )
 
     def get_group_file_url_sync(self, group_id: Union[str, int], file_id: str) -> str:
-        return run_coroutine(self.get_group_file_url, group_id, file_id)
+        return loop_bridge.run(self.get_group_file_url, group_id, file_id)
 
     def get_group_honor_info_sync(
         self,
         group_id: Union[str, int],
         type: Literal["talkative", "performer", "legend", "emotion", "all"],
     ) -> GroupChatActivity:
-        return run_coroutine(self.get_group_honor_info, group_id, type)
+        return loop_bridge.run(self.get_group_honor_info, group_id, type)
 
     def get_group_info_sync(self, group_id: Union[str, int]) -> GroupInfo:
-        return run_coroutine(self.get_group_info, group_id)
+        return loop_bridge.run(self.get_group_info, group_id)
 
     def get_group_info_ex_sync(self, group_id: Union[str, int]) -> dict:
-        return run_coroutine(self.get_group_info_ex, group_id)
+        return loop_bridge.run(self.get_group_info_ex, group_id)
 
     def get_group_member_info_sync(
         self, group_id: Union[str, int], user_id: Union[str, int]
     ) -> GroupMemberInfo:
-        return run_coroutine(self.get_group_member_info, group_id, user_id)
+        return loop_bridge.run(self.get_group_member_info, group_id, user_id)
 
     def get_group_member_list_sync(self, group_id: Union[str, int]) -> GroupMemberList:
-        return run_coroutine(self.get_group_member_list, group_id)
+        return loop_bridge.run(self.get_group_member_list, group_id)
 
     def get_group_shut_list_sync(self, group_id: Union[str, int]) -> GroupMemberList:
-        return run_coroutine(self.get_group_shut_list, group_id)
+        return loop_bridge.run(self.get_group_shut_list, group_id)
 
     def set_group_remark_sync(self, group_id: Union[str, int], remark: str) -> None:
-        return run_coroutine(self.set_group_remark, group_id, remark)
+        return loop_bridge.run(self.set_group_remark, group_id, remark)
 
     def set_group_sign_sync(self, group_id: Union[str, int]) -> None:
-        return run_coroutine(self.set_group_sign, group_id)
+        return loop_bridge.run(self.set_group_sign, group_id)
 
     def send_group_sign_sync(self, group_id: Union[str, int]) -> None:
-        return run_coroutine(self.send_group_sign, group_id)
+        return loop_bridge.run(self.send_group_sign, group_id)
 
     def set_group_avatar_sync(self, group_id: Union[str, int], file: str) -> None:
-        return run_coroutine(self.set_group_avatar, group_id, file)
+        return loop_bridge.run(self.set_group_avatar, group_id, file)
 
     def set_group_name_sync(self, group_id: Union[str, int], name: str) -> None:
-        return run_coroutine(self.set_group_name, group_id, name)
+        return loop_bridge.run(self.set_group_name, group_id, name)
 
     def _send_group_notice_sync(
         self,
@@ -815,7 +847,7 @@ class GroupAPI(BaseAPI):
         is_show_edit_card: bool = False,
         pinned: bool = False,
     ) -> None:
-        return run_coroutine(
+        return loop_bridge.run(
             self._send_group_notice,
             group_id,
             content,
@@ -1,4 +1,4 @@
-from typing import Literal, Union, List, Optional
+from typing import TYPE_CHECKING, Literal, Union, List, Optional
 from ncatbot.core.event import GroupMessageEvent, PrivateMessageEvent, BaseMessageEvent
 from ncatbot.core.event import (
     Record,
@@ -9,7 +9,7 @@ from ncatbot.core.event import (
     PlainText,
 )
 from ncatbot.core.event.message_segment.message_array import MessageArray
-from ncatbot.core.helper import ForwardConstructor
+from ncatbot.core.helper import ForwardConstructor, Broadcaster, BroadcastResult
 from ncatbot.utils import NcatBotValueError
 from .utils import (
     BaseAPI,
@@ -18,34 +18,41 @@ from .utils import (
     check_exclusive_argument,
     get_log,
 )
-from ncatbot.utils import run_coroutine
+from ncatbot.utils import loop_bridge
+from .pagination import MessageHistoryIterator
+
+if TYPE_CHECKING:
+    from .coalescer import MessageCoalescer
+    from .message_store import MessageStore
 
 LOG = get_log("ncatbot.core.api.api_message")
 
 
+# 只能单独发送的消息段类型
+SINGLE_MSG_ONLY = (
+    "music",
+    "forward",
+    "file",
+    "record",
+    "video",
+    "rps",
+    "dice",
+    "share",
+    "poke",
+    "contact",
+    "location",
+)
+
+
 def _validate_msg(msg: List[dict]) -> str:
     """验证消息格式是否合法"""
-    SINGLE_MSG_ONLY = (
-        "music",
-        "forward",
-        "file",
-        "record",
-        "video",
-        "rps",
-        "dice",
-        "share",
-        "poke",
-        "contact",
-        "location",
-    )
-
     if len(msg) == 0:
         return "消息不能为空"
     if len(msg) != 1:
         types = [m["type"] for m in msg if m["type"]]
         first_single = next((m for m in types if m in SINGLE_MSG_ONLY), None)
         if first_single:
-            if any(m["reply"] == "reply" for m in msg):
+            if any(m["type"] == "reply" for m in msg):
                 return f"{first_single} 不允许通过回复发送, 请使用 `BotAPI.post_xxx_array_msg(msg=[...])` 直接发送"
             return f"{first_single} 不允许与其他消息混合发送，仅能发送单条此类消息"
     return "OK"
@@ -60,6 +67,10 @@ def validate_msg(msg: List[dict]) -> bool:
 
 
 class MessageAPI(BaseAPI):
+    # 由 BotAPI.enable_message_store / enable_coalescing 设置
+    message_store: Optional["MessageStore"] = None
+    coalescer: Optional["MessageCoalescer"] = None
+
     # ---------------------
     # region 群聊消息发送
     # ---------------------
@@ -80,20 +91,44 @@ class MessageAPI(BaseAPI):
     async def post_group_array_msg(
         self, group_id: Union[str, int], msg: MessageArray
     ) -> str:
-        """发送群聊消息（NcatBot 接口）"""
+        """发送群聊消息（NcatBot 接口）, 开启消息合并时可能与相邻消息合并发送"""
         # TODO: 检查消息合法性
+        if self.coalescer is not None:
+            return await self.coalescer.submit("group", group_id, msg)
         return await self.send_group_msg(group_id, msg.to_list())
 
     async def post_all_group_array_msg(self, msg: MessageArray) -> List[int]:
         """发送群聊消息到所有群（NcatBot 接口）
         慎用！！！
+
+        使用默认参数的 Broadcaster 并发限速发送, 返回与群列表顺序一致的消息 ID.
+        任一群发送失败时, 其余群仍会发送, 完成后抛出按群列表顺序第一个失败的异常;
+        需要逐群的结果时使用 broadcast_group_array_msg
+        """
+        group_ids = [str(group_id) for group_id in await self.get_group_list()]
+        result = await self.broadcast_group_array_msg(msg, group_ids)
+        for group_id in group_ids:
+            if group_id in result.errors:
+                raise result.errors[group_id]
+        return [result.message_ids[group_id] for group_id in group_ids]
+
+    async def broadcast_group_array_msg(
+        self,
+        msg: MessageArray,
+        group_ids: Optional[List[Union[str, int]]] = None,
+        **options,
+    ) -> BroadcastResult:
+        """并发限速群发群聊消息（NcatBot 接口）
+
+        Args:
+            msg (MessageArray): 消息
+            group_ids (List[Union[str, int]], optional): 目标群, 为空时发送到所有群
+            **options: Broadcaster 的参数(concurrency, rate, jitter, progress_file 等)
+
+        Returns:
+            BroadcastResult: 各群的消息 ID 和异常
         """
-        group_id_list = await self.get_group_list()
-        message_id_list = []
-        for group_id in group_id_list:
-            message_id = await self.post_group_array_msg(group_id, msg)
-            message_id_list.append(message_id)
-        return message_id_list
+        return await Broadcaster(self, **options).broadcast_group(msg, group_ids)
 
     async def post_group_msg(
         self,
@@ -325,7 +360,9 @@ class MessageAPI(BaseAPI):
     async def post_private_array_msg(
         self, user_id: Union[str, int], msg: MessageArray
     ) -> str:
-        """发送私聊消息（NcatBot 接口）"""
+        """发送私聊消息（NcatBot 接口）, 开启消息合并时可能与相邻消息合并发送"""
+        if self.coalescer is not None:
+            return await self.coalescer.submit("private", user_id, msg)
         return await self.send_private_msg(user_id, msg.to_list())
 
     async def post_private_msg(
@@ -643,11 +680,19 @@ class MessageAPI(BaseAPI):
         return [GroupMessageEvent(data) for data in status.data.get("messages")]
 
     async def get_msg(self, message_id: Union[str, int]) -> BaseMessageEvent:
+        if self.message_store is not None:
+            raw = await self.message_store.get(message_id)
+            if raw is not None:
+                return GroupMessageEvent(raw)
         result = await self.async_callback("/get_msg", {"message_id": message_id})
         status = APIReturnStatus(result)
         return GroupMessageEvent(status.data)
 
     async def get_forward_msg(self, message_id: Union[str, int]) -> Forward:
+        if self.message_store is not None:
+            content = await self.message_store.get_forward(message_id)
+            if content is not None:
+                return Forward.from_content(content, message_id)
         result = await self.async_callback(
             "/get_forward_msg", {"message_id": message_id}
         )
@@ -673,6 +718,50 @@ class MessageAPI(BaseAPI):
         status = APIReturnStatus(result)
         return [PrivateMessageEvent(data) for data in status.data.get("messages")]
 
+    def iter_group_msg_history(
+        self,
+        group_id: Union[str, int],
+        start_seq: Optional[Union[str, int]] = None,
+        page_size: int = 20,
+        limit: Optional[int] = None,
+        prefetch: bool = True,
+    ) -> MessageHistoryIterator:
+        """从新到旧逐页遍历群消息历史
+
+        用法: `async for record in api.iter_group_msg_history(group_id): ...`,
+        record.to_event() 转换为 GroupMessageEvent. 迭代器的 cursor 可作为 start_seq 续传.
+        """
+        return MessageHistoryIterator(
+            self,
+            "/get_group_msg_history",
+            {"group_id": group_id, "reverseOrder": False},
+            GroupMessageEvent,
+            start_seq,
+            page_size,
+            limit,
+            prefetch,
+        )
+
+    def iter_friend_msg_history(
+        self,
+        user_id: Union[str, int],
+        start_seq: Optional[Union[str, int]] = None,
+        page_size: int = 20,
+        limit: Optional[int] = None,
+        prefetch: bool = True,
+    ) -> MessageHistoryIterator:
+        """从新到旧逐页遍历好友消息历史, 用法同 iter_group_msg_history"""
+        return MessageHistoryIterator(
+            self,
+            "/get_friend_msg_history",
+            {"user_id": user_id, "reverseOrder": False},
+            PrivateMessageEvent,
+            start_seq,
+            page_size,
+            limit,
+            prefetch,
+        )
+
     async def get_record(
         self,
         file: Optional[str] = None,
@@ -720,12 +809,12 @@ class MessageAPI(BaseAPI):
     def send_group_msg_sync(
         self, group_id: Union[str, int], message: List[dict]
     ) -> str:
-        return run_coroutine(self.send_group_msg, group_id, message)
+        return loop_bridge.run(self.send_group_msg, group_id, message)
 
     def post_group_array_msg_sync(
         self, group_id: Union[str, int], msg: MessageArray
     ) -> str:
-        return run_coroutine(self.post_group_array_msg, group_id, msg)
+        return loop_bridge.run(self.post_group_array_msg, group_id, msg)
 
     def post_group_msg_sync(
         self,
@@ -736,40 +825,42 @@ class MessageAPI(BaseAPI):
         image: Optional[str] = None,
         rtf: Optional[MessageArray] = None,
     ) -> str:
-        return run_coroutine(self.post_group_msg, group_id, text, at, reply, image, rtf)
+        return loop_bridge.run(
+            self.post_group_msg, group_id, text, at, reply, image, rtf
+        )
 
     def send_group_text_sync(self, group_id: Union[str, int], text: str) -> str:
-        return run_coroutine(self.send_group_text, group_id, text)
+        return loop_bridge.run(self.send_group_text, group_id, text)
 
     def send_group_plain_text_sync(self, group_id: Union[str, int], text: str) -> str:
-        return run_coroutine(self.send_group_plain_text, group_id, text)
+        return loop_bridge.run(self.send_group_plain_text, group_id, text)
 
     def send_group_image_sync(self, group_id: Union[str, int], image: str) -> str:
-        return run_coroutine(self.send_group_image, group_id, image)
+        return loop_bridge.run(self.send_group_image, group_id, image)
 
     def send_group_record_sync(self, group_id: Union[str, int], file: str) -> str:
-        return run_coroutine(self.send_group_record, group_id, file)
+        return loop_bridge.run(self.send_group_record, group_id, file)
 
     def send_group_dice_sync(self, group_id: Union[str, int], value: int = 1) -> str:
-        return run_coroutine(self.send_group_dice, group_id, value)
+        return loop_bridge.run(self.send_group_dice, group_id, value)
 
     def send_group_rps_sync(self, group_id: Union[str, int], value: int = 1) -> str:
-        return run_coroutine(self.send_group_rps, group_id, value)
+        return loop_bridge.run(self.send_group_rps, group_id, value)
 
     def send_group_file_sync(
         self, group_id: Union[str, int], file: str, name: str = None
     ) -> str:
-        return run_coroutine(self.send_group_file, group_id, file, name)
+        return loop_bridge.run(self.send_group_file, group_id, file, name)
 
     def send_group_music_sync(
         self, group_id: Union[str, int], type: Literal["qq", "163"], id: Union[int, str]
     ) -> str:
-        return run_coroutine(self.send_group_music, group_id, type, id)
+        return loop_bridge.run(self.send_group_music, group_id, type, id)
 
     def send_group_forward_msg_by_id_sync(
         self, group_id: Union[str, int], messages: List[Union[str, int]]
     ) -> str:
-        return run_coroutine(self.send_group_forward_msg_by_id, group_id, messages)
+        return loop_bridge.run(self.send_group_forward_msg_by_id, group_id, messages)
 
     def send_group_forward_msg_sync(
         self,
@@ -780,7 +871,7 @@ class MessageAPI(BaseAPI):
         summary: str,
         source: str,
     ) -> str:
-        return run_coroutine(
+        return loop_bridge.run(
             self.send_group_forward_msg,
             group_id,
             messages,
@@ -799,29 +890,29 @@ class MessageAPI(BaseAPI):
         content: Optional[str] = None,
         image: Optional[str] = None,
     ) -> str:
-        return run_coroutine(
+        return loop_bridge.run(
             self.send_group_custom_music, group_id, audio, url, title, content, image
         )
 
     def forward_group_single_msg_sync(
         self, group_id: Union[str, int], message_id: Union[str, int]
     ) -> str:
-        return run_coroutine(self.forward_group_single_msg, group_id, message_id)
+        return loop_bridge.run(self.forward_group_single_msg, group_id, message_id)
 
     def group_poke_sync(
         self, group_id: Union[str, int], user_id: Union[str, int]
     ) -> None:
-        return run_coroutine(self.group_poke, group_id, user_id)
+        return loop_bridge.run(self.group_poke, group_id, user_id)
 
     def send_private_msg_sync(
         self, user_id: Union[str, int], message: List[dict]
     ) -> str:
-        return run_coroutine(self.send_private_msg, user_id, message)
+        return loop_bridge.run(self.send_private_msg, user_id, message)
 
     def post_private_array_msg_sync(
         self, user_id: Union[str, int], msg: MessageArray
     ) -> str:
-        return run_coroutine(self.post_private_array_msg, user_id, msg)
+        return loop_bridge.run(self.post_private_array_msg, user_id, msg)
 
     def post_private_msg_sync(
         self,
@@ -831,35 +922,35 @@ class MessageAPI(BaseAPI):
         image: Optional[str] = None,
         rtf: Optional[MessageArray] = None,
     ) -> str:
-        return run_coroutine(self.post_private_msg, user_id, text, reply, image, rtf)
+        return loop_bridge.run(self.post_private_msg, user_id, text, reply, image, rtf)
 
     def send_private_text_sync(self, user_id: Union[str, int], text: str) -> str:
-        return run_coroutine(self.send_private_text, user_id, text)
+        return loop_bridge.run(self.send_private_text, user_id, text)
 
     def send_private_plain_text_sync(self, user_id: Union[str, int], text: str) -> str:
-        return run_coroutine(self.send_private_plain_text, user_id, text)
+        return loop_bridge.run(self.send_private_plain_text, user_id, text)
 
     def send_private_image_sync(self, user_id: Union[str, int], image: str) -> str:
-        return run_coroutine(self.send_private_image, user_id, image)
+        return loop_bridge.run(self.send_private_image, user_id, image)
 
     def send_private_record_sync(self, user_id: Union[str, int], file: str) -> str:
-        return run_coroutine(self.send_private_record, user_id, file)
+        return loop_bridge.run(self.send_private_record, user_id, file)
 
     def send_private_dice_sync(self, user_id: Union[str, int], value: int = 1) -> str:
-        return run_coroutine(self.send_private_dice, user_id, value)
+        return loop_bridge.run(self.send_private_dice, user_id, value)
 
     def send_private_rps_sync(self, user_id: Union[str, int], value: int = 1) -> str:
-        return run_coroutine(self.send_private_rps, user_id, value)
+        return loop_bridge.run(self.send_private_rps, user_id, value)
 
     def send_private_file_sync(
         self, user_id: Union[str, int], file: str, name: str = None
     ) -> str:
-        return run_coroutine(self.send_private_file, user_id, file, name)
+        return loop_bridge.run(self.send_private_file, user_id, file, name)
 
     def send_private_music_sync(
         self, user_id: Union[str, int], type: Literal["qq", "163"], id: Union[int, str]
     ) -> str:
-        return run_coroutine(self.send_private_music, user_id, type, id)
+        return loop_bridge.run(self.send_private_music, user_id, type, id)
 
     def send_private_forward_msg_sync(
         self,
@@ -870,7 +961,7 @@ class MessageAPI(BaseAPI):
         summary: str,
         source: str,
     ) -> str:
-        return run_coroutine(
+        return loop_bridge.run(
             self.send_private_forward_msg,
             user_id,
             messages,
@@ -883,7 +974,7 @@ class MessageAPI(BaseAPI):
     def send_private_forward_msg_by_id_sync(
         self, user_id: Union[str, int], messages: List[Union[str, int]]
     ) -> str:
-        return run_coroutine(self.send_private_forward_msg_by_id, user_id, messages)
+        return loop_bridge.run(self.send_private_forward_msg_by_id, user_id, messages)
 
     def send_private_custom_music_sync(
         self,
@@ -894,30 +985,30 @@ class MessageAPI(BaseAPI):
         content: Optional[str] = None,
         image: Optional[str] = None,
     ) -> str:
-        return run_coroutine(
+        return loop_bridge.run(
             self.send_private_custom_music, user_id, audio, url, title, content, image
         )
 
     def forward_private_single_msg_sync(
         self, user_id: Union[str, int], message_id: Union[str, int]
     ) -> str:
-        return run_coroutine(self.forward_private_single_msg, user_id, message_id)
+        return loop_bridge.run(self.forward_private_single_msg, user_id, message_id)
 
     def friend_poke_sync(self, user_id: Union[str, int]) -> None:
-        return run_coroutine(self.friend_poke, user_id)
+        return loop_bridge.run(self.friend_poke, user_id)
 
     def send_poke_sync(
         self, user_id: Union[str, int], group_id: Optional[Union[str, int]] = None
     ) -> None:
-        return run_coroutine(self.send_poke, user_id, group_id)
+        return loop_bridge.run(self.send_poke, user_id, group_id)
 
     def delete_msg_sync(self, message_id: Union[str, int]) -> dict:
-        return run_coroutine(self.delete_msg, message_id)
+        return loop_bridge.run(self.delete_msg, message_id)
 
     def set_msg_emoji_like_sync(
         self, message_id: Union[str, int], emoji_id: Union[str, int], set: bool = True
     ) -> None:
-        return run_coroutine(self.set_msg_emoji_like, message_id, emoji_id, set)
+        return loop_bridge.run(self.set_msg_emoji_like, message_id, emoji_id, set)
 
     def send_forward_msg_sync(
         self,
@@ -929,7 +1020,7 @@ class MessageAPI(BaseAPI):
         summary: Optional[str] = None,
         source: Optional[str] = None,
     ) -> str:
-        return run_coroutine(
+        return loop_bridge.run(
             self.send_forward_msg,
             group_id,
             user_id,
@@ -946,17 +1037,17 @@ class MessageAPI(BaseAPI):
         user_id: Optional[Union[str, int]] = None,
         msg: Optional[Forward] = None,
     ):
-        return run_coroutine(self.post_forward_msg, group_id, user_id, msg)
+        return loop_bridge.run(self.post_forward_msg, group_id, user_id, msg)
 
     def post_group_forward_msg_sync(
         self, group_id: Union[str, int], forward: Forward
     ) -> str:
-        return run_coroutine(self.post_group_forward_msg, group_id, forward)
+        return loop_bridge.run(self.post_group_forward_msg, group_id, forward)
 
     def post_private_forward_msg_sync(
         self, user_id: Union[str, int], forward: Forward
     ) -> str:
-        return run_coroutine(self.post_private_forward_msg, user_id, forward)
+        return loop_bridge.run(self.post_private_forward_msg, user_id, forward)
 
     def get_group_msg_history_sync(
         self,
@@ -965,15 +1056,15 @@ class MessageAPI(BaseAPI):
         number: int = 20,
         reverseOrder: bool = False,
     ) -> List[GroupMessageEvent]:
-        return run_coroutine(
+        return loop_bridge.run(
             self.get_group_msg_history, group_id, message_seq, number, reverseOrder
         )
 
     def get_msg_sync(self, message_id: Union[str, int]) -> BaseMessageEvent:
-        return run_coroutine(self.get_msg, message_id)
+        return loop_bridge.run(self.get_msg, message_id)
 
     def get_forward_msg_sync(self, message_id: Union[str, int]) -> Forward:
-        return run_coroutine(self.get_forward_msg, message_id)
+        return loop_bridge.run(self.get_forward_msg, message_id)
 
     def get_friend_msg_history_sync(
         self,
@@ -982,7 +1073,7 @@ class MessageAPI(BaseAPI):
         number: int = 20,
         reverseOrder: bool = False,
     ) -> List[PrivateMessageEvent]:
-        return run_coroutine(
+        return loop_bridge.run(
             self.get_friend_msg_history, user_id, message_seq, number, reverseOrder
         )
 
@@ -994,10 +1085,10 @@ class MessageAPI(BaseAPI):
             "mp3", "amr", "wma", "m4a", "ogg", "wav", "flac", "spx"
         ] = "mp3",
     ) -> Record:
-        return run_coroutine(self.get_record, file, file_id, out_format)
+        return loop_bridge.run(self.get_record, file, file_id, out_format)
 
     def get_image_sync(self, file: str = None, file_id: str = None) -> Image:
-        return run_coroutine(self.get_image, file, file_id)
+        return loop_bridge.run(self.get_image, file, file_id)
 
     def fetch_emoji_like_sync(
         self,
@@ -1005,4 +1096,4 @@ class MessageAPI(BaseAPI):
         emoji_id: Union[str, int],
         emoji_type: Union[str, int],
     ) -> dict:
-        return run_coroutine(self.fetch_emoji_like, message_id, emoji_id, emoji_type)
+        return loop_bridge.run(self.fetch_emoji_like, message_id, emoji_id, emoji_type)
@@ -1,6 +1,6 @@
 from typing import Union
 from .utils import BaseAPI, APIReturnStatus
-from ncatbot.utils import run_coroutine
+from ncatbot.utils import loop_bridge
 
 
 class PrivateAPI(BaseAPI):
@@ -66,10 +66,10 @@ class PrivateAPI(BaseAPI):
     def upload_private_file_sync(
         self, user_id: Union[str, int], file: str, name: str
     ) -> None:
-        return run_coroutine(self.upload_private_file, user_id, file, name)
+        return loop_bridge.run(self.upload_private_file, user_id, file, name)
 
     def get_private_file_url_sync(self, file_id: str) -> str:
-        return run_coroutine(self.get_private_file_url, file_id)
+        return loop_bridge.run(self.get_private_file_url, file_id)
 
     def post_private_file_sync(
         self,
@@ -79,9 +79,9 @@ class PrivateAPI(BaseAPI):
         video: str = None,
         file: str = None,
     ) -> str:
-        return run_coroutine(
+        return loop_bridge.run(
             self.post_private_file, user_id, image, record, video, file
         )
 
     def set_input_status_sync(self, event_type: int, user_id: Union[str, int]) -> None:
-        return run_coroutine(self.set_input_status, event_type, user_id)
+        return loop_bridge.run(self.set_input_status, event_type, user_id)
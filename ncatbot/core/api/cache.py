@@ -0,0 +1,214 @@
+"""查询类 API 的读穿透缓存
+
+插件几乎在每条消息里都会查询群信息、群成员、好友列表等, 每次都是一次完整的
+NapCat 往返. 开启缓存后, 这些查询的原始返回值按接口设置的 TTL 缓存:
+- 并发的相同请求只发送一次
+- 群成员变动、管理员变动、群名片变动等通知事件到达时自动失效
+- 通过本 Bot 修改群名片、管理员等接口调用成功后自动失效
+
+缓存的是 NapCat 的原始返回, 命中和合并的请求都得到一份深拷贝,
+调用方修改返回值不会影响缓存.
+"""
+
+import asyncio
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from ncatbot.utils import get_log
+
+LOG = get_log("APICache")
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+# 默认缓存的接口及其 TTL(秒)
+DEFAULT_TTL: Dict[str, float] = {
+    "/get_login_info": 3600,
+    "/get_stranger_info": 600,
+    "/get_friend_list": 300,
+    "/get_group_info": 300,
+    "/get_group_member_info": 60,
+    "/get_group_member_list": 60,
+}
+
+# 修改类接口调用成功后需要失效的缓存: 接口 -> 影响范围
+_MUTATIONS: Dict[str, str] = {
+    "/set_group_card": "member",
+    "/set_group_admin": "member",
+    "/set_group_special_title": "member",
+    "/set_group_kick": "member",
+    "/set_group_name": "group",
+    "/delete_friend": "friend",
+}
+
+
+def _make_key(path: str, params: Optional[dict]) -> CacheKey:
+    if not params:
+        return path, ()
+    return path, tuple(sorted((k, str(v)) for k, v in params.items()))
+
+
+class _EndpointStats:
+    __slots__ = ("hits", "misses", "coalesced", "invalidations")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class APICache:
+    """API 调用缓存, 包装 BotAPI 的 async_callback
+
+    Args:
+        callback: 原始的 async_callback
+        ttl: 接口 -> TTL(秒), 与默认值合并, TTL 为 0 或 None 表示不缓存该接口
+        max_entries: 最多缓存的条目数, 超出时淘汰最久未使用的条目
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[str, dict], Awaitable[dict]],
+        ttl: Optional[Dict[str, Optional[float]]] = None,
+        max_entries: int = 4096,
+    ):
+        self.callback = callback
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Tuple[float, dict]]" = OrderedDict()
+        self._inflight: Dict[
+            CacheKey, Tuple[asyncio.AbstractEventLoop, asyncio.Future]
+        ] = {}
+        self._stats: Dict[str, _EndpointStats] = {}
+        # 请求期间被失效的键, 请求完成后不写入缓存
+        self._stale: Set[CacheKey] = set()
+
+    def _stat(self, path: str) -> _EndpointStats:
+        stat = self._stats.get(path)
+        if stat is None:
+            stat = self._stats[path] = _EndpointStats()
+        return stat
+
+    # -------------------
+    # region 调用
+    # -------------------
+
+    async def call(self, path: str, params: dict = None) -> Any:
+        """替代 async_callback 的调用入口"""
+        ttl = self.ttl.get(path)
+        if not ttl:
+            result = await self.callback(path, params)
+            scope = _MUTATIONS.get(path)
+            if scope is not None and params and result.get("retcode") == 0:
+                self._invalidate_scope(scope, params)
+            return result
+
+        key = _make_key(path, params)
+        stat = self._stat(path)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                stat.hits += 1
+                return copy.deepcopy(entry[1])
+            del self._entries[key]
+
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[0] is loop:
+            stat.coalesced += 1
+            return copy.deepcopy(await asyncio.shield(inflight[1]))
+
+        stat.misses += 1
+        future = loop.create_future()
+        self._inflight[key] = (loop, future)
+        try:
+            result = await self.callback(path, params)
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有其它等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key, (None, None))[1] is future:
+                del self._inflight[key]
+            stale = key in self._stale
+            self._stale.discard(key)
+        # 缓存和等待者共用的副本, 不交给任何调用方, 第一个调用方修改 result 也不影响它
+        shared = copy.deepcopy(result)
+        future.set_result(shared)
+        # 失败的返回不缓存
+        if not stale and result.get("retcode") == 0:
+            self._store(key, ttl, shared)
+        return result
+
+    def _store(self, key: CacheKey, ttl: float, result: dict):
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # -------------------
+    # region 失效
+    # -------------------
+
+    def invalidate(self, path: str, **params):
+        """使某个接口某组参数的缓存失效, 例如 invalidate("/get_group_info", group_id=123)"""
+        key = _make_key(path, params)
+        removed = self._entries.pop(key, None) is not None
+        if key in self._inflight:
+            # 进行中的请求可能拿到旧数据, 完成后不再写入缓存
+            self._stale.add(key)
+            removed = True
+        if removed:
+            LOG.debug(f"缓存失效: {path} {params}")
+            self._stat(path).invalidations += 1
+
+    def invalidate_member(self, group_id, user_id):
+        """群成员信息变化"""
+        self.invalidate("/get_group_member_info", group_id=group_id, user_id=user_id)
+        self.invalidate("/get_group_member_list", group_id=group_id)
+
+    def invalidate_group(self, group_id):
+        """群信息变化"""
+        self.invalidate("/get_group_info", group_id=group_id)
+
+    def _invalidate_scope(self, scope: str, params: dict):
+        if scope == "member":
+            self.invalidate_member(params.get("group_id"), params.get("user_id"))
+        elif scope == "group":
+            self.invalidate_group(params.get("group_id"))
+        elif scope == "friend":
+            self.invalidate("/get_friend_list")
+
+    def on_notice(self, event):
+        """根据通知事件使相关缓存失效"""
+        notice_type = event.notice_type
+        if notice_type in ("group_increase", "group_decrease"):
+            self.invalidate_member(event.group_id, event.user_id)
+            # 成员数变化
+            self.invalidate_group(event.group_id)
+        elif notice_type in ("group_admin", "group_card"):
+            self.invalidate_member(event.group_id, event.user_id)
+        elif notice_type == "friend_add":
+            self.invalidate("/get_friend_list")
+
+    def clear(self):
+        self._entries.clear()
+
+    # -------------------
+    # region 统计
+    # -------------------
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """各接口的命中、未命中、合并请求和失效次数"""
+        return {path: stat.to_dict() for path, stat in self._stats.items()}
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,151 @@
+"""出站消息合并
+
+插件经常在短时间内向同一个群连续发送多条短消息(进度、分段回答), 每条都是一次
+send_group_msg 往返, 也更容易触发风控. 开启合并后, 发往同一目标的消息在窗口期内
+合并为一条发送:
+- 只能单独发送的消息段(语音、视频、合并转发等)不参与合并, 单独发送
+- 回复消息段只能位于消息开头, 带回复的消息总是开始新的一批
+- 同一目标的各批按提交顺序发送
+- 每个调用者等待到合并后消息的 message_id
+"""
+
+import asyncio
+from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Tuple, Union
+
+from ncatbot.utils import get_log
+from .api_message import SINGLE_MSG_ONLY, _validate_msg
+
+if TYPE_CHECKING:
+    from ncatbot.core.event.message_segment.message_array import MessageArray
+    from .api import BotAPI
+
+LOG = get_log("MessageCoalescer")
+
+TargetKind = Literal["group", "private"]
+TargetKey = Tuple[str, str]
+
+
+class _Batch:
+    __slots__ = ("loop", "segments", "futures", "handle")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, segments: List[dict]):
+        self.loop = loop
+        self.segments = segments
+        self.futures: List[asyncio.Future] = []
+        self.handle: Optional[asyncio.TimerHandle] = None
+
+
+class MessageCoalescer:
+    """按会话合并出站消息
+
+    Args:
+        api: BotAPI 实例
+        window: 合并窗口(秒), 从一批的第一条消息开始计时
+        max_messages: 一批最多合并的消息数
+        separator: 相邻消息之间插入的文本, 为空时直接拼接
+    """
+
+    def __init__(
+        self,
+        api: "BotAPI",
+        window: float = 0.3,
+        max_messages: int = 10,
+        separator: str = "\n",
+    ):
+        self.api = api
+        self.window = window
+        self.max_messages = max_messages
+        self.separator = separator
+        self._batches: Dict[TargetKey, _Batch] = {}
+        # 每个目标最后一次发送的任务, 下一批等它完成后再发送
+        self._tails: Dict[TargetKey, asyncio.Task] = {}
+        self.submitted = 0
+        self.sent = 0
+
+    async def submit(
+        self, kind: TargetKind, target: Union[str, int], msg: "MessageArray"
+    ) -> str:
+        """提交一条消息, 返回合并后消息的 message_id"""
+        loop = asyncio.get_running_loop()
+        key = (kind, str(target))
+        segments = msg.to_list()
+        future = loop.create_future()
+        self.submitted += 1
+
+        batch = self._batches.get(key)
+        if batch is not None and (
+            batch.loop is not loop or not self._can_merge(batch, segments)
+        ):
+            self._flush(key)
+            batch = None
+        if batch is None:
+            # to_list() 返回的是消息共享的缓存, 后续合并会追加消息段, 必须复制
+            batch = self._batches[key] = _Batch(loop, list(segments))
+            batch.handle = loop.call_later(self.window, self._flush, key)
+        else:
+            if self.separator:
+                batch.segments.append(
+                    {"type": "text", "data": {"text": self.separator}}
+                )
+            batch.segments.extend(segments)
+        batch.futures.append(future)
+
+        if len(batch.futures) >= self.max_messages or any(
+            seg["type"] in SINGLE_MSG_ONLY for seg in segments
+        ):
+            self._flush(key)
+        return await future
+
+    @staticmethod
+    def _can_merge(batch: _Batch, segments: List[dict]) -> bool:
+        if not segments or any(seg["type"] == "reply" for seg in segments):
+            return False
+        return _validate_msg(batch.segments + segments) == "OK"
+
+    def _flush(self, key: TargetKey):
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+        batch.handle.cancel()
+        previous = self._tails.get(key)
+        task = batch.loop.create_task(self._send(key, batch, previous))
+        self._tails[key] = task
+
+    async def _send(
+        self, key: TargetKey, batch: _Batch, previous: Optional[asyncio.Task]
+    ):
+        if previous is not None and previous.get_loop() is batch.loop:
+            await asyncio.wait([previous])
+        kind, target = key
+        self.sent += 1
+        try:
+            if kind == "group":
+                message_id = await self.api.send_group_msg(target, batch.segments)
+            else:
+                message_id = await self.api.send_private_msg(target, batch.segments)
+        except BaseException as e:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+        else:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_result(message_id)
+        finally:
+            if self._tails.get(key) is asyncio.current_task():
+                del self._tails[key]
+
+    def flush_all(self):
+        """立即发送所有等待中的消息"""
+        for key in list(self._batches):
+            self._flush(key)
+
+    def stats(self) -> Dict[str, int]:
+        """提交的消息数、实际发送的消息数和等待合并的会话数"""
+        return {
+            "submitted": self.submitted,
+            "sent": self.sent,
+            "pending": len(self._batches),
+        }
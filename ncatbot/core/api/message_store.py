@@ -0,0 +1,420 @@
+"""本地消息存储
+
+回复相关的插件会对每条被引用的消息调用 get_msg, 展开合并转发会调用 get_forward_msg,
+而这些消息 Bot 在收到事件时已经见过. 开启消息存储后:
+- 收到的消息事件按天追加写入日志文件(每行一条 JSON), sqlite 中只保存索引
+- 写入在后台线程中批量进行, 事件循环只做一次入队
+- get_msg / get_forward_msg 先查本地, 未命中时再请求 NapCat
+- 按保留天数整段删除日志, 可以限制索引的条数
+"""
+
+import asyncio
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+from ncatbot.utils import get_log
+
+LOG = get_log("MessageStore")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    message_id TEXT PRIMARY KEY,
+    group_id TEXT,
+    user_id TEXT,
+    time INTEGER,
+    segment TEXT,
+    offset INTEGER,
+    length INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_messages_group_user
+    ON messages (group_id, user_id, time);
+CREATE INDEX IF NOT EXISTS idx_messages_time ON messages (time);
+CREATE TABLE IF NOT EXISTS forwards (
+    forward_id TEXT PRIMARY KEY,
+    message_id TEXT
+);
+"""
+
+_STOP = object()
+_FLUSH = object()
+
+
+def _forward_ids(raw: dict) -> List[str]:
+    """消息中带有完整内容的合并转发 id"""
+    message = raw.get("message")
+    if not isinstance(message, list):
+        return []
+    return [
+        str(seg["data"]["id"])
+        for seg in message
+        if seg.get("type") == "forward"
+        and seg.get("data", {}).get("content") is not None
+    ]
+
+
+class MessageStore:
+    """消息存储
+
+    Args:
+        path: 存储目录, 日志在 path/log 下, 索引为 path/index.sqlite3
+        retention_days: 保留天数, 按天删除整个日志文件
+        max_messages: 索引最多保留的消息条数, None 表示不限制
+        batch_size: 一批最多写入的消息数
+        flush_interval: 未满一批时最多等待的时间(秒)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        retention_days: float = 7,
+        max_messages: Optional[int] = None,
+        batch_size: int = 512,
+        flush_interval: float = 0.5,
+    ):
+        self.path = path
+        self.log_dir = os.path.join(path, "log")
+        self.retention_days = retention_days
+        self.max_messages = max_messages
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        os.makedirs(self.log_dir, exist_ok=True)
+
+        self._db_path = os.path.join(path, "index.sqlite3")
+        with sqlite3.connect(self._db_path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        self._local = threading.local()
+
+        # 已入队但还没有写入索引的消息, 查询时直接返回
+        self._pending: Dict[str, dict] = {}
+        self._pending_forwards: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self.written = 0
+        self._writer = threading.Thread(
+            target=self._write_loop, name="MessageStoreWriter", daemon=True
+        )
+        self._writer.start()
+
+    # -------------------
+    # region 写入
+    # -------------------
+
+    def append(self, raw: dict):
+        """记录一条消息事件的原始数据, 不阻塞"""
+        message_id = raw.get("message_id")
+        if message_id is None:
+            return
+        message_id = str(message_id)
+        with self._lock:
+            self._pending[message_id] = raw
+            for forward_id in _forward_ids(raw):
+                self._pending_forwards[forward_id] = message_id
+        self._queue.put(raw)
+
+    def flush(self):
+        """立即写入已入队的消息并等待完成"""
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self):
+        """写完剩余消息后停止写入线程"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    def _write_loop(self):
+        conn = sqlite3.connect(self._db_path)
+        segment, file = None, None
+        last_prune = 0.0
+        try:
+            while True:
+                item = self._queue.get()
+                batch = [item]
+                deadline = time.monotonic() + self.flush_interval
+                while item not in (_STOP, _FLUSH) and len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get(
+                            timeout=max(0, deadline - time.monotonic())
+                        )
+                    except queue.Empty:
+                        break
+                    batch.append(item)
+                stop = batch[-1] is _STOP
+                records = [raw for raw in batch if raw not in (_STOP, _FLUSH)]
+                try:
+                    if records:
+                        segment, file = self._write_batch(conn, records, segment, file)
+                    if time.monotonic() - last_prune > 60:
+                        last_prune = time.monotonic()
+                        self._prune(conn)
+                except Exception as e:
+                    LOG.error(f"写入消息存储失败: {e}")
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            if file is not None:
+                file.close()
+            conn.close()
+
+    def _write_batch(
+        self, conn: sqlite3.Connection, records: List[dict], segment, file
+    ):
+        rows = []
+        forwards = []
+        for raw in records:
+            name = time.strftime("%Y%m%d", time.localtime(raw.get("time") or None))
+            if name != segment:
+                if file is not None:
+                    file.close()
+                segment = name
+                file = open(os.path.join(self.log_dir, f"{name}.jsonl"), "ab")
+            line = json.dumps(raw, ensure_ascii=False).encode("utf-8") + b"\n"
+            offset = file.tell()
+            file.write(line)
+            message_id = str(raw.get("message_id"))
+            group_id = raw.get("group_id")
+            rows.append(
+                (
+                    message_id,
+                    None if group_id is None else str(group_id),
+                    str(raw.get("user_id")),
+                    int(raw.get("time") or 0),
+                    segment,
+                    offset,
+                    len(line),
+                )
+            )
+            forwards.extend((fid, message_id) for fid in _forward_ids(raw))
+        file.flush()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            if forwards:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO forwards VALUES (?, ?)", forwards
+                )
+        with self._lock:
+            for raw in records:
+                message_id = str(raw.get("message_id"))
+                if self._pending.get(message_id) is raw:
+                    del self._pending[message_id]
+                for forward_id in _forward_ids(raw):
+                    if self._pending_forwards.get(forward_id) == message_id:
+                        del self._pending_forwards[forward_id]
+        self.written += len(records)
+        return segment, file
+
+    def prune(self):
+        """删除过期的日志文件和超出条数上限的索引, 写入线程每分钟自动执行一次"""
+        self._prune(self._conn())
+
+    def _prune(self, conn: sqlite3.Connection):
+        cutoff = time.strftime(
+            "%Y%m%d", time.localtime(time.time() - self.retention_days * 86400)
+        )
+        expired = [
+            name[: -len(".jsonl")]
+            for name in os.listdir(self.log_dir)
+            if name.endswith(".jsonl") and name[: -len(".jsonl")] < cutoff
+        ]
+        with conn:
+            for segment in expired:
+                conn.execute(
+                    "DELETE FROM forwards WHERE message_id IN "
+                    "(SELECT message_id FROM messages WHERE segment = ?)",
+                    (segment,),
+                )
+                conn.execute("DELETE FROM messages WHERE segment = ?", (segment,))
+            if self.max_messages is not None:
+                conn.execute(
+                    "DELETE FROM messages WHERE message_id IN (SELECT message_id "
+                    "FROM messages ORDER BY time DESC LIMIT -1 OFFSET ?)",
+                    (self.max_messages,),
+                )
+                conn.execute(
+                    "DELETE FROM forwards WHERE message_id NOT IN "
+                    "(SELECT message_id FROM messages)"
+                )
+        for segment in expired:
+            try:
+                os.remove(os.path.join(self.log_dir, f"{segment}.jsonl"))
+            except OSError as e:
+                # Windows 下写入线程仍打开着该文件时无法删除, 下次再删
+                LOG.debug(f"删除过期的消息日志 {segment} 失败: {e}")
+            else:
+                LOG.debug(f"已删除过期的消息日志: {segment}")
+
+    # -------------------
+    # region 查询
+    # -------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self._db_path)
+        return conn
+
+    def _read(self, segment: str, offset: int, length: int) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.log_dir, f"{segment}.jsonl"), "rb") as f:
+                f.seek(offset)
+                return json.loads(f.read(length))
+        except (OSError, ValueError):
+            return None
+
+    def _read_rows(self, rows: List[Tuple[str, int, int]]) -> List[dict]:
+        """按顺序读取多条消息, 每个日志文件只打开一次"""
+        result = []
+        files = {}
+        try:
+            for segment, offset, length in rows:
+                f = files.get(segment)
+                if f is None:
+                    try:
+                        f = open(os.path.join(self.log_dir, f"{segment}.jsonl"), "rb")
+                    except OSError:
+                        continue
+                    files[segment] = f
+                f.seek(offset)
+                try:
+                    result.append(json.loads(f.read(length)))
+                except ValueError:
+                    continue
+        finally:
+            for f in files.values():
+                f.close()
+        return result
+
+    def get_sync(self, message_id: Union[str, int]) -> Optional[dict]:
+        """按 message_id 查询消息的原始数据"""
+        message_id = str(message_id)
+        with self._lock:
+            raw = self._pending.get(message_id)
+        if raw is not None:
+            return raw
+        row = (
+            self._conn()
+            .execute(
+                "SELECT segment, offset, length FROM messages WHERE message_id = ?",
+                (message_id,),
+            )
+            .fetchone()
+        )
+        return None if row is None else self._read(*row)
+
+    def get_forward_sync(self, forward_id: Union[str, int]) -> Optional[List[dict]]:
+        """查询合并转发的内容(消息事件的原始数据列表)"""
+        forward_id = str(forward_id)
+        with self._lock:
+            message_id = self._pending_forwards.get(forward_id)
+        if message_id is None:
+            row = (
+                self._conn()
+                .execute(
+                    "SELECT message_id FROM forwards WHERE forward_id = ?",
+                    (forward_id,),
+                )
+                .fetchone()
+            )
+            if row is None:
+                return None
+            message_id = row[0]
+        raw = self.get_sync(message_id)
+        if raw is None:
+            return None
+        for seg in raw.get("message") or []:
+            data = seg.get("data", {})
+            if seg.get("type") == "forward" and str(data.get("id")) == forward_id:
+                return data.get("content")
+        return None
+
+    def recent_sync(
+        self,
+        group_id: Union[str, int, None] = None,
+        user_id: Union[str, int, None] = None,
+        limit: int = 20,
+        before: Optional[int] = None,
+    ) -> List[dict]:
+        """按时间从新到旧查询消息, group_id 和 user_id 都为空时查询所有消息
+
+        Args:
+            group_id: 群号
+            user_id: 发送者 QQ 号
+            limit: 最多返回的条数
+            before: 只返回该时间戳之前(不含)的消息
+        """
+        conditions, params = [], []
+        if group_id is not None:
+            conditions.append("group_id = ?")
+            params.append(str(group_id))
+        if user_id is not None:
+            conditions.append("user_id = ?")
+            params.append(str(user_id))
+        if before is not None:
+            conditions.append("time < ?")
+            params.append(before)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = (
+            self._conn()
+            .execute(
+                f"SELECT segment, offset, length FROM messages {where} "
+                "ORDER BY time DESC LIMIT ?",
+                (*params, limit),
+            )
+            .fetchall()
+        )
+        result = self._read_rows(rows)
+
+        with self._lock:
+            pending = [
+                raw
+                for raw in self._pending.values()
+                if (group_id is None or str(raw.get("group_id")) == str(group_id))
+                and (user_id is None or str(raw.get("user_id")) == str(user_id))
+                and (before is None or (raw.get("time") or 0) < before)
+            ]
+        if pending:
+            seen = {str(raw.get("message_id")) for raw in pending}
+            result = pending + [
+                raw for raw in result if str(raw.get("message_id")) not in seen
+            ]
+            result.sort(key=lambda raw: raw.get("time") or 0, reverse=True)
+        return result[:limit]
+
+    async def get(self, message_id: Union[str, int]) -> Optional[dict]:
+        return await asyncio.to_thread(self.get_sync, message_id)
+
+    async def get_forward(self, forward_id: Union[str, int]) -> Optional[List[dict]]:
+        return await asyncio.to_thread(self.get_forward_sync, forward_id)
+
+    async def recent(
+        self,
+        group_id: Union[str, int, None] = None,
+        user_id: Union[str, int, None] = None,
+        limit: int = 20,
+        before: Optional[int] = None,
+    ) -> List[dict]:
+        """见 recent_sync"""
+        return await asyncio.to_thread(
+            self.recent_sync, group_id, user_id, limit, before
+        )
+
+    def count(self) -> int:
+        """已写入索引的消息条数"""
+        return self._conn().execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """已写入和等待写入的消息数"""
+        with self._lock:
+            pending = len(self._pending)
+        return {"written": self.written, "pending": pending}
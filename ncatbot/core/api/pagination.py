@@ -0,0 +1,321 @@
+"""消息历史和群文件的异步分页迭代
+
+get_group_msg_history 等接口一次只返回一页, 并且把每条消息都构造成完整的事件对象.
+这里的迭代器逐页拉取:
+- 处理当前页时, 后台已经在请求下一页
+- 产出轻量的原始记录, 需要时再转换为事件对象
+- 通过 cursor 记录进度, 中断后可以从 cursor 继续
+"""
+
+import asyncio
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+from ncatbot.utils import get_log
+from .utils import APIReturnStatus
+
+if TYPE_CHECKING:
+    from ncatbot.core.event import BaseMessageEvent
+    from .utils import BaseAPI
+
+LOG = get_log("Pagination")
+
+
+def _seq(raw: dict) -> int:
+    seq = raw.get("message_seq")
+    if seq is None:
+        seq = raw.get("real_seq", 0)
+    return int(seq)
+
+
+class MessageRecord:
+    """历史消息的原始记录, to_event() 时才构造事件对象"""
+
+    __slots__ = ("raw", "_event_cls", "_event")
+
+    def __init__(self, raw: dict, event_cls: Type["BaseMessageEvent"]):
+        self.raw = raw
+        self._event_cls = event_cls
+        self._event = None
+
+    @property
+    def message_id(self) -> str:
+        return str(self.raw.get("message_id"))
+
+    @property
+    def message_seq(self) -> int:
+        return _seq(self.raw)
+
+    @property
+    def time(self) -> int:
+        return self.raw.get("time", 0)
+
+    @property
+    def user_id(self) -> str:
+        return str(self.raw.get("user_id"))
+
+    def to_event(self) -> "BaseMessageEvent":
+        if self._event is None:
+            self._event = self._event_cls(self.raw)
+        return self._event
+
+    def __repr__(self):
+        return f"MessageRecord(message_id={self.message_id}, message_seq={self.message_seq})"
+
+
+class MessageHistoryIterator:
+    """从新到旧遍历消息历史
+
+    Args:
+        api: BotAPI 实例
+        path: 接口路径
+        params: 除 message_seq 和 count 外的请求参数
+        event_cls: to_event() 构造的事件类型
+        start_seq: 从该 seq 之前(不含)开始, None 表示从最新消息开始. 传入上次的 cursor 即可续传
+        page_size: 每页条数
+        limit: 最多产出的条数
+        prefetch: 是否在处理当前页时预取下一页
+    """
+
+    def __init__(
+        self,
+        api: "BaseAPI",
+        path: str,
+        params: dict,
+        event_cls: Type["BaseMessageEvent"],
+        start_seq: Optional[Union[str, int]] = None,
+        page_size: int = 20,
+        limit: Optional[int] = None,
+        prefetch: bool = True,
+    ):
+        self.api = api
+        self.path = path
+        self.params = params
+        self.event_cls = event_cls
+        self.page_size = page_size
+        self.limit = limit
+        self.prefetch = prefetch
+        self._page_seq: Optional[int] = None if start_seq is None else int(start_seq)
+        self._cursor = self._page_seq
+        self._buffer: Deque[MessageRecord] = deque()
+        self._prefetch_task: Optional[asyncio.Task] = None
+        self._count = 0
+        self._done = False
+
+    @property
+    def cursor(self) -> Optional[int]:
+        """最后产出的消息 seq, 作为 start_seq 传入即可从下一条继续"""
+        return self._cursor
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> MessageRecord:
+        if self.limit is not None and self._count >= self.limit:
+            await self.aclose()
+            raise StopAsyncIteration
+        while not self._buffer:
+            if self._done:
+                raise StopAsyncIteration
+            await self._next_page()
+        record = self._buffer.popleft()
+        self._cursor = record.message_seq
+        self._count += 1
+        return record
+
+    async def _fetch(self, seq: Optional[int]) -> List[dict]:
+        params = dict(self.params, count=self.page_size)
+        if seq is not None:
+            # 返回的消息包含 seq 本身, 多取一条才能保证有更早的消息时不会整页都在边界上
+            params.update(message_seq=seq, count=self.page_size + 1)
+        result = await self.api.async_callback(self.path, params)
+        return APIReturnStatus(result).data.get("messages") or []
+
+    async def _next_page(self):
+        task = self._prefetch_task or asyncio.ensure_future(self._fetch(self._page_seq))
+        self._prefetch_task = None
+        messages = await task
+
+        boundary = self._page_seq
+        records = [
+            MessageRecord(raw, self.event_cls)
+            for raw in messages
+            if boundary is None or _seq(raw) < boundary
+        ]
+        if not records:
+            self._done = True
+            return
+        records.sort(key=lambda r: r.message_seq, reverse=True)
+        self._page_seq = records[-1].message_seq
+        self._buffer.extend(records)
+        if self.prefetch:
+            self._prefetch_task = asyncio.ensure_future(self._fetch(self._page_seq))
+
+    async def aclose(self):
+        """停止迭代, 取消进行中的预取"""
+        self._done = True
+        self._buffer.clear()
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+            try:
+                await self._prefetch_task
+            except BaseException:
+                pass
+            self._prefetch_task = None
+
+    async def to_list(self) -> List[MessageRecord]:
+        return [record async for record in self]
+
+
+class GroupFileEntry:
+    """群文件的原始记录, folder_path 为所在目录的路径"""
+
+    __slots__ = ("raw", "folder_path")
+
+    def __init__(self, raw: dict, folder_path: str):
+        self.raw = raw
+        self.folder_path = folder_path
+
+    @property
+    def file_id(self) -> str:
+        return self.raw.get("file_id")
+
+    @property
+    def file_name(self) -> str:
+        return self.raw.get("file_name")
+
+    @property
+    def size(self) -> int:
+        return self.raw.get("size", self.raw.get("file_size", 0))
+
+    @property
+    def path(self) -> str:
+        return f"{self.folder_path.rstrip('/')}/{self.file_name}"
+
+    def __repr__(self):
+        return f"GroupFileEntry(path={self.path!r}, file_id={self.file_id!r})"
+
+
+# (folder_id, 目录路径), folder_id 为 None 表示根目录
+FolderCursor = Tuple[Optional[str], str]
+
+
+class GroupFileWalker:
+    """遍历群文件目录树, 多个目录并发拉取
+
+    Args:
+        api: BotAPI 实例
+        group_id: 群号
+        folder_id: 起始目录, None 表示根目录
+        file_count: 每个目录最多获取的文件数
+        concurrency: 同时拉取的目录数
+        cursor: 上次遍历的 cursor, 传入后从未完成的目录继续
+    """
+
+    def __init__(
+        self,
+        api: "BaseAPI",
+        group_id: Union[str, int],
+        folder_id: Optional[str] = None,
+        file_count: int = 500,
+        concurrency: int = 4,
+        cursor: Optional[List[FolderCursor]] = None,
+    ):
+        self.api = api
+        self.group_id = group_id
+        self.file_count = file_count
+        self.concurrency = concurrency
+        self._pending: Deque[FolderCursor] = deque(
+            cursor if cursor is not None else [(folder_id, "/")]
+        )
+        self._running: Dict[asyncio.Task, FolderCursor] = {}
+        self._unfinished: Set[FolderCursor] = set(self._pending)
+        self._current: Optional[FolderCursor] = None
+        self._buffer: Deque[GroupFileEntry] = deque()
+
+    @property
+    def cursor(self) -> List[FolderCursor]:
+        """尚未遍历完的目录, 续传时以目录为单位, 中断时正在产出的目录会重新产出"""
+        folders = list(self._unfinished)
+        if self._current is not None and self._current not in folders:
+            folders.append(self._current)
+        return folders
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> GroupFileEntry:
+        while not self._buffer:
+            if self._current is not None:
+                self._unfinished.discard(self._current)
+                self._current = None
+            self._schedule()
+            if not self._running:
+                raise StopAsyncIteration
+            done, _ = await asyncio.wait(
+                self._running, return_when=asyncio.FIRST_COMPLETED
+            )
+            task = done.pop()
+            folder = self._running.pop(task)
+            try:
+                files, folders = task.result()
+            except BaseException:
+                # 失败的目录保留在 cursor 中, 其余请求不再需要
+                await self._cancel_running()
+                raise
+            for sub in folders:
+                name = sub.get("folder_name", "")
+                child = (sub.get("folder_id"), f"{folder[1].rstrip('/')}/{name}")
+                self._pending.append(child)
+                self._unfinished.add(child)
+            self._current = folder
+            self._buffer.extend(GroupFileEntry(raw, folder[1]) for raw in files)
+        return self._buffer.popleft()
+
+    def _schedule(self):
+        while self._pending and len(self._running) < self.concurrency:
+            folder = self._pending.popleft()
+            task = asyncio.ensure_future(self._fetch(folder[0]))
+            self._running[task] = folder
+
+    async def _fetch(self, folder_id: Optional[str]) -> Tuple[List[dict], List[dict]]:
+        if folder_id is None:
+            path = "/get_group_root_files"
+            params = {"group_id": self.group_id, "file_count": self.file_count}
+        else:
+            path = "/get_group_files_by_folder"
+            params = {
+                "group_id": self.group_id,
+                "folder_id": folder_id,
+                "file_count": self.file_count,
+            }
+        result = await self.api.async_callback(path, params)
+        data = APIReturnStatus(result).data or {}
+        return data.get("files") or [], data.get("folders") or []
+
+    async def _cancel_running(self):
+        for task in self._running:
+            task.cancel()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        # 被取消的目录保留在 cursor 中
+        self._running.clear()
+
+    async def aclose(self):
+        """停止遍历, 取消进行中的请求"""
+        await self._cancel_running()
+        self._pending.clear()
+        self._buffer.clear()
+
+    async def to_list(self) -> List[GroupFileEntry]:
+        return [entry async for entry in self]
@@ -0,0 +1,245 @@
+"""API 调用的超时、重试和熔断策略
+
+Adapter.send 默认等待 300 秒且不重试, NapCat 短暂卡住时所有处理器都会挂起.
+CallPolicy 位于发送之前:
+- 每个接口有总超时预算, 重试也计算在内
+- 查询类接口(get_*)失败后按指数退避重试, 发送等非幂等接口不重试
+- NapCat 连续出错时熔断, 在恢复前直接失败而不是排队等待超时
+
+只有发送过程本身的异常(超时、连接断开)计为失败, NapCat 正常返回的错误码不重试也不计入熔断.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Literal, Tuple
+
+from ncatbot.utils import get_log, NcatBotConnectionError
+from ncatbot.utils.config import APIPolicyConfig
+
+LOG = get_log("CallPolicy")
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+_LONG_RUNNING = ("/get_file", "/get_record", "/get_image")
+
+
+class APITimeoutError(NcatBotConnectionError, TimeoutError):
+    def __init__(self, path: str, timeout: float):
+        super().__init__(f"调用 {path} 超时({timeout:.1f} 秒)")
+
+
+class CircuitOpenError(NcatBotConnectionError):
+    def __init__(self, path: str, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(
+            f"NapCat 错误率过高, 已熔断, {retry_after:.1f} 秒后重试: {path}"
+        )
+
+
+class CircuitBreaker:
+    """按最近 window 次调用的失败比例熔断
+
+    熔断 open_seconds 秒后进入半开状态, 只放行一次试探调用, 成功则恢复, 失败则继续熔断.
+    """
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 10,
+        failure_ratio: float = 0.5,
+        open_seconds: float = 30.0,
+    ):
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.open_seconds = open_seconds
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._state: BreakerState = "closed"
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self):
+        if (
+            self._state == "open"
+            and time.monotonic() >= self._opened_at + self.open_seconds
+        ):
+            self._state = "half_open"
+            self._probing = False
+
+    def allow(self) -> bool:
+        """是否放行本次调用"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == "closed":
+                return True
+            if self._state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release(self):
+        """放行的调用没有结果(如被取消)时调用, 半开状态下交还试探名额"""
+        with self._lock:
+            if self._state == "half_open":
+                self._probing = False
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def record(self, success: bool):
+        with self._lock:
+            if self._state == "half_open":
+                self._probing = False
+                if success:
+                    LOG.info("NapCat 调用恢复正常, 熔断解除")
+                    self._state = "closed"
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+            self._outcomes.append(success)
+            if len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= self.failure_ratio:
+                    self._open()
+
+    def _open(self):
+        if self._state != "open":
+            LOG.warning(f"NapCat 调用错误率过高, 熔断 {self.open_seconds} 秒")
+            self.opened_count += 1
+        self._state = "open"
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._maybe_half_open()
+            calls = len(self._outcomes)
+            return {
+                "state": self._state,
+                "window_calls": calls,
+                "failure_ratio": (
+                    self._outcomes.count(False) / calls if calls else 0.0
+                ),
+                "opened_count": self.opened_count,
+            }
+
+
+class _EndpointStats:
+    __slots__ = ("calls", "retries", "timeouts", "failures", "rejected")
+
+    def __init__(self):
+        self.calls = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.rejected = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class CallPolicy:
+    """按接口应用超时预算、重试和熔断, 包装 BotAPI 的 async_callback
+
+    Args:
+        callback: 实际发送请求的 async_callback
+        config: 策略配置, BotAPI 使用 ncatbot_config.api
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[str, dict], Awaitable[dict]],
+        config: APIPolicyConfig,
+    ):
+        self.callback = callback
+        self.config = config
+        self.breaker = CircuitBreaker(
+            config.breaker_window,
+            config.breaker_min_calls,
+            config.breaker_failure_ratio,
+            config.breaker_open_seconds,
+        )
+        self._stats: Dict[str, _EndpointStats] = {}
+
+    def endpoint_policy(self, path: str) -> Tuple[float, int]:
+        """接口的 (超时预算, 最大重试次数)"""
+        config = self.config
+        if path.startswith("/upload_") or path in _LONG_RUNNING:
+            timeout, retries = config.upload_timeout, 0
+        elif path.startswith("/get_"):
+            timeout, retries = config.read_timeout, config.read_retries
+        else:
+            timeout, retries = config.write_timeout, 0
+        override = config.endpoints.get(path) or {}
+        return (
+            override.get("timeout", timeout),
+            override.get("retries", retries),
+        )
+
+    def _stat(self, path: str) -> _EndpointStats:
+        stat = self._stats.get(path)
+        if stat is None:
+            stat = self._stats[path] = _EndpointStats()
+        return stat
+
+    async def call(self, path: str, params: dict = None) -> dict:
+        """替代 async_callback 的调用入口"""
+        timeout, retries = self.endpoint_policy(path)
+        stat = self._stat(path)
+        stat.calls += 1
+        deadline = time.monotonic() + timeout
+        backoff = self.config.retry_backoff
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                stat.rejected += 1
+                raise CircuitOpenError(path, self.breaker.retry_after())
+            remaining = deadline - time.monotonic()
+            try:
+                result = await asyncio.wait_for(
+                    self.callback(path, params), max(remaining, 0)
+                )
+            except Exception as e:
+                self.breaker.record(False)
+                timed_out = isinstance(e, asyncio.TimeoutError)
+                if timed_out:
+                    stat.timeouts += 1
+                else:
+                    stat.failures += 1
+                remaining = deadline - time.monotonic()
+                if attempt >= retries or remaining <= backoff:
+                    if timed_out:
+                        raise APITimeoutError(path, timeout) from e
+                    raise
+                attempt += 1
+                stat.retries += 1
+                LOG.debug(
+                    f"调用 {path} 失败({e!r}), {backoff:.1f} 秒后第 {attempt} 次重试"
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.config.retry_backoff_max)
+                continue
+            except BaseException:
+                # 被取消等不代表 NapCat 异常, 不计入失败, 但不能一直占着试探名额
+                self.breaker.release()
+                raise
+            self.breaker.record(True)
+            return result
+
+    def stats(self) -> dict:
+        """熔断器状态和各接口的调用、重试、超时、失败和被熔断拒绝的次数"""
+        return {
+            "breaker": self.breaker.stats(),
+            "endpoints": {path: s.to_dict() for path, s in self._stats.items()},
+        }
@@ -0,0 +1,323 @@
+"""群成员名册索引
+
+大群的管理插件经常需要拉取整个群成员列表来查找不活跃成员或管理员.
+RosterStore 为每个群只加载一次成员列表, 之后由通知事件和群消息增量维护.
+
+GroupRoster 按列存储成员的数值字段(array 模块的紧凑数组), 筛选时只扫描需要的列,
+并维护 user_id 和身份的索引, 不为每个成员构造 GroupMemberInfo.
+"""
+
+import asyncio
+import time
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, List, Literal, Optional, Set
+
+from ncatbot.utils import get_log
+from .utils import APIReturnStatus
+
+if TYPE_CHECKING:
+    from .api import BotAPI
+    from .api_group import GroupMemberInfo, GroupMemberList
+
+LOG = get_log("Roster")
+
+Role = Literal["owner", "admin", "member"]
+_ROLES = ("member", "admin", "owner")
+_ROLE_CODES = {role: code for code, role in enumerate(_ROLES)}
+
+
+def _to_int(value, default: int = 0) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _new_member(group_id, user_id, now: int) -> dict:
+    return {
+        "group_id": _to_int(group_id),
+        "user_id": _to_int(user_id),
+        "nickname": "",
+        "card": "",
+        "sex": "unknown",
+        "age": 0,
+        "area": "",
+        "level": "0",
+        "qq_level": 0,
+        "join_time": now,
+        "last_sent_time": now,
+        "title_expire_time": 0,
+        "unfriendly": False,
+        "card_changeable": True,
+        "is_robot": False,
+        "shut_up_timestamp": 0,
+        "role": "member",
+        "title": "",
+    }
+
+
+class GroupRoster:
+    """单个群的成员名册
+
+    删除成员时用最后一行填补空位, 行号不稳定, 对外只使用 user_id.
+    """
+
+    def __init__(self, group_id: str, members: Iterable[dict] = ()):
+        self.group_id = str(group_id)
+        self.user_id = array("q")
+        self.role = array("b")
+        self.level = array("l")
+        self.join_time = array("q")
+        self.last_sent_time = array("q")
+        self.shut_up_timestamp = array("q")
+        self._records: List[dict] = []
+        self._rows: Dict[int, int] = {}
+        self._by_role: Dict[str, Set[int]] = {role: set() for role in _ROLES}
+        self.loaded_at = time.time()
+        for member in members:
+            self.upsert(member)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, user_id) -> bool:
+        return _to_int(user_id) in self._rows
+
+    # -------------------
+    # region 增量维护
+    # -------------------
+
+    def upsert(self, member: dict):
+        """添加或更新成员, member 为 get_group_member_list 返回的原始数据"""
+        uid = _to_int(member.get("user_id"))
+        role = member.get("role") if member.get("role") in _ROLE_CODES else "member"
+        row = self._rows.get(uid)
+        if row is None:
+            row = len(self._records)
+            self._rows[uid] = row
+            self._records.append(member)
+            self.user_id.append(uid)
+            self.role.append(_ROLE_CODES[role])
+            self.level.append(_to_int(member.get("level")))
+            self.join_time.append(_to_int(member.get("join_time")))
+            self.last_sent_time.append(_to_int(member.get("last_sent_time")))
+            self.shut_up_timestamp.append(_to_int(member.get("shut_up_timestamp")))
+        else:
+            self._by_role[_ROLES[self.role[row]]].discard(uid)
+            self._records[row] = member
+            self.role[row] = _ROLE_CODES[role]
+            self.level[row] = _to_int(member.get("level"))
+            self.join_time[row] = _to_int(member.get("join_time"))
+            self.last_sent_time[row] = _to_int(member.get("last_sent_time"))
+            self.shut_up_timestamp[row] = _to_int(member.get("shut_up_timestamp"))
+        self._by_role[role].add(uid)
+
+    def remove(self, user_id) -> bool:
+        uid = _to_int(user_id)
+        row = self._rows.pop(uid, None)
+        if row is None:
+            return False
+        self._by_role[_ROLES[self.role[row]]].discard(uid)
+        last = len(self._records) - 1
+        columns = (
+            self.user_id,
+            self.role,
+            self.level,
+            self.join_time,
+            self.last_sent_time,
+            self.shut_up_timestamp,
+        )
+        if row != last:
+            for column in columns:
+                column[row] = column[last]
+            self._records[row] = self._records[last]
+            self._rows[self.user_id[row]] = row
+        for column in columns:
+            column.pop()
+        self._records.pop()
+        return True
+
+    def set_role(self, user_id, role: Role):
+        uid = _to_int(user_id)
+        row = self._rows.get(uid)
+        if row is None:
+            return
+        self._by_role[_ROLES[self.role[row]]].discard(uid)
+        self._by_role[role].add(uid)
+        self.role[row] = _ROLE_CODES[role]
+        self._records[row] = {**self._records[row], "role": role}
+
+    def set_shut_up(self, user_id, timestamp: int):
+        row = self._rows.get(_to_int(user_id))
+        if row is not None:
+            self.shut_up_timestamp[row] = timestamp
+            self._records[row] = {**self._records[row], "shut_up_timestamp": timestamp}
+
+    def touch(self, user_id, timestamp: int):
+        """记录成员发言时间, 原始数据在取出成员信息时再同步"""
+        row = self._rows.get(_to_int(user_id))
+        if row is not None and timestamp > self.last_sent_time[row]:
+            self.last_sent_time[row] = timestamp
+
+    # -------------------
+    # region 查询
+    # -------------------
+
+    def filter(
+        self,
+        role: Optional[Role] = None,
+        roles_not_in: Iterable[Role] = (),
+        level_ge: Optional[int] = None,
+        level_le: Optional[int] = None,
+        active_within: Optional[int] = None,
+        inactive_for: Optional[int] = None,
+        exclude: Iterable = (),
+        now: Optional[float] = None,
+    ) -> List[int]:
+        """按条件筛选成员, 返回 user_id 列表, 条件之间为"与"关系
+
+        Args:
+            role: 只保留该身份的成员
+            roles_not_in: 排除这些身份的成员
+            level_ge / level_le: 群等级范围
+            active_within: 最近 N 秒内发过言
+            inactive_for: 超过 N 秒没有发言
+            exclude: 排除的 user_id
+        """
+        now = time.time() if now is None else now
+        if role is not None:
+            rows = sorted(self._rows[uid] for uid in self._by_role[role])
+        else:
+            rows = range(len(self._records))
+
+        codes = {_ROLE_CODES[r] for r in roles_not_in}
+        if codes:
+            role_col = self.role
+            rows = [i for i in rows if role_col[i] not in codes]
+        if level_ge is not None:
+            level_col = self.level
+            rows = [i for i in rows if level_col[i] >= level_ge]
+        if level_le is not None:
+            level_col = self.level
+            rows = [i for i in rows if level_col[i] <= level_le]
+        if active_within is not None:
+            cutoff = now - active_within
+            sent = self.last_sent_time
+            rows = [i for i in rows if sent[i] > cutoff]
+        if inactive_for is not None:
+            cutoff = now - inactive_for
+            sent = self.last_sent_time
+            rows = [i for i in rows if sent[i] <= cutoff]
+
+        user_ids = self.user_id
+        result = [user_ids[i] for i in rows]
+        excluded = {_to_int(uid) for uid in exclude}
+        if excluded:
+            result = [uid for uid in result if uid not in excluded]
+        return result
+
+    def user_ids_by_role(self, role: Role) -> Set[int]:
+        return set(self._by_role[role])
+
+    def record(self, user_id) -> Optional[dict]:
+        """成员的原始数据, 包含最新的发言时间"""
+        row = self._rows.get(_to_int(user_id))
+        if row is None:
+            return None
+        record = self._records[row]
+        if record.get("last_sent_time") != self.last_sent_time[row]:
+            record = {**record, "last_sent_time": self.last_sent_time[row]}
+            self._records[row] = record
+        return record
+
+    def get(self, user_id) -> Optional["GroupMemberInfo"]:
+        from .api_group import GroupMemberInfo
+
+        record = self.record(user_id)
+        return None if record is None else GroupMemberInfo(**record)
+
+    def to_member_list(self, user_ids: Optional[Iterable] = None) -> "GroupMemberList":
+        """转换为 GroupMemberList, user_ids 为空时包含所有成员"""
+        from .api_group import GroupMemberList
+
+        if user_ids is None:
+            user_ids = self.user_id
+        return GroupMemberList([r for r in map(self.record, user_ids) if r is not None])
+
+
+class RosterStore:
+    """所有群的成员名册, 按需加载, 由事件增量维护"""
+
+    def __init__(self, api: "BotAPI"):
+        self.api = api
+        self._rosters: Dict[str, GroupRoster] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+
+    async def get(self, group_id, refresh: bool = False) -> GroupRoster:
+        """获取群成员名册, 首次调用时拉取成员列表"""
+        group_id = str(group_id)
+        roster = self._rosters.get(group_id)
+        if roster is not None and not refresh:
+            return roster
+        loading = self._loading.get(group_id)
+        if loading is not None:
+            return await asyncio.shield(loading)
+
+        if refresh and self.api.cache is not None:
+            self.api.cache.invalidate("/get_group_member_list", group_id=group_id)
+        future = asyncio.get_running_loop().create_future()
+        self._loading[group_id] = future
+        try:
+            result = await self.api.async_callback(
+                "/get_group_member_list", {"group_id": group_id}
+            )
+            roster = GroupRoster(group_id, APIReturnStatus(result).data)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self._loading.pop(group_id, None)
+        self._rosters[group_id] = roster
+        future.set_result(roster)
+        LOG.debug(f"已加载群 {group_id} 的成员名册, 共 {len(roster)} 人")
+        return roster
+
+    def peek(self, group_id) -> Optional[GroupRoster]:
+        """获取已加载的名册, 不触发加载"""
+        return self._rosters.get(str(group_id))
+
+    def forget(self, group_id):
+        self._rosters.pop(str(group_id), None)
+
+    def on_notice(self, event):
+        """根据通知事件更新已加载的名册"""
+        roster = self._rosters.get(event.group_id) if event.group_id else None
+        if roster is None:
+            return
+        notice_type = event.notice_type
+        if notice_type == "group_increase":
+            # 通知中只有 user_id, 其余字段在下次刷新名册时补全
+            now = _to_int(event.time, int(time.time()))
+            roster.upsert(_new_member(event.group_id, event.user_id, now))
+        elif notice_type == "group_decrease":
+            if event.sub_type == "kick_me":
+                self.forget(event.group_id)
+            else:
+                roster.remove(event.user_id)
+        elif notice_type == "group_admin":
+            roster.set_role(
+                event.user_id, "admin" if event.sub_type == "set" else "member"
+            )
+        elif notice_type == "group_ban" and event.user_id not in (None, "0"):
+            if event.sub_type == "ban":
+                until = _to_int(event.time) + _to_int(event.duration)
+            else:
+                until = 0
+            roster.set_shut_up(event.user_id, until)
+
+    def on_group_message(self, event):
+        """根据群消息更新发言时间"""
+        roster = self._rosters.get(event.group_id)
+        if roster is not None:
+            roster.touch(event.user_id, _to_int(event.time, int(time.time())))
@@ -0,0 +1,295 @@
+"""出站请求的优先级调度
+
+所有 API 调用默认直接发给 NapCat, 批量操作(批量踢人、上传文件、群发)会占满 NapCat
+的处理能力, 让交互式回复等待数秒. OutboundScheduler 位于 async_callback 之前:
+- 按接口把请求分到不同通道: 交互回复、管理操作、批量、后台
+- 通道之间按权重公平排队(stride 调度), 权重高的通道更频繁地获得发送机会
+- 每个通道有并发上限, 批量请求不会占满所有并发
+- 记录每个通道的排队时间
+
+插件可以用 `with api.lane("bulk"):` 显式指定其中调用所属的通道.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import threading
+import time
+from collections import deque
+from typing import (
+    Awaitable,
+    Callable,
+    ContextManager,
+    Deque,
+    Dict,
+    Iterator,
+    Literal,
+    Optional,
+    Tuple,
+)
+
+from ncatbot.utils import get_log
+
+LOG = get_log("OutboundScheduler")
+
+Lane = Literal["interactive", "moderation", "bulk", "background"]
+LANES: Tuple[Lane, ...] = ("interactive", "moderation", "bulk", "background")
+
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "interactive": 8,
+    "moderation": 4,
+    "bulk": 2,
+    "background": 1,
+}
+DEFAULT_LANE_LIMITS: Dict[str, int] = {
+    "interactive": 16,
+    "moderation": 4,
+    "bulk": 2,
+    "background": 1,
+}
+
+# 未列出的接口属于 interactive 通道(回复消息和处理器中的查询)
+DEFAULT_ROUTES: Dict[str, Lane] = {
+    **{
+        path: "moderation"
+        for path in (
+            "/set_group_kick",
+            "/set_group_ban",
+            "/set_group_whole_ban",
+            "/set_group_admin",
+            "/set_group_card",
+            "/set_group_special_title",
+            "/set_group_add_request",
+            "/set_friend_add_request",
+            "/delete_msg",
+            "/set_essence_msg",
+            "/delete_essence_msg",
+        )
+    },
+    **{
+        path: "bulk"
+        for path in (
+            "/set_group_kick_members",
+            "/upload_group_file",
+            "/upload_private_file",
+            "/upload_image_to_group_album",
+            "/get_group_member_list",
+            "/get_group_msg_history",
+            "/get_friend_msg_history",
+            "/get_group_root_files",
+            "/get_group_files_by_folder",
+            "/get_file",
+            "/get_record",
+            "/get_image",
+        )
+    },
+    **{
+        path: "background"
+        for path in (
+            "/set_qq_profile",
+            "/set_online_status",
+            "/set_qq_avatar",
+            "/set_self_longnick",
+            "/get_status",
+            "/get_recent_contact",
+            "/fetch_custom_face",
+            "/mark_group_msg_as_read",
+            "/mark_private_msg_as_read",
+            "/get_version_info",
+            "/set_group_sign",
+            "/send_group_sign",
+        )
+    },
+}
+
+_current_lane: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "ncatbot_outbound_lane", default=None
+)
+
+
+def lane(name: Lane) -> ContextManager[None]:
+    """在上下文中的 API 调用(包括其中创建的任务)使用指定通道"""
+    if name not in LANES:
+        raise ValueError(f"未知的通道: {name}")
+    return _lane_context(name)
+
+
+@contextlib.contextmanager
+def _lane_context(name: str) -> Iterator[None]:
+    token = _current_lane.set(name)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+class _LaneState:
+    __slots__ = (
+        "weight",
+        "limit",
+        "waiters",
+        "inflight",
+        "pass_value",
+        "submitted",
+        "started",
+        "completed",
+        "queue_time_total",
+        "queue_time_max",
+        "recent",
+    )
+
+    def __init__(self, weight: float, limit: int):
+        self.weight = weight
+        self.limit = limit
+        self.waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self.inflight = 0
+        self.pass_value = 0.0
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+        self.recent: Deque[float] = deque(maxlen=256)
+
+
+class OutboundScheduler:
+    """出站请求调度器, 包装 BotAPI 的 async_callback
+
+    Args:
+        callback: 实际发送请求的 async_callback
+        max_inflight: 同时发给 NapCat 的请求总数
+        weights: 各通道权重, 与默认值合并
+        lane_limits: 各通道并发上限, 与默认值合并
+        routes: 接口 -> 通道, 与默认路由合并
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[str, dict], Awaitable[dict]],
+        max_inflight: int = 16,
+        weights: Optional[Dict[str, float]] = None,
+        lane_limits: Optional[Dict[str, int]] = None,
+        routes: Optional[Dict[str, Lane]] = None,
+    ):
+        self.callback = callback
+        self.max_inflight = max_inflight
+        self.routes: Dict[str, str] = {**DEFAULT_ROUTES, **(routes or {})}
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        limits = {**DEFAULT_LANE_LIMITS, **(lane_limits or {})}
+        self._lanes = {name: _LaneState(weights[name], limits[name]) for name in LANES}
+        self._inflight = 0
+        # 请求可能来自主循环和桥接循环, 状态用线程锁保护
+        self._lock = threading.Lock()
+
+    def classify(self, path: str) -> str:
+        return _current_lane.get() or self.routes.get(path, "interactive")
+
+    # -------------------
+    # region 调度
+    # -------------------
+
+    async def call(self, path: str, params: dict = None) -> dict:
+        """替代 async_callback 的调用入口"""
+        name = self.classify(path)
+        state = self._lanes[name]
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        queued_at = time.monotonic()
+        with self._lock:
+            state.submitted += 1
+            if not state.waiters and not state.inflight:
+                # 空闲的通道重新开始发送时追上其它通道的进度, 空闲期间不积攒优先权
+                self._catch_up(state)
+            state.waiters.append((loop, waiter))
+            self._dispatch()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    state.waiters.remove((loop, waiter))
+                except ValueError:
+                    # 已经获得发送机会, 归还
+                    self._release(state)
+            raise
+
+        waited = time.monotonic() - queued_at
+        with self._lock:
+            state.started += 1
+            state.queue_time_total += waited
+            state.queue_time_max = max(state.queue_time_max, waited)
+            state.recent.append(waited)
+        try:
+            return await self.callback(path, params)
+        finally:
+            with self._lock:
+                state.completed += 1
+                self._release(state)
+
+    def _catch_up(self, state: _LaneState):
+        active = [s.pass_value for s in self._lanes.values() if s.waiters or s.inflight]
+        if active:
+            state.pass_value = max(state.pass_value, min(active))
+
+    def _release(self, state: _LaneState):
+        state.inflight -= 1
+        self._inflight -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """把空闲的并发额度分配给排队的请求, 需要在持有锁时调用"""
+        while self._inflight < self.max_inflight:
+            chosen = None
+            for state in self._lanes.values():
+                if not state.waiters or state.inflight >= state.limit:
+                    continue
+                if chosen is None or state.pass_value < chosen.pass_value:
+                    chosen = state
+            if chosen is None:
+                return
+            loop, waiter = chosen.waiters.popleft()
+            chosen.pass_value += 1 / chosen.weight
+            chosen.inflight += 1
+            self._inflight += 1
+            self._wake(loop, waiter)
+
+    @staticmethod
+    def _wake(loop: asyncio.AbstractEventLoop, waiter: asyncio.Future):
+        def wake():
+            if not waiter.done():
+                waiter.set_result(None)
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            wake()
+        else:
+            loop.call_soon_threadsafe(wake)
+
+    # -------------------
+    # region 统计
+    # -------------------
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """各通道的排队数、进行中、完成数和排队时间(秒)"""
+        result = {}
+        with self._lock:
+            for name, state in self._lanes.items():
+                recent = sorted(state.recent)
+                result[name] = {
+                    "queued": len(state.waiters),
+                    "inflight": state.inflight,
+                    "submitted": state.submitted,
+                    "completed": state.completed,
+                    "queue_time_avg": (
+                        state.queue_time_total / state.started if state.started else 0.0
+                    ),
+                    "queue_time_max": state.queue_time_max,
+                    "queue_time_p95": (
+                        recent[int(len(recent) * 0.95) - 1] if recent else 0.0
+                    ),
+                }
+        return result
@@ -0,0 +1,178 @@
+"""API 缓存测试
+
+- 命中与 TTL 过期
+- 并发相同请求合并
+- 通知事件和修改类接口触发失效
+- 失败返回不缓存
+- 修改返回值不影响缓存
+"""
+
+import asyncio
+
+from ncatbot.core.api import BotAPI
+from ncatbot.core.event import NoticeEvent
+from ncatbot.utils.testing import MockAPIAdapter
+
+MEMBER = {
+    "retcode": 0,
+    "data": {"group_id": "100", "user_id": "200", "nickname": "a", "card": "a"},
+}
+
+
+class _SlowAdapter(MockAPIAdapter):
+    def __init__(self, latency: float = 0.01):
+        super().__init__()
+        self.latency = latency
+        self.set_response("/get_group_member_info", MEMBER)
+
+    async def mock_callback(self, endpoint, data=None):
+        await asyncio.sleep(self.latency)
+        return await super().mock_callback(endpoint, data)
+
+
+def _api(**options):
+    adapter = _SlowAdapter()
+    api = BotAPI(adapter.mock_callback)
+    cache = api.enable_cache(**options)
+    return adapter, api, cache
+
+
+def _member(api):
+    return api.async_callback(
+        "/get_group_member_info", {"group_id": 100, "user_id": "200"}
+    )
+
+
+class TestAPICache:
+    """APICache 测试类"""
+
+    def test_hit(self):
+        """测试重复查询命中缓存, 参数类型不同也视为同一请求"""
+        adapter, api, cache = _api()
+
+        async def main():
+            await _member(api)
+            await api.async_callback(
+                "/get_group_member_info", {"group_id": "100", "user_id": 200}
+            )
+
+        asyncio.run(main())
+        assert adapter.get_call_count("/get_group_member_info") == 1
+        stats = cache.stats()["/get_group_member_info"]
+        assert stats["hits"] == 1 and stats["misses"] == 1
+
+    def test_result_isolated(self):
+        """测试修改命中或合并得到的返回值后, 下一次命中不变"""
+        adapter, api, cache = _api()
+
+        async def main():
+            first, coalesced = await asyncio.gather(_member(api), _member(api))
+            coalesced["data"]["card"] = "changed"
+            hit = await _member(api)
+            hit["data"]["card"] = "changed"
+            hit["data"].clear()
+            return first, await _member(api)
+
+        first, again = asyncio.run(main())
+        assert adapter.get_call_count("/get_group_member_info") == 1
+        assert again == MEMBER
+        assert again is not first and again["data"] is not first["data"]
+
+    def test_ttl_expire(self):
+        """测试 TTL 过期后重新请求"""
+        adapter, api, cache = _api(ttl={"/get_group_member_info": 0.05})
+
+        async def main():
+            await _member(api)
+            await asyncio.sleep(0.06)
+            await _member(api)
+
+        asyncio.run(main())
+        assert adapter.get_call_count("/get_group_member_info") == 2
+
+    def test_single_flight(self):
+        """测试并发的相同请求只发送一次"""
+        adapter, api, cache = _api()
+
+        async def main():
+            return await asyncio.gather(*(_member(api) for _ in range(20)))
+
+        results = asyncio.run(main())
+        assert all(r == MEMBER for r in results)
+        assert adapter.get_call_count("/get_group_member_info") == 1
+        assert cache.stats()["/get_group_member_info"]["coalesced"] == 19
+
+    def test_notice_invalidation(self):
+        """测试群名片变动通知使缓存失效"""
+        adapter, api, cache = _api()
+        notice = NoticeEvent(
+            {
+                "post_type": "notice",
+                "notice_type": "group_card",
+                "group_id": 100,
+                "user_id": 200,
+                "self_id": 1,
+            }
+        )
+
+        async def main():
+            await _member(api)
+            cache.on_notice(notice)
+            await _member(api)
+
+        asyncio.run(main())
+        assert adapter.get_call_count("/get_group_member_info") == 2
+        assert cache.stats()["/get_group_member_info"]["invalidations"] == 1
+
+    def test_mutation_invalidation(self):
+        """测试修改群名片后缓存失效"""
+        adapter, api, cache = _api()
+        adapter.set_response("/set_group_card", {"retcode": 0, "data": None})
+
+        async def main():
+            await _member(api)
+            await api.set_group_card(100, 200, "b")
+            await _member(api)
+
+        asyncio.run(main())
+        assert adapter.get_call_count("/get_group_member_info") == 2
+
+    def test_invalidate_during_request(self):
+        """测试请求进行中被失效时, 结果不写入缓存"""
+        adapter, api, cache = _api()
+
+        async def main():
+            task = asyncio.ensure_future(_member(api))
+            await asyncio.sleep(0)
+            cache.invalidate_member("100", "200")
+            await task
+
+        asyncio.run(main())
+        assert cache.size == 0
+
+    def test_failure_not_cached(self):
+        """测试失败的返回不缓存"""
+        adapter, api, cache = _api()
+        adapter.set_response("/get_group_info", {"retcode": 1, "message": "x"})
+
+        async def main():
+            for _ in range(2):
+                await api.async_callback("/get_group_info", {"group_id": 1})
+
+        asyncio.run(main())
+        assert adapter.get_call_count("/get_group_info") == 2
+
+    def test_size_bound_and_disable(self):
+        """测试条目数上限和关闭缓存"""
+        adapter, api, cache = _api(max_entries=3)
+
+        async def main():
+            for i in range(10):
+                await api.async_callback("/get_group_info", {"group_id": i})
+
+        asyncio.run(main())
+        assert cache.size == 3
+        api.disable_cache()
+        assert api.cache is None
+        assert api.async_callback == api.policy.call
+        assert api.policy.callback == adapter.mock_callback
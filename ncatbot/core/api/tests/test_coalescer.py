@@ -0,0 +1,115 @@
+"""出站消息合并测试
+
+- 窗口期内发往同一目标的消息合并为一条
+- 不同目标分别发送
+- 只能单独发送的消息段和回复不与前面的消息合并, 顺序不变
+- 达到数量上限时立即发送
+- 合并不修改调用方的 MessageArray
+"""
+
+import asyncio
+
+from ncatbot.core.api import BotAPI
+from ncatbot.core.event.message_segment.message_array import MessageArray
+from ncatbot.core.event import Record
+
+
+class _Sender:
+    """记录发送内容的假 async_callback"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def __call__(self, path, params=None):
+        self.sent.append((path, params))
+        message_id = len(self.sent)
+        await asyncio.sleep(0.001)
+        return {"retcode": 0, "data": {"message_id": message_id}}
+
+    def texts(self, index):
+        return [
+            seg["data"].get("text")
+            for seg in self.sent[index][1]["message"]
+            if seg["type"] == "text"
+        ]
+
+
+def _api(**options):
+    sender = _Sender()
+    api = BotAPI(sender)
+    api.enable_coalescing(**options)
+    return sender, api
+
+
+class TestMessageCoalescer:
+    """MessageCoalescer 测试类"""
+
+    def test_merge_same_target(self):
+        """测试同一群的连续消息合并, 所有调用者得到同一个 message_id"""
+        sender, api = _api(window=0.02)
+
+        async def main():
+            return await asyncio.gather(
+                api.post_group_msg(100, "a"),
+                api.post_group_msg(100, "b"),
+                api.post_group_msg(200, "c"),
+                api.post_private_msg(300, "d"),
+            )
+
+        ids = asyncio.run(main())
+        assert len(sender.sent) == 3
+        assert ids[0] == ids[1] and len(set(ids)) == 3
+        assert sender.texts(0) == ["a", "\n", "b"]
+        assert api.coalescer.stats()["submitted"] == 4
+
+    def test_source_array_unchanged(self):
+        """测试合并后原消息不变, 再次发送时内容不变"""
+        sender, api = _api(window=0.02)
+        msg = MessageArray("a")
+
+        async def main():
+            await asyncio.gather(
+                api.post_group_array_msg(100, msg),
+                api.post_group_array_msg(100, MessageArray("b")),
+            )
+            await api.post_group_array_msg(200, msg)
+
+        asyncio.run(main())
+        assert msg.to_list() == [{"type": "text", "data": {"text": "a"}}]
+        assert sender.texts(0) == ["a", "\n", "b"]
+        assert sender.texts(1) == ["a"]
+
+    def test_single_and_reply_order(self):
+        """测试语音和回复开始新的一批, 发送顺序与提交顺序一致"""
+        sender, api = _api(window=0.02)
+
+        async def main():
+            return await asyncio.gather(
+                api.post_group_msg(100, "a"),
+                api.post_group_array_msg(100, MessageArray(Record(file="x.mp3"))),
+                api.post_group_msg(100, "b"),
+                api.post_group_msg(100, "c", reply=123),
+                api.post_group_msg(100, "d"),
+            )
+
+        ids = asyncio.run(main())
+        assert len(sender.sent) == 4
+        assert sender.texts(0) == ["a"]
+        assert sender.sent[1][1]["message"][0]["type"] == "record"
+        assert sender.texts(2) == ["b"]
+        assert sender.sent[3][1]["message"][0]["type"] == "reply"
+        assert sender.texts(3) == ["c", "\n", "d"]
+        assert ids == ["1", "2", "3", "4", "4"]
+
+    def test_max_messages(self):
+        """测试达到数量上限时不等待窗口结束"""
+        sender, api = _api(window=10, max_messages=3)
+
+        async def main():
+            return await asyncio.wait_for(
+                asyncio.gather(*(api.post_group_msg(100, str(i)) for i in range(3))),
+                1,
+            )
+
+        asyncio.run(main())
+        assert len(sender.sent) == 1
@@ -0,0 +1,116 @@
+"""消息存储测试
+
+- 写入后按 message_id 查询, 写入前也能查到
+- get_msg / get_forward_msg 命中本地时不请求 NapCat
+- 按群和发送者查询最近消息
+- 过期日志删除和条数上限
+"""
+
+import asyncio
+import os
+import time
+
+from ncatbot.core.api import BotAPI, MessageStore
+from ncatbot.utils.testing import MockAPIAdapter
+
+NOW = int(time.time())
+
+
+def make_message(message_id, group_id=100, user_id=200, t=None, text="hi"):
+    return {
+        "self_id": 1,
+        "user_id": user_id,
+        "time": NOW if t is None else t,
+        "message_id": message_id,
+        "message_seq": message_id,
+        "message_type": "group",
+        "sender": {"user_id": user_id, "nickname": "a", "card": "", "role": "member"},
+        "raw_message": text,
+        "font": 14,
+        "sub_type": "normal",
+        "message": [{"type": "text", "data": {"text": text}}],
+        "message_format": "array",
+        "post_type": "message",
+        "group_id": group_id,
+    }
+
+
+def make_forward_message(message_id, forward_id):
+    raw = make_message(message_id)
+    raw["message"] = [
+        {
+            "type": "forward",
+            "data": {"id": forward_id, "content": [make_message(9000, text="inner")]},
+        }
+    ]
+    return raw
+
+
+class TestMessageStore:
+    """MessageStore 测试类"""
+
+    def test_get_before_and_after_flush(self, tmp_path):
+        """测试写入前后都能按 message_id 查询"""
+        store = MessageStore(str(tmp_path), flush_interval=10)
+        store.append(make_message(1, text="first"))
+        assert store.get_sync(1)["raw_message"] == "first"
+        store.flush()
+        assert store.get_sync("1")["raw_message"] == "first"
+        assert store.count() == 1
+        assert store.get_sync(2) is None
+        store.close()
+
+        # 重新打开后仍能查到
+        store = MessageStore(str(tmp_path))
+        assert store.get_sync(1)["raw_message"] == "first"
+        store.close()
+
+    def test_recent(self, tmp_path):
+        """测试按群和发送者查询最近消息, 包括未写入的消息"""
+        store = MessageStore(str(tmp_path))
+        for i in range(10):
+            store.append(make_message(i, user_id=200 + i % 2, t=NOW + i))
+        store.flush()
+        store.append(make_message(10, user_id=200, t=NOW + 10))
+        store.append(make_message(11, group_id=101, t=NOW + 11))
+
+        records = store.recent_sync(100, 200, limit=3)
+        assert [r["message_id"] for r in records] == [10, 8, 6]
+        records = store.recent_sync(100, 200, limit=3, before=NOW + 8)
+        assert [r["message_id"] for r in records] == [6, 4, 2]
+        assert len(store.recent_sync(101)) == 1
+        store.close()
+
+    def test_retention(self, tmp_path):
+        """测试删除过期日志和超出条数上限的索引"""
+        store = MessageStore(str(tmp_path), retention_days=7, max_messages=5)
+        store.append(make_message(1, t=NOW - 86400 * 10))
+        for i in range(2, 10):
+            store.append(make_message(i, t=NOW + i))
+        store.flush()
+        store.prune()
+        assert len(os.listdir(store.log_dir)) == 1
+        assert store.get_sync(1) is None
+        assert store.count() == 5
+        assert store.get_sync(9) is not None
+        store.close()
+
+    def test_api_lookup(self, tmp_path):
+        """测试 get_msg / get_forward_msg 优先查询本地"""
+        adapter = MockAPIAdapter()
+        api = BotAPI(adapter.mock_callback)
+        api.enable_message_store(str(tmp_path))
+        api.record_message(make_message(1, text="quoted"))
+        api.record_message(make_forward_message(2, "fw1"))
+
+        async def main():
+            event = await api.get_msg(1)
+            forward = await api.get_forward_msg("fw1")
+            return event, forward
+
+        event, forward = asyncio.run(main())
+        assert event.raw_message == "quoted"
+        assert len(forward.content) == 1
+        assert adapter.get_call_count("/get_msg") == 0
+        assert adapter.get_call_count("/get_forward_msg") == 0
+        api.disable_message_store()
@@ -0,0 +1,210 @@
+"""分页迭代测试
+
+- 消息历史逐页遍历, 页边界不重复不遗漏
+- cursor 续传
+- 预取与处理重叠
+- 群文件目录树并发遍历与续传, 单个目录失败时取消其余请求
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from ncatbot.core.api import BotAPI
+from ncatbot.core.event import GroupMessageEvent
+from ncatbot.utils.testing import MockAPIAdapter
+
+TOTAL = 95
+
+
+def _message(seq: int) -> dict:
+    return {
+        "post_type": "message",
+        "message_type": "group",
+        "sub_type": "normal",
+        "self_id": 1,
+        "time": 1_700_000_000 + seq,
+        "message_id": 10000 + seq,
+        "message_seq": seq,
+        "group_id": 100,
+        "user_id": 200,
+        "raw_message": f"m{seq}",
+        "message": [{"type": "text", "data": {"text": f"m{seq}"}}],
+        "sender": {"user_id": 200, "nickname": "a", "role": "member"},
+        "font": 0,
+    }
+
+
+class _HistoryAdapter(MockAPIAdapter):
+    """模拟 NapCat: 返回不超过 message_seq 的最近 count 条消息(含 message_seq)"""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+
+        def history(endpoint, data):
+            end = data.get("message_seq", TOTAL)
+            start = max(1, end - data["count"] + 1)
+            return {
+                "retcode": 0,
+                "data": {"messages": [_message(s) for s in range(start, end + 1)]},
+            }
+
+        self.set_response("/get_group_msg_history", history)
+
+    async def mock_callback(self, endpoint, data=None):
+        await asyncio.sleep(self.latency)
+        return await super().mock_callback(endpoint, data)
+
+
+TREE = {
+    None: (["a.txt", "b.txt"], [("f1", "docs"), ("f2", "pics")]),
+    "f1": (["c.txt"], [("f3", "old")]),
+    "f2": (["d.png", "e.png"], []),
+    "f3": (["z.txt"], []),
+}
+
+
+class _FileAdapter(MockAPIAdapter):
+    def __init__(self, fail_folder: str = None):
+        super().__init__()
+        self.active = 0
+        self.max_active = 0
+        self.fail_folder = fail_folder
+        self.cancelled = 0
+
+        def folder(endpoint, data):
+            if fail_folder is not None and data.get("folder_id") == fail_folder:
+                raise RuntimeError("fetch failed")
+            files, folders = TREE[data.get("folder_id")]
+            return {
+                "retcode": 0,
+                "data": {
+                    "files": [{"file_id": f"id-{n}", "file_name": n} for n in files],
+                    "folders": [{"folder_id": i, "folder_name": n} for i, n in folders],
+                },
+            }
+
+        self.set_response("/get_group_root_files", folder)
+        self.set_response("/get_group_files_by_folder", folder)
+
+    async def mock_callback(self, endpoint, data=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            # 失败的目录(含重试)立即返回, 其余目录仍在请求中
+            folder_id = data.get("folder_id")
+            if self.fail_folder is None or folder_id is None:
+                await asyncio.sleep(0.01)
+            elif folder_id != self.fail_folder:
+                await asyncio.sleep(5)
+            return await super().mock_callback(endpoint, data)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+
+
+class TestMessageHistory:
+    """MessageHistoryIterator 测试类"""
+
+    def test_all_pages(self):
+        """测试从新到旧遍历全部消息, 不重复不遗漏"""
+        api = BotAPI(_HistoryAdapter().mock_callback)
+        records = asyncio.run(api.iter_group_msg_history(100, page_size=20).to_list())
+        assert [r.message_seq for r in records] == list(range(TOTAL, 0, -1))
+        event = records[0].to_event()
+        assert isinstance(event, GroupMessageEvent)
+        assert records[0].to_event() is event
+
+    def test_resume_from_cursor(self):
+        """测试中断后从 cursor 续传"""
+        api = BotAPI(_HistoryAdapter().mock_callback)
+
+        async def main():
+            first = api.iter_group_msg_history(100, page_size=20, limit=30)
+            head = await first.to_list()
+            rest = await api.iter_group_msg_history(
+                100, start_seq=first.cursor, page_size=20
+            ).to_list()
+            return head, rest
+
+        head, rest = asyncio.run(main())
+        assert len(head) == 30
+        seqs = [r.message_seq for r in head + rest]
+        assert seqs == list(range(TOTAL, 0, -1))
+
+    def test_single_record_pages(self):
+        """测试每页一条时不会因页边界提前结束"""
+        api = BotAPI(_HistoryAdapter().mock_callback)
+        records = asyncio.run(api.iter_group_msg_history(100, page_size=1).to_list())
+        assert [r.message_seq for r in records] == list(range(TOTAL, 0, -1))
+
+    def test_prefetch_overlaps(self):
+        """测试预取下一页与处理当前页重叠"""
+
+        async def consume(prefetch: bool) -> float:
+            api = BotAPI(_HistoryAdapter(latency=0.02).mock_callback)
+            start = time.perf_counter()
+            async for _ in api.iter_group_msg_history(
+                100, page_size=20, prefetch=prefetch
+            ):
+                await asyncio.sleep(0.001)
+            return time.perf_counter() - start
+
+        with_prefetch = asyncio.run(consume(True))
+        without = asyncio.run(consume(False))
+        assert with_prefetch < without
+
+
+class TestGroupFileWalker:
+    """GroupFileWalker 测试类"""
+
+    def test_walk(self):
+        """测试递归遍历所有目录"""
+        adapter = _FileAdapter()
+        api = BotAPI(adapter.mock_callback)
+        entries = asyncio.run(api.walk_group_files(100, concurrency=2).to_list())
+        assert sorted(e.path for e in entries) == [
+            "/a.txt",
+            "/b.txt",
+            "/docs/c.txt",
+            "/docs/old/z.txt",
+            "/pics/d.png",
+            "/pics/e.png",
+        ]
+        assert adapter.max_active == 2
+
+    def test_resume(self):
+        """测试中断后从 cursor 续传, 以目录为单位不遗漏"""
+        api = BotAPI(_FileAdapter().mock_callback)
+
+        async def main():
+            walker = api.walk_group_files(100, concurrency=1)
+            head = [await walker.__anext__() for _ in range(3)]
+            await walker.aclose()
+            rest = await api.walk_group_files(100, cursor=walker.cursor).to_list()
+            return head, rest
+
+        head, rest = asyncio.run(main())
+        paths = {e.path for e in head} | {e.path for e in rest}
+        assert len(paths) == 6
+
+    def test_failure_cancels_siblings(self):
+        """测试单个目录失败时取消并等待其余请求, 失败的目录留在 cursor 中"""
+        adapter = _FileAdapter(fail_folder="f1")
+        api = BotAPI(adapter.mock_callback)
+
+        async def main():
+            walker = api.walk_group_files(100, concurrency=2)
+            with pytest.raises(RuntimeError):
+                await walker.to_list()
+            # 抛出前其余请求已经取消并结束
+            assert adapter.cancelled == 1
+            assert adapter.active == 0
+            return walker
+
+        walker = asyncio.run(main())
+        assert ("f1", "/docs") in walker.cursor
@@ -0,0 +1,146 @@
+"""调用策略测试
+
+- 超时预算包含重试
+- 查询类接口失败后重试, 发送类接口不重试
+- 错误率过高时熔断并直接失败
+- 熔断后半开试探, 成功则恢复, 试探被取消时交还名额
+"""
+
+import asyncio
+
+import pytest
+
+from ncatbot.core.api import (
+    APITimeoutError,
+    BotAPI,
+    CallPolicy,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from ncatbot.utils.config import APIPolicyConfig
+
+
+class _Flaky:
+    """前 failures 次调用失败的假 async_callback"""
+
+    def __init__(self, failures: int = 0, hang: bool = False):
+        self.failures = failures
+        self.hang = hang
+        self.calls = 0
+
+    async def __call__(self, path, params=None):
+        self.calls += 1
+        if self.calls <= self.failures:
+            if self.hang:
+                await asyncio.sleep(10)
+            raise ConnectionError("WebSocket 未连接")
+        return {"retcode": 0, "data": {}}
+
+
+def _config(**kwargs) -> APIPolicyConfig:
+    options = dict(retry_backoff=0.01, retry_backoff_max=0.02)
+    options.update(kwargs)
+    return APIPolicyConfig(**options)
+
+
+class TestCallPolicy:
+    """CallPolicy 测试类"""
+
+    def test_read_retry(self):
+        """测试查询类接口失败后重试成功"""
+        callback = _Flaky(failures=2)
+        policy = CallPolicy(callback, _config(read_retries=2))
+        result = asyncio.run(policy.call("/get_group_info", {"group_id": 1}))
+        assert result["retcode"] == 0
+        assert callback.calls == 3
+        assert policy.stats()["endpoints"]["/get_group_info"]["retries"] == 2
+
+    def test_send_not_retried(self):
+        """测试发送类接口失败后不重试"""
+        callback = _Flaky(failures=1)
+        policy = CallPolicy(callback, _config())
+        with pytest.raises(ConnectionError):
+            asyncio.run(policy.call("/send_group_msg", {}))
+        assert callback.calls == 1
+
+    def test_timeout_budget(self):
+        """测试超时预算包含所有重试"""
+        callback = _Flaky(failures=10, hang=True)
+        config = _config(
+            read_retries=5, endpoints={"/get_group_info": {"timeout": 0.1}}
+        )
+        policy = CallPolicy(callback, config)
+
+        async def main():
+            start = asyncio.get_running_loop().time()
+            with pytest.raises(APITimeoutError):
+                await policy.call("/get_group_info", {})
+            return asyncio.get_running_loop().time() - start
+
+        assert asyncio.run(main()) < 0.3
+        assert callback.calls == 1
+
+    def test_breaker_fast_fail(self):
+        """测试错误率过高时熔断, 之后的调用不再发送"""
+        callback = _Flaky(failures=100)
+        config = _config(read_retries=0, breaker_window=4, breaker_min_calls=4)
+        policy = CallPolicy(callback, config)
+
+        async def main():
+            for _ in range(4):
+                with pytest.raises(ConnectionError):
+                    await policy.call("/get_status", {})
+            with pytest.raises(CircuitOpenError):
+                await policy.call("/send_group_msg", {})
+
+        asyncio.run(main())
+        assert callback.calls == 4
+        stats = policy.stats()
+        assert stats["breaker"]["state"] == "open"
+        assert stats["breaker"]["opened_count"] == 1
+        assert stats["endpoints"]["/send_group_msg"]["rejected"] == 1
+
+    def test_breaker_half_open(self):
+        """测试熔断到期后只放行一次试探, 成功后恢复"""
+        breaker = CircuitBreaker(window=2, min_calls=2, open_seconds=0.05)
+        breaker.record(False)
+        breaker.record(False)
+        assert not breaker.allow()
+
+        asyncio.run(asyncio.sleep(0.06))
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record(True)
+        assert breaker.state == "closed"
+        assert breaker.allow()
+
+    def test_half_open_probe_cancelled(self):
+        """测试半开试探被取消后熔断器仍可再次试探"""
+        callback = _Flaky(failures=1, hang=True)
+        policy = CallPolicy(callback, _config(read_retries=0))
+        policy.breaker = CircuitBreaker(window=2, min_calls=2, open_seconds=0)
+        policy.breaker.record(False)
+        policy.breaker.record(False)
+
+        async def main():
+            probe = asyncio.ensure_future(policy.call("/get_status", {}))
+            await asyncio.sleep(0.01)
+            assert policy.breaker.state == "half_open"
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+            return await policy.call("/get_status", {})
+
+        assert asyncio.run(main())["retcode"] == 0
+        assert policy.breaker.state == "closed"
+
+    def test_bot_api_metrics(self):
+        """测试 BotAPI 默认开启调用策略并汇总统计"""
+        api = BotAPI(_Flaky())
+        assert api.policy is not None
+        asyncio.run(api.async_callback("/get_login_info", {}))
+        metrics = api.metrics()
+        assert metrics["cache"] is None
+        assert metrics["policy"]["breaker"]["state"] == "closed"
+        assert metrics["policy"]["endpoints"]["/get_login_info"]["calls"] == 1
@@ -0,0 +1,166 @@
+"""群成员名册测试
+
+- 首次加载与并发加载合并
+- 通知事件增量维护(入群、退群、管理员、禁言)
+- 列筛选与 GroupMemberList 原有筛选结果一致
+"""
+
+import asyncio
+import random
+
+from ncatbot.core.api import BotAPI, GroupRoster
+from ncatbot.core.api.api_group import GroupMemberList
+from ncatbot.core.event import NoticeEvent
+from ncatbot.utils.testing import MockAPIAdapter
+
+NOW = 1_700_000_000
+
+
+def make_members(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    members = []
+    for i in range(count):
+        role = "owner" if i == 0 else rng.choice(["admin"] + ["member"] * 20)
+        members.append(
+            {
+                "group_id": 100,
+                "user_id": 10000 + i,
+                "nickname": f"u{i}",
+                "card": "",
+                "sex": "unknown",
+                "age": 0,
+                "area": "",
+                "level": str(rng.randint(1, 100)),
+                "qq_level": 0,
+                "join_time": NOW - rng.randint(0, 10**7),
+                "last_sent_time": NOW - rng.randint(0, 10**7),
+                "title_expire_time": 0,
+                "unfriendly": False,
+                "card_changeable": True,
+                "is_robot": False,
+                "shut_up_timestamp": 0,
+                "role": role,
+                "title": "",
+            }
+        )
+    return members
+
+
+def _notice(**data):
+    return NoticeEvent({"post_type": "notice", "self_id": 1, "time": NOW, **data})
+
+
+class TestGroupRoster:
+    """GroupRoster 测试类"""
+
+    def test_filter_matches_member_list(self):
+        """测试列筛选与 GroupMemberList 结果一致"""
+        members = make_members(500)
+        roster = GroupRoster("100", members)
+        member_list = GroupMemberList(members)
+
+        expected = member_list.filter_by_role("admin").members
+        assert sorted(roster.filter(role="admin")) == sorted(
+            m.user_id for m in expected
+        )
+        expected = member_list.filter_by_role_not_in(["owner", "admin"]).members
+        assert sorted(roster.filter(roles_not_in=["owner", "admin"])) == sorted(
+            m.user_id for m in expected
+        )
+        inactive = [
+            m["user_id"] for m in members if m["last_sent_time"] <= NOW - 86400 * 30
+        ]
+        assert sorted(roster.filter(inactive_for=86400 * 30, now=NOW)) == sorted(
+            inactive
+        )
+
+    def test_remove_keeps_index(self):
+        """测试删除成员后其余成员的索引仍然正确"""
+        members = make_members(50)
+        roster = GroupRoster("100", members)
+        for uid in (10000, 10049, 10020):
+            assert roster.remove(uid)
+        assert len(roster) == 47
+        assert 10020 not in roster
+        for member in members:
+            if member["user_id"] not in (10000, 10049, 10020):
+                assert roster.get(member["user_id"]).nickname == member["nickname"]
+        assert not roster.user_ids_by_role("owner")
+
+    def test_to_member_list(self):
+        """测试转换为 GroupMemberList, 包含最新发言时间"""
+        roster = GroupRoster("100", make_members(10))
+        roster.touch(10003, NOW + 10)
+        member_list = roster.to_member_list([10003, 10004])
+        assert [m.user_id for m in member_list.members] == [10003, 10004]
+        assert member_list.members[0].last_sent_time == NOW + 10
+
+
+class TestRosterStore:
+    """RosterStore 测试类"""
+
+    def _api(self, members):
+        adapter = MockAPIAdapter()
+        adapter.set_response("/get_group_member_list", {"retcode": 0, "data": members})
+        return adapter, BotAPI(adapter.mock_callback)
+
+    def test_load_once(self):
+        """测试名册只加载一次"""
+        adapter, api = self._api(make_members(20))
+
+        async def main():
+            rosters = await asyncio.gather(*(api.roster.get(100) for _ in range(5)))
+            await api.roster.get("100")
+            return rosters
+
+        rosters = asyncio.run(main())
+        assert all(r is rosters[0] for r in rosters)
+        assert adapter.get_call_count("/get_group_member_list") == 1
+
+    def test_notice_updates(self):
+        """测试通知事件增量维护名册"""
+        adapter, api = self._api(make_members(20))
+        roster = asyncio.run(api.roster.get(100))
+
+        api.roster.on_notice(
+            _notice(
+                notice_type="group_increase",
+                sub_type="approve",
+                group_id=100,
+                user_id=1,
+            )
+        )
+        assert 1 in roster and roster.get(1).role == "member"
+
+        api.roster.on_notice(
+            _notice(notice_type="group_admin", sub_type="set", group_id=100, user_id=1)
+        )
+        assert 1 in roster.filter(role="admin")
+
+        api.roster.on_notice(
+            _notice(
+                notice_type="group_ban",
+                sub_type="ban",
+                group_id=100,
+                user_id=1,
+                duration=60,
+            )
+        )
+        assert roster.get(1).shut_up_timestamp == NOW + 60
+
+        api.roster.on_notice(
+            _notice(
+                notice_type="group_decrease", sub_type="leave", group_id=100, user_id=1
+            )
+        )
+        assert 1 not in roster and len(roster) == 20
+
+        api.roster.on_notice(
+            _notice(
+                notice_type="group_decrease",
+                sub_type="kick_me",
+                group_id=100,
+                user_id=2,
+            )
+        )
+        assert api.roster.peek(100) is None
@@ -0,0 +1,126 @@
+"""出站调度测试
+
+- 批量请求占满通道时交互请求不排队
+- 通道并发上限
+- 按权重公平分配
+- 显式指定通道
+- 取消排队中的请求
+"""
+
+import asyncio
+
+import pytest
+
+from ncatbot.core.api import BotAPI, OutboundScheduler
+from ncatbot.utils.testing import MockAPIAdapter
+
+
+class _Recorder:
+    """记录开始顺序和各接口并发数的假 async_callback"""
+
+    def __init__(self, latency: float = 0.02):
+        self.latency = latency
+        self.started = []
+        self.active = {}
+        self.max_active = {}
+
+    async def __call__(self, path, params=None):
+        self.started.append(path)
+        self.active[path] = self.active.get(path, 0) + 1
+        self.max_active[path] = max(self.max_active.get(path, 0), self.active[path])
+        try:
+            await asyncio.sleep(self.latency)
+            return {"retcode": 0, "data": {"message_id": "1"}}
+        finally:
+            self.active[path] -= 1
+
+
+class TestOutboundScheduler:
+    """OutboundScheduler 测试类"""
+
+    def test_interactive_not_blocked_by_bulk(self):
+        """测试批量请求排队时, 交互请求立即发送"""
+        recorder = _Recorder(latency=0.05)
+        scheduler = OutboundScheduler(recorder, max_inflight=4)
+
+        async def main():
+            bulk = [
+                asyncio.ensure_future(scheduler.call("/upload_group_file", {}))
+                for _ in range(10)
+            ]
+            await asyncio.sleep(0.01)
+            await scheduler.call("/send_group_msg", {})
+            stats = scheduler.stats()
+            await asyncio.gather(*bulk)
+            return stats
+
+        stats = asyncio.run(main())
+        assert stats["interactive"]["queue_time_max"] < 0.02
+        assert stats["bulk"]["queued"] > 0
+        assert recorder.max_active["/upload_group_file"] == 2
+
+    def test_weighted_fair(self):
+        """测试只有一个并发额度时按权重轮流发送"""
+        recorder = _Recorder(latency=0)
+        scheduler = OutboundScheduler(recorder, max_inflight=1)
+
+        async def main():
+            calls = [scheduler.call("/get_group_member_list", {}) for _ in range(40)]
+            calls += [scheduler.call("/send_group_msg", {}) for _ in range(40)]
+            await asyncio.gather(*calls)
+
+        asyncio.run(main())
+        first = recorder.started[:25]
+        # interactive : bulk = 8 : 2, 允许首个请求带来的 1 次偏差
+        assert 19 <= first.count("/send_group_msg") <= 21
+        assert len(recorder.started) == 80
+
+    def test_explicit_lane(self):
+        """测试用 api.lane 显式指定通道"""
+        adapter = MockAPIAdapter()
+        api = BotAPI(adapter.mock_callback)
+        scheduler = api.enable_scheduler()
+
+        async def main():
+            with api.lane("background"):
+                await api.send_group_text(1, "hi")
+            await api.send_group_text(1, "hi")
+
+        asyncio.run(main())
+        stats = scheduler.stats()
+        assert stats["background"]["completed"] == 1
+        assert stats["interactive"]["completed"] == 1
+        with pytest.raises(ValueError):
+            api.lane("urgent")
+
+    def test_cancel_queued(self):
+        """测试取消排队中的请求, 额度不泄漏"""
+        recorder = _Recorder(latency=0.02)
+        scheduler = OutboundScheduler(recorder, max_inflight=1)
+
+        async def main():
+            first = asyncio.ensure_future(scheduler.call("/send_group_msg", {}))
+            second = asyncio.ensure_future(scheduler.call("/send_group_msg", {}))
+            await asyncio.sleep(0)
+            second.cancel()
+            await first
+            await asyncio.wait_for(scheduler.call("/send_group_msg", {}), 1)
+
+        asyncio.run(main())
+        assert len(recorder.started) == 2
+        assert scheduler.stats()["interactive"]["inflight"] == 0
+
+    def test_cache_before_scheduler(self):
+        """测试缓存命中不经过调度器"""
+        adapter = MockAPIAdapter()
+        adapter.set_response("/get_group_info", {"retcode": 0, "data": {}})
+        api = BotAPI(adapter.mock_callback)
+        scheduler = api.enable_scheduler()
+        api.enable_cache()
+
+        async def main():
+            for _ in range(3):
+                await api.async_callback("/get_group_info", {"group_id": 1})
+
+        asyncio.run(main())
+        assert scheduler.stats()["interactive"]["submitted"] == 1
@@ -95,6 +95,7 @@ class BotClient:
                 f"BotClient 已重构为纯异步架构,max_workers 参数已废弃(传入值: {max_workers})"
             )
         self.api = BotAPI(self.adapter.send)
+        self.adapter.raw_message_callback = self.api.record_message
         self.crash_flag = False
         status.global_api = self.api
         for event_name in EVENTS:
@@ -141,6 +142,13 @@ class BotClient:
             # 纯异步版本:非阻塞式并发执行
             # 关键:只创建任务, 不等待完成(fire-and-forget)
             # Mock 的时候需要等待处理跑完再继续判断流程
+            # 在处理器运行前更新缓存和成员名册, 处理器查询到的是最新数据
+            if event_name == OFFICIAL_NOTICE_EVENT:
+                if self.api.cache is not None:
+                    self.api.cache.on_notice(event)
+                self.api.roster.on_notice(event)
+            elif event_name == OFFICIAL_GROUP_MESSAGE_EVENT:
+                self.api.roster.on_group_message(event)
             for handler in self.event_handlers[event_name]:
                 if inspect.iscoroutinefunction(handler):
                     # 创建异步任务,让它在后台运行
@@ -318,6 +326,7 @@ class BotClient:
             return
         status.exit = True
         asyncio.run(self.plugin_loader.unload_all())
+        self.api.disable_message_store()
         LOG.info("Bot 已经正常退出")
 
     def run_frontend(self, **kwargs: Unpack[StartArgs]):
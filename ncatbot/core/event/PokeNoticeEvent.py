@@ -1,5 +1,5 @@
 from ncatbot.utils import status
-from ncatbot.utils.thread_pool import run_coroutine
+from ncatbot.utils.thread_pool import loop_bridge
 from .notice import NoticeEvent
 from typing import Optional
 
@@ -50,4 +50,4 @@ class PokeNoticeEvent(NoticeEvent):
 
     def get_poke_message_sync(self) -> Optional[str]:
         """同步获取戳一戳的消息内容"""
-        return run_coroutine(self.get_poke_message)
+        return loop_bridge.run(self.get_poke_message)
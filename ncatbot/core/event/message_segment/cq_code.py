@@ -0,0 +1,108 @@
+"""CQ 码编解码
+
+正则和转义表在模块加载时构建一次.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Union
+
+_CQ_PATTERN = re.compile(r"\[CQ:([^,\]]+)(?:,([^\]]+))?\]")
+
+# HTML 实体转义映射, &amp; 必须最后处理, 否则 "&amp;#91;" 会被反转义两次
+_UNESCAPE_MAP = (("&#91;", "["), ("&#93;", "]"), ("&#44;", ","), ("&amp;", "&"))
+_TEXT_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "[": "&#91;", "]": "&#93;"})
+_PARAM_ESCAPE_TABLE = str.maketrans(
+    {"&": "&amp;", "[": "&#91;", "]": "&#93;", ",": "&#44;"}
+)
+
+
+def unescape_cq(text: str) -> str:
+    """取消 CQ 码中的 HTML 实体转义"""
+    # 逐个 str.replace 在 C 层完成, 比正则回调的单次扫描更快
+    if "&" not in text:
+        return text
+    for escaped, unescaped in _UNESCAPE_MAP:
+        if escaped in text:
+            text = text.replace(escaped, unescaped)
+    return text
+
+
+def escape_cq_text(text: str) -> str:
+    """转义 CQ 码外的普通文本"""
+    return text.translate(_TEXT_ESCAPE_TABLE)
+
+
+def escape_cq_param(value: str) -> str:
+    """转义 CQ 码的参数值(额外转义逗号)"""
+    return value.translate(_PARAM_ESCAPE_TABLE)
+
+
+def parse_cq_code_to_onebot11(
+    cq_string: str,
+) -> List[Dict[str, Union[str, Dict[str, str]]]]:
+    """
+    将 CQ 码字符串解析为 OneBot 11 规范的消息数组格式，包含转义字符处理
+
+    Args:
+        cq_string: 包含 CQ 码的字符串，例如 "[CQ:image,file=123.jpg]这是一段文本[CQ:face,id=123]"
+
+    Returns:
+        OneBot 11 规范的消息数组，例如:
+        [
+            {"type": "image", "data": {"file": "123.jpg"}},
+            {"type": "text", "data": {"text": "这是一段文本"}},
+            {"type": "face", "data": {"id": "123"}}
+        ]
+    """
+    if "[CQ:" not in cq_string:
+        if not cq_string:
+            return []
+        return [{"type": "text", "data": {"text": unescape_cq(cq_string)}}]
+
+    # split 在 C 层完成切分: [文本, 类型, 参数, 文本, 类型, 参数, ..., 文本]
+    parts = _CQ_PATTERN.split(cq_string)
+    message_segments = []
+    append = message_segments.append
+    for i in range(0, len(parts) - 1, 3):
+        text, cq_type, params_str = parts[i], parts[i + 1], parts[i + 2]
+        if text:
+            # 普通文本也需要反转义
+            append({"type": "text", "data": {"text": unescape_cq(text)}})
+        params = {}
+        if params_str:
+            for param in params_str.split(","):
+                key, sep, value = param.partition("=")
+                if sep:
+                    params[key] = unescape_cq(value)
+        append({"type": cq_type, "data": params})
+
+    if parts[-1]:
+        append({"type": "text", "data": {"text": unescape_cq(parts[-1])}})
+    return message_segments
+
+
+def _encode_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return escape_cq_param(str(value))
+
+
+def encode_onebot11_to_cq(message: Iterable[Dict[str, Any]]) -> str:
+    """将 OneBot 11 消息数组编码为 CQ 码字符串, parse_cq_code_to_onebot11 的逆操作
+
+    参数中的列表/字典(如合并转发节点内容)无法用 CQ 码表示, 会被忽略
+    """
+    parts = []
+    for segment in message:
+        seg_type = segment["type"]
+        data = segment.get("data") or {}
+        if seg_type == "text":
+            parts.append(escape_cq_text(data.get("text", "")))
+            continue
+        params = "".join(
+            f",{key}={_encode_value(value)}"
+            for key, value in data.items()
+            if value is not None and not isinstance(value, (list, dict))
+        )
+        parts.append(f"[CQ:{seg_type}{params}]")
+    return "".join(parts)
@@ -0,0 +1,145 @@
+"""媒体文件下载管理
+
+所有 DownloadableMessageSegment 共用的下载器:
+- 复用 keep-alive 连接池, 不再每次下载新建 httpx 客户端
+- 分块流式写入磁盘, 文件写入在线程池中进行, 不阻塞事件循环
+- 全局和单个主机的并发数限制
+- 同一 URL / file_id 的并发下载只请求一次
+"""
+
+import asyncio
+import os
+import shutil
+import threading
+import urllib.parse
+import weakref
+from typing import Dict, Optional
+
+import aiofiles
+import httpx
+
+from ....utils import get_log
+
+LOG = get_log("DownloadManager")
+
+
+class _LoopState:
+    """单个事件循环内的下载状态, httpx 客户端和信号量不能跨事件循环使用"""
+
+    def __init__(self, manager: "DownloadManager"):
+        self.client = httpx.AsyncClient(
+            timeout=manager.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=manager.max_concurrency,
+                max_keepalive_connections=manager.max_concurrency,
+            ),
+        )
+        self.semaphore = asyncio.Semaphore(manager.max_concurrency)
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.max_per_host = manager.max_per_host
+
+    def host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urllib.parse.urlparse(url).netloc
+        semaphore = self.host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_per_host)
+            self.host_semaphores[host] = semaphore
+        return semaphore
+
+
+class DownloadManager:
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_per_host: int = 4,
+        chunk_size: int = 256 * 1024,
+        timeout: float = 60.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        self._sync_client: Optional[httpx.Client] = None
+        self._sync_lock = threading.Lock()
+
+    def _get_state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = _LoopState(self)
+            self._states[loop] = state
+        return state
+
+    async def download(self, url: str, path: str, key: str = None) -> str:
+        """流式下载 url 到 path
+
+        Args:
+            url: 下载地址
+            path: 保存路径
+            key: 去重键, 默认为 url. 同一 key 的并发下载只会请求一次,
+                其余调用等待完成后从已下载的文件复制
+
+        Returns:
+            str: 保存路径
+        """
+        state = self._get_state()
+        key = key or url
+        task = state.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(state, url, path))
+            state.inflight[key] = task
+
+            def _done(_):
+                if state.inflight.get(key) is task:
+                    state.inflight.pop(key)
+
+            task.add_done_callback(_done)
+        else:
+            LOG.debug(f"复用进行中的下载: {key}")
+
+        # shield: 某个调用方被取消时不影响其它等待同一下载的调用方
+        src = await asyncio.shield(task)
+        if os.path.abspath(src) != os.path.abspath(path):
+            await asyncio.to_thread(shutil.copyfile, src, path)
+        return path
+
+    async def _fetch(self, state: _LoopState, url: str, path: str) -> str:
+        tmp_path = f"{path}.part"
+        async with state.semaphore, state.host_semaphore(url):
+            try:
+                async with state.client.stream("GET", url) as resp:
+                    resp.raise_for_status()
+                    async with aiofiles.open(tmp_path, "wb") as f:
+                        async for chunk in resp.aiter_bytes(self.chunk_size):
+                            await f.write(chunk)
+                await asyncio.to_thread(os.replace, tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return path
+
+    def fetch_bytes_sync(self, url: str) -> bytes:
+        """同步获取 url 内容, 使用共享的连接池, 供同步接口使用"""
+        with self._sync_lock:
+            if self._sync_client is None:
+                self._sync_client = httpx.Client(
+                    timeout=self.timeout, follow_redirects=True
+                )
+            client = self._sync_client
+        resp = client.get(url)
+        resp.raise_for_status()
+        return resp.content
+
+    async def aclose(self):
+        """关闭当前事件循环的连接池"""
+        loop = asyncio.get_running_loop()
+        state = self._states.pop(loop, None)
+        if state is not None:
+            await state.client.aclose()
+
+
+download_manager = DownloadManager()
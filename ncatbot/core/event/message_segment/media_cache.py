@@ -0,0 +1,153 @@
+"""本地媒体文件的 base64 编码缓存
+
+NapCat 不在本机时, 本地文件需要以 base64 形式上传. 同一批图片(表情包等)会被反复发送,
+这里按 (绝对路径, 文件大小, 修改时间) 缓存编码结果, 文件被修改后自动失效.
+"""
+
+import base64
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from ....utils import get_log
+
+LOG = get_log("MediaCache")
+
+CacheKey = Tuple[str, int, int]
+
+
+class Base64Cache:
+    """LRU 缓存, 容量按编码后的字节数计算
+
+    设置 spill_dir 后, 从内存淘汰的条目会写入磁盘, 再次使用时直接读回编码结果,
+    省去读取原文件和重新编码的开销.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, spill_dir: str = None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self._entries: "OrderedDict[CacheKey, str]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.spill_hits = 0
+        self.evictions = 0
+
+    def configure(self, max_bytes: int = None, spill_dir: str = None):
+        """修改容量或磁盘溢出目录, 超出新容量的条目会被立即淘汰"""
+        with self._lock:
+            if spill_dir is not None:
+                os.makedirs(spill_dir, exist_ok=True)
+                self.spill_dir = spill_dir
+            evicted = []
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+                evicted = self._evict()
+        self._spill(evicted)
+
+    def get_base64(self, path: str) -> str:
+        """获取文件的 `base64://...` 编码, 优先使用缓存"""
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._load_spill(key)
+        if value is None:
+            with open(path, "rb") as f:
+                value = "base64://" + base64.b64encode(f.read()).decode("ascii")
+            with self._lock:
+                self.misses += 1
+        else:
+            with self._lock:
+                self.spill_hits += 1
+
+        evicted = []
+        with self._lock:
+            if key not in self._entries and len(value) <= self.max_bytes:
+                self._entries[key] = value
+                self._size += len(value)
+                evicted = self._evict()
+        # 写溢出文件较慢, 放在锁外, 不阻塞其它线程编码
+        self._spill(evicted)
+        return value
+
+    def clear(self):
+        """清空内存中的缓存(不删除磁盘溢出文件)"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "spill_hits": self.spill_hits,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def _evict(self) -> List[Tuple[CacheKey, str]]:
+        """淘汰超出容量的条目并返回它们, 需要在持有锁时调用"""
+        evicted = []
+        while self._size > self.max_bytes and self._entries:
+            key, value = self._entries.popitem(last=False)
+            self._size -= len(value)
+            self.evictions += 1
+            evicted.append((key, value))
+        return evicted
+
+    @staticmethod
+    def _spill_path(key: CacheKey, spill_dir: str) -> Tuple[str, str]:
+        prefix = hashlib.sha1(key[0].encode("utf-8")).hexdigest()
+        return prefix, os.path.join(spill_dir, f"{prefix}-{key[1]}-{key[2]}.b64")
+
+    def _spill(self, evicted: List[Tuple[CacheKey, str]]):
+        """把淘汰的条目写入磁盘, 不需要持有锁"""
+        spill_dir = self.spill_dir
+        if spill_dir is None or not evicted:
+            return
+        for key, value in evicted:
+            prefix, spill_path = self._spill_path(key, spill_dir)
+            if os.path.exists(spill_path):
+                continue
+            try:
+                # 同一路径只保留最新版本的溢出文件
+                for name in os.listdir(spill_dir):
+                    if name.startswith(prefix + "-"):
+                        os.remove(os.path.join(spill_dir, name))
+                # 先写临时文件再替换, 其它线程读到的溢出文件总是完整的
+                fd, tmp = tempfile.mkstemp(dir=spill_dir, prefix=".tmp-")
+                try:
+                    with os.fdopen(fd, "w", encoding="ascii") as f:
+                        f.write(value)
+                    os.replace(tmp, spill_path)
+                except BaseException:
+                    os.remove(tmp)
+                    raise
+            except OSError as e:
+                LOG.warning(f"写入 base64 溢出缓存失败: {e}")
+
+    def _load_spill(self, key: CacheKey) -> Optional[str]:
+        spill_dir = self.spill_dir
+        if spill_dir is None:
+            return None
+        _, spill_path = self._spill_path(key, spill_dir)
+        try:
+            with open(spill_path, "r", encoding="ascii") as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+base64_cache = Base64Cache()
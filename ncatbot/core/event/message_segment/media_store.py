@@ -0,0 +1,262 @@
+"""按内容寻址的本地媒体存储
+
+文件以内容的 sha256 命名存放, 同一张图片无论在多少个群出现只保存一份.
+sqlite 索引记录 file_id / url / 文件名 到内容哈希的映射, 已经保存过的消息段
+不会被重复下载. 支持按总大小和最后访问时间淘汰.
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from ....utils import get_log, PERSISTENT_DIR
+
+if TYPE_CHECKING:
+    from .message_segment import DownloadableMessageSegment
+
+LOG = get_log("MediaStore")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    key TEXT PRIMARY KEY,
+    hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_refs_hash ON refs(hash);
+CREATE INDEX IF NOT EXISTS idx_blobs_access ON blobs(last_access);
+"""
+
+
+def _hash_file(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def segment_keys(segment: "DownloadableMessageSegment") -> List[str]:
+    """消息段在索引中的键, 按可靠程度排序"""
+    keys = []
+    if segment.file_id:
+        keys.append(f"file_id:{segment.file_id}")
+    if segment.url:
+        keys.append(f"url:{segment.url}")
+    file = segment.file
+    if file and not file.startswith(("base64://", "data:")) and len(file) < 1024:
+        if file.startswith("http"):
+            keys.append(f"url:{file}")
+        elif not os.path.exists(file):
+            # NapCat 上报的文件名(通常是内容的 md5), 本地路径的内容可能变化, 不作为键
+            keys.append(f"file:{file}")
+    return keys
+
+
+class MediaStore:
+    def __init__(
+        self,
+        root: str = os.path.join(PERSISTENT_DIR, "media_store"),
+        max_bytes: int = 1024 * 1024 * 1024,
+        max_age: Optional[float] = None,
+    ):
+        """
+        Args:
+            root: 存储目录
+            max_bytes: 存储总大小上限
+            max_age: 文件最长保留时间(秒, 按最后访问时间计算), None 表示不限制
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    # -------------------
+    # region 索引
+    # -------------------
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.join(self.root, "tmp"), exist_ok=True)
+            self._conn = sqlite3.connect(
+                os.path.join(self.root, "index.sqlite3"), check_same_thread=False
+            )
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def blob_path(self, hash: str, ext: str = "") -> str:
+        return os.path.join(self.root, hash[:2], hash + ext)
+
+    def lookup(self, keys: List[str]) -> Optional[str]:
+        """根据键查找已保存的文件路径, 未找到或文件已丢失时返回 None"""
+        if not keys:
+            return None
+        with self._lock:
+            db = self._db()
+            for key in keys:
+                row = db.execute(
+                    "SELECT b.hash, b.ext FROM refs r JOIN blobs b ON r.hash = b.hash "
+                    "WHERE r.key = ?",
+                    (key,),
+                ).fetchone()
+                if row is None:
+                    continue
+                path = self.blob_path(*row)
+                if not os.path.exists(path):
+                    self._remove_blob(db, row[0])
+                    db.commit()
+                    continue
+                db.execute(
+                    "UPDATE blobs SET last_access = ? WHERE hash = ?",
+                    (time.time(), row[0]),
+                )
+                # 补全其它键的映射, 之后用任意一个键都能直接命中
+                db.executemany(
+                    "INSERT OR REPLACE INTO refs (key, hash) VALUES (?, ?)",
+                    [(k, row[0]) for k in keys],
+                )
+                db.commit()
+                return path
+        return None
+
+    def add_file(self, path: str, keys: List[str] = (), move: bool = False) -> str:
+        """把本地文件加入存储
+
+        Args:
+            path: 文件路径
+            keys: 需要映射到该文件的键
+            move: 是否移动(而不是复制)源文件
+
+        Returns:
+            str: 存储中的文件路径
+        """
+        hash = _hash_file(path)
+        ext = os.path.splitext(path)[1].lower()
+        size = os.path.getsize(path)
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT ext FROM blobs WHERE hash = ?", (hash,)).fetchone()
+            if row is not None and os.path.exists(self.blob_path(hash, row[0])):
+                ext = row[0]
+                if move:
+                    os.remove(path)
+            else:
+                target = self.blob_path(hash, ext)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                if move:
+                    shutil.move(path, target)
+                else:
+                    shutil.copyfile(path, target)
+                db.execute(
+                    "INSERT OR REPLACE INTO blobs (hash, ext, size, created, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (hash, ext, size, now, now),
+                )
+            db.execute("UPDATE blobs SET last_access = ? WHERE hash = ?", (now, hash))
+            db.executemany(
+                "INSERT OR REPLACE INTO refs (key, hash) VALUES (?, ?)",
+                [(k, hash) for k in keys],
+            )
+            db.commit()
+        self.evict(keep=hash)
+        return self.blob_path(hash, ext)
+
+    # -------------------
+    # region 消息段接口
+    # -------------------
+
+    async def get_path(self, segment: "DownloadableMessageSegment") -> str:
+        """获取消息段对应的本地文件路径, 已保存过的消息段不会重复下载"""
+        keys = segment_keys(segment)
+        path = await asyncio.to_thread(self.lookup, keys)
+        if path is not None:
+            return path
+
+        ext = os.path.splitext(segment.get_file_name())[1]
+        tmp_dir = os.path.join(self.root, "tmp")
+        await asyncio.to_thread(os.makedirs, tmp_dir, exist_ok=True)
+        tmp_path = await segment.download_to(tmp_dir, f"{uuid.uuid4().hex}{ext}")
+        try:
+            return await asyncio.to_thread(self.add_file, tmp_path, keys, True)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    # -------------------
+    # region 淘汰
+    # -------------------
+
+    def _remove_blob(self, db: sqlite3.Connection, hash: str):
+        row = db.execute("SELECT ext FROM blobs WHERE hash = ?", (hash,)).fetchone()
+        if row is not None:
+            path = self.blob_path(hash, row[0])
+            if os.path.exists(path):
+                os.remove(path)
+        db.execute("DELETE FROM blobs WHERE hash = ?", (hash,))
+        db.execute("DELETE FROM refs WHERE hash = ?", (hash,))
+
+    def evict(self, keep: str = None) -> int:
+        """按最后访问时间和总大小淘汰文件, 返回淘汰的文件数
+
+        Args:
+            keep: 不淘汰的文件哈希(刚加入的文件)
+        """
+        removed = 0
+        with self._lock:
+            db = self._db()
+            if self.max_age is not None:
+                expired = db.execute(
+                    "SELECT hash FROM blobs WHERE last_access < ?",
+                    (time.time() - self.max_age,),
+                ).fetchall()
+                for (hash,) in expired:
+                    self._remove_blob(db, hash)
+                    removed += 1
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            if total > self.max_bytes:
+                rows = db.execute(
+                    "SELECT hash, size FROM blobs ORDER BY last_access"
+                ).fetchall()
+                for hash, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    if hash == keep:
+                        continue
+                    self._remove_blob(db, hash)
+                    total -= size
+                    removed += 1
+            db.commit()
+        if removed:
+            LOG.debug(f"媒体存储淘汰了 {removed} 个文件")
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            db = self._db()
+            files, total = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()
+            refs = db.execute("SELECT COUNT(*) FROM refs").fetchone()[0]
+        return {"files": files, "bytes": total, "refs": refs}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+media_store = MediaStore()
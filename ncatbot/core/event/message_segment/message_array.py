@@ -1,5 +1,4 @@
-import re
-from typing import Dict, Union, Type, TypeVar, List, Iterable
+from typing import Dict, Union, Type, TypeVar, List, Iterable, Optional
 from .message_segment import (
     MessageSegment,
     Text,
@@ -15,6 +14,7 @@ from .message_segment import (
     get_class_by_name,
     MessageTypeNotFoundErr,
 )
+from .cq_code import parse_cq_code_to_onebot11, encode_onebot11_to_cq
 from ....utils import NcatBotError, status, get_log
 
 T = TypeVar("T", bound=MessageSegment)
@@ -29,77 +29,6 @@ class MessageFormatError(NcatBotError):
     logger = LOG
 
 
-def parse_cq_code_to_onebot11(
-    cq_string: str,
-) -> List[Dict[str, Union[str, Dict[str, str]]]]:
-    """
-    将 CQ 码字符串解析为 OneBot 11 规范的消息数组格式，包含转义字符处理
-
-    Args:
-        cq_string: 包含 CQ 码的字符串，例如 "[CQ:image,file=123.jpg]这是一段文本[CQ:face,id=123]"
-
-    Returns:
-        OneBot 11 规范的消息数组，例如:
-        [
-            {"type": "image", "data": {"file": "123.jpg"}},
-            {"type": "text", "data": {"text": "这是一段文本"}},
-            {"type": "face", "data": {"id": "123"}}
-        ]
-    """
-    # 正则表达式匹配 CQ 码
-    cq_pattern = re.compile(r"\[CQ:([^,\]]+)(?:,([^\]]+))?\]")
-
-    # 初始化结果列表
-    message_segments = []
-    last_pos = 0
-
-    # HTML 实体转义映射
-    html_unescape_map = {"&amp;": "&", "&#91;": "[", "&#93;": "]", "&#44;": ","}
-
-    def unescape_cq(text: str) -> str:
-        """取消 CQ 码中的 HTML 实体转义"""
-        for escaped, unescaped in html_unescape_map.items():
-            text = text.replace(escaped, unescaped)
-        return text
-
-    # 遍历所有匹配的 CQ 码
-    for match in cq_pattern.finditer(cq_string):
-        # 处理 CQ 码之前的文本（如果有）
-        text_before = cq_string[last_pos : match.start()]
-        if text_before:
-            # 普通文本也需要反转义
-            message_segments.append(
-                {"type": "text", "data": {"text": unescape_cq(text_before)}}
-            )
-
-        # 处理 CQ 码
-        cq_type = match.group(1)
-        cq_params_str = match.group(2) or ""
-
-        # 解析 CQ 码参数
-        params = {}
-        for param in cq_params_str.split(","):
-            if "=" in param:
-                key, value = param.split("=", 1)
-                # 对参数值进行反转义处理
-                params[key] = unescape_cq(value)
-
-        # 添加到结果列表
-        message_segments.append({"type": cq_type, "data": params})
-
-        # 更新最后位置
-        last_pos = match.end()
-
-    # 处理最后一个 CQ 码之后的文本（如果有）
-    text_after = cq_string[last_pos:]
-    if text_after:
-        message_segments.append(
-            {"type": "text", "data": {"text": unescape_cq(text_after)}}
-        )
-
-    return message_segments
-
-
 def process_dict(data: dict) -> MessageSegment:
     msg_seg_type = data.get("type")
     msg_data = data.get("data")
@@ -147,6 +76,8 @@ class MessageArray:
     """
 
     messages: List[MessageSegment] = []
+    _wire_cache: Optional[List[Dict]] = None  # to_list 的缓存
+    _wire_snapshot: Optional[List[MessageSegment]] = None  # 生成缓存时的消息段
 
     @classmethod
     def from_list(cls, data: List[Union[dict, MessageSegment]]):
@@ -154,11 +85,45 @@ class MessageArray:
         return cls(data)
 
     def to_list(self) -> List[Dict]:
+        """转换为 OneBot 11 消息数组
+
+        结果会被缓存, 重复发送(如群发)时复用同一份 list.
+        返回的 list 及其中的 dict 由所有调用方共享, 不得修改; 需要拼接或改写时
+        先复制(如 `list(msg.to_list())`), 否则之后再发送这条消息会发出被改过的内容.
+        增删消息段时缓存自动失效, 原地修改消息段属性后需调用 `invalidate_cache()`
+        """
+        if self._wire_cache is not None and self._snapshot_matches():
+            return self._wire_cache
         data = []
         for item in self.messages:
             data.append(item.to_dict())
+        self._wire_cache = data
+        self._wire_snapshot = list(self.messages)
         return data
 
+    def to_cq(self) -> str:
+        """转换为 CQ 码字符串, 用于日志和 raw_message 比较
+
+        媒体消息段保留原始的 file 值, 不做上传转换
+        """
+        return encode_onebot11_to_cq(
+            MessageSegment.to_dict(item) for item in self.messages
+        )
+
+    def invalidate_cache(self):
+        """使 to_list 的缓存失效"""
+        self._wire_cache = None
+        self._wire_snapshot = None
+
+    def _snapshot_matches(self) -> bool:
+        snapshot = self._wire_snapshot
+        if len(snapshot) != len(self.messages):
+            return False
+        for old, new in zip(snapshot, self.messages):
+            if old is not new:
+                return False
+        return True
+
     def __init__(self, *args):
         self.messages = process_item(args)
         if self.is_forward_msg():
@@ -174,18 +139,22 @@ class MessageArray:
 
     def add_by_list(self, data: List[Union[dict, MessageSegment]]):
         self.messages.extend(process_item(data))
+        self.invalidate_cache()
         return self
 
     def add_by_segment(self, segment: MessageSegment):
         self.messages.append(segment)
+        self.invalidate_cache()
         return self
 
     def add_by_dict(self, data: dict):
         self.messages.append(process_dict(data))
+        self.invalidate_cache()
         return self
 
     def add_text(self, text: str):
         self.messages.extend(process_item(text))
+        self.invalidate_cache()
         return self
 
     def add_image(self, image: str):
@@ -193,6 +162,7 @@ class MessageArray:
             self.messages.append(image)
         else:
             self.messages.append(Image(file=image))
+        self.invalidate_cache()
         return self
 
     def add_at(self, user_id: Union[str, int]):
@@ -200,14 +170,17 @@ class MessageArray:
             self.messages.append(user_id)
         else:
             self.messages.append(At(user_id))
+        self.invalidate_cache()
         return self
 
     def add_at_all(self):
         self.messages.append(AtAll())
+        self.invalidate_cache()
         return self
 
     def add_reply(self, message_id: Union[str, int]):
         self.messages.append(Reply(message_id))
+        self.invalidate_cache()
         return self
 
     def __add__(self, other):
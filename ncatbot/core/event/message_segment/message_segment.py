@@ -1,8 +1,8 @@
+import asyncio
 import os
 import time
 import httpx
 import urllib.parse
-import copy
 from dataclasses import dataclass, field, fields
 from typing import (
     Literal,
@@ -15,8 +15,10 @@ from typing import (
     Type,
     List,
 )
-from ....utils import get_log, run_coroutine, NcatBotError, status
+from ....utils import get_log, loop_bridge, NcatBotError, status
 from .utils import convert_uploadable_object
+from .media_cache import base64_cache
+from .downloader import download_manager
 
 if TYPE_CHECKING:
     from .message_array import MessageArray
@@ -26,6 +28,11 @@ T = TypeVar("T")
 LOG = get_log("MessageSegment")
 
 
+def _write_bytes(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
 class MessageTypeNotFoundErr(NcatBotError):
     def __init__(self, type_name):
         super().__init__(f"找不到消息类型: {type_name}")
@@ -211,40 +218,36 @@ class DownloadableMessageSegment(MessageSegment):
         return filename
 
     def to_dict(self):
-        # 不修改本身的 file 属性，提供一个转换后的副本
-        copy_self = copy.deepcopy(self)
-        copy_self.file = convert_uploadable_object(copy_self.file)
-        # 调用父类的to_dict()方法，防止无限递归
-        return super(DownloadableMessageSegment, copy_self).to_dict()
+        # 不修改本身的 file 属性，也不复制整个对象，只替换序列化结果中的 file 字段
+        result = super().to_dict()
+        file = convert_uploadable_object(self.file)
+        if file not in [None, "", "None"]:
+            result["data"]["file"] = file
+        return result
 
     def get_base64(self):
         import base64
 
         if self.url is not None:
-            self.download_sync("./data", f".temp-{self.get_file_name()}")
-            with open(f"./data/.temp-{self.get_file_name()}", "rb") as f:
-                encoded = base64.b64encode(f.read()).decode("utf-8")
-            os.remove(f"./data/.temp-{self.get_file_name()}")
+            content = download_manager.fetch_bytes_sync(self.url)
+            encoded = base64.b64encode(content).decode("utf-8")
             return f"base64://{encoded}"
 
         else:
             if os.path.exists(self.file):
-                with open(self.file, "rb") as f:
-                    encoded = base64.b64encode(f.read()).decode("utf-8")
-                return f"base64://{encoded}"
+                return base64_cache.get_base64(self.file)
             elif self.file.startswith("base64://"):
                 return self.file
             elif self.file.startswith("data:"):
                 return "base64://" + self.file.split("base64,")[-1]
             elif self.file.startswith("http"):
                 try:
-                    response = httpx.get(self.file)
-                    if response.status_code == 200:
-                        encoded = base64.b64encode(response.content).decode("utf-8")
-                        return f"base64://{encoded}"
-                    else:
-                        LOG.error(f"无法下载文件，HTTP 状态码: {response.status_code}")
-                        return None
+                    content = download_manager.fetch_bytes_sync(self.file)
+                    encoded = base64.b64encode(content).decode("utf-8")
+                    return f"base64://{encoded}"
+                except httpx.HTTPStatusError as e:
+                    LOG.error(f"无法下载文件，HTTP 状态码: {e.response.status_code}")
+                    return None
                 except httpx.RequestError as e:
                     LOG.error(f"下载文件时出错: {e}")
                     return None
@@ -270,16 +273,15 @@ class DownloadableMessageSegment(MessageSegment):
         # TODO: 优化这里屎一样的逻辑
         path = self._get_final_path(dir, name)
         if self.url is not None:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(self.url, timeout=60)
-                resp.raise_for_status()
-                with open(path, "wb") as f:
-                    f.write(resp.content)
+            # 同一文件的并发下载只请求一次
+            await download_manager.download(
+                self.url, path, key=self.file_id or self.url
+            )
         else:
             if os.path.exists(self.file):
                 import shutil
 
-                shutil.copyfile(self.file, path)
+                await asyncio.to_thread(shutil.copyfile, self.file, path)
             else:
                 b64_data = self.get_base64()
                 if b64_data is None:
@@ -290,16 +292,25 @@ class DownloadableMessageSegment(MessageSegment):
                     b64_data = b64_data.split("base64,")[-1]
                 elif b64_data.startswith("base64://"):
                     b64_data = b64_data[len("base64://") :]
-                with open(path, "wb") as f:
-                    f.write(base64.b64decode(b64_data))
+                await asyncio.to_thread(_write_bytes, path, base64.b64decode(b64_data))
 
         return path
 
     async def download(self, dir, name: str = None):
         return await self.download_to(dir, name)
 
+    async def get_local_path(self) -> str:
+        """获取文件在媒体存储中的本地路径
+
+        文件按内容去重保存, 已经保存过的文件(按 file_id / url / 文件名匹配)不会重复下载.
+        需要长期归档图片时应优先使用本接口而不是 download.
+        """
+        from .media_store import media_store
+
+        return await media_store.get_path(self)
+
     def download_sync(self, dir: str, name: str = None):
-        return run_coroutine(self.download, dir, name)
+        return loop_bridge.run(self.download, dir, name)
 
     def __str__(self):
         return self.__repr__()
@@ -0,0 +1 @@
+"""消息段测试模块"""
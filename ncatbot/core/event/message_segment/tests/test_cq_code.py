@@ -0,0 +1,100 @@
+"""CQ 码编解码测试
+
+测试内容：
+- 解析与转义
+- 编码/解析往返(随机生成的消息数组)
+- MessageArray.to_cq
+"""
+
+import random
+
+from ncatbot.core.event.message_segment import MessageArray, Text, At, Image, Face
+from ncatbot.core.event.message_segment.cq_code import (
+    parse_cq_code_to_onebot11,
+    encode_onebot11_to_cq,
+    escape_cq_text,
+    unescape_cq,
+)
+
+# 包含所有需要转义的字符
+ALPHABET = "ab &[],=:CQ中文&amp;&#91;"
+
+
+def _random_text(rng: random.Random, min_len: int = 0) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(min_len, 12)))
+
+
+def _random_message(rng: random.Random) -> list:
+    message = []
+    for _ in range(rng.randint(0, 8)):
+        # 相邻的文本段在往返后会合并, 生成时避免
+        if rng.random() < 0.4 and (not message or message[-1]["type"] != "text"):
+            message.append({"type": "text", "data": {"text": _random_text(rng, 1)}})
+        else:
+            data = {f"k{i}": _random_text(rng) for i in range(rng.randint(0, 3))}
+            message.append({"type": rng.choice(["image", "at", "face"]), "data": data})
+    return message
+
+
+class TestCQCodec:
+    """CQ 码编解码测试类"""
+
+    def test_parse_basic(self):
+        """测试基本解析"""
+        result = parse_cq_code_to_onebot11(
+            "[CQ:image,file=123.jpg]这是一段文本[CQ:face,id=123]"
+        )
+        assert result == [
+            {"type": "image", "data": {"file": "123.jpg"}},
+            {"type": "text", "data": {"text": "这是一段文本"}},
+            {"type": "face", "data": {"id": "123"}},
+        ]
+
+    def test_parse_escapes(self):
+        """测试文本和参数中的转义"""
+        result = parse_cq_code_to_onebot11(
+            "&#91;a&#93;&amp;[CQ:share,url=http://x?a=1&amp;b=2,title=x&#44;y]"
+        )
+        assert result == [
+            {"type": "text", "data": {"text": "[a]&"}},
+            {"type": "share", "data": {"url": "http://x?a=1&b=2", "title": "x,y"}},
+        ]
+
+    def test_unescape_single_pass(self):
+        """测试反转义只进行一次, 不会对结果再次反转义"""
+        assert unescape_cq("&amp;#91;") == "&#91;"
+        assert unescape_cq(escape_cq_text("&#91;")) == "&#91;"
+
+    def test_empty_and_plain(self):
+        """测试空字符串和纯文本"""
+        assert parse_cq_code_to_onebot11("") == []
+        assert parse_cq_code_to_onebot11("hello") == [
+            {"type": "text", "data": {"text": "hello"}}
+        ]
+
+    def test_round_trip_random(self):
+        """测试随机消息数组编码后解析得到原数组"""
+        rng = random.Random(20240601)
+        for _ in range(500):
+            message = _random_message(rng)
+            encoded = encode_onebot11_to_cq(message)
+            assert parse_cq_code_to_onebot11(encoded) == message, encoded
+
+    def test_round_trip_random_strings(self):
+        """测试随机 CQ 字符串解析后编码再解析结果不变"""
+        rng = random.Random(42)
+        for _ in range(500):
+            message = _random_message(rng)
+            once = parse_cq_code_to_onebot11(encode_onebot11_to_cq(message))
+            twice = parse_cq_code_to_onebot11(encode_onebot11_to_cq(once))
+            assert once == twice
+
+    def test_message_array_to_cq(self):
+        """测试 MessageArray.to_cq"""
+        msg = MessageArray(Text("[hi]"), At(123), Face(1), Image(file="a.png"))
+        cq = msg.to_cq()
+        assert cq == (
+            "&#91;hi&#93;[CQ:at,qq=123][CQ:face,id=1]"
+            "[CQ:image,file=a.png,summary=&#91;图片&#93;,sub_type=0]"
+        )
+        assert MessageArray(cq).to_cq() == cq
@@ -0,0 +1,166 @@
+"""下载管理器测试
+
+使用本地 HTTP 服务器测试：
+- 大文件流式下载
+- 并发下载去重
+- 单主机并发限制
+- 下载失败时清理临时文件
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from ncatbot.core.event.message_segment import Image
+from ncatbot.core.event.message_segment.downloader import DownloadManager
+
+BIG_SIZE = 16 * 1024 * 1024
+BIG_DATA = os.urandom(BIG_SIZE)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests[self.path] = server.requests.get(self.path, 0) + 1
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.2)
+            if self.path.startswith("/missing"):
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Length", str(BIG_SIZE))
+            self.end_headers()
+            view = memoryview(BIG_DATA)
+            for i in range(0, BIG_SIZE, 1024 * 1024):
+                self.wfile.write(view[i : i + 1024 * 1024])
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.active = 0
+        self.max_active = 0
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+@pytest.fixture
+def server():
+    srv = _Server()
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _md5(path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+class TestDownloadManager:
+    """DownloadManager 测试类"""
+
+    def test_stream_large_file(self, server, tmp_path):
+        """测试大文件流式下载完整性"""
+        manager = DownloadManager(chunk_size=64 * 1024)
+        path = str(tmp_path / "big.bin")
+
+        async def run():
+            try:
+                return await manager.download(f"{server.base_url}/big", path)
+            finally:
+                await manager.aclose()
+
+        assert asyncio.run(run()) == path
+        assert _md5(path) == hashlib.md5(BIG_DATA).hexdigest()
+        assert not os.path.exists(path + ".part")
+
+    def test_concurrent_downloads_deduplicated(self, server, tmp_path):
+        """测试同一 URL 的并发下载只请求一次"""
+        manager = DownloadManager()
+        url = f"{server.base_url}/slow/same"
+        paths = [str(tmp_path / f"copy{i}.bin") for i in range(5)]
+
+        async def run():
+            try:
+                await asyncio.gather(*(manager.download(url, p) for p in paths))
+            finally:
+                await manager.aclose()
+
+        asyncio.run(run())
+        assert server.requests["/slow/same"] == 1
+        digests = {_md5(p) for p in paths}
+        assert digests == {hashlib.md5(BIG_DATA).hexdigest()}
+
+    def test_per_host_limit(self, server, tmp_path):
+        """测试单主机并发数限制"""
+        manager = DownloadManager(max_concurrency=8, max_per_host=2)
+
+        async def run():
+            try:
+                await asyncio.gather(
+                    *(
+                        manager.download(
+                            f"{server.base_url}/slow/{i}", str(tmp_path / f"{i}.bin")
+                        )
+                        for i in range(6)
+                    )
+                )
+            finally:
+                await manager.aclose()
+
+        asyncio.run(run())
+        assert server.max_active <= 2
+        assert len(server.requests) == 6
+
+    def test_http_error_cleans_up(self, server, tmp_path):
+        """测试下载失败时抛出异常并删除临时文件"""
+        manager = DownloadManager()
+        path = str(tmp_path / "missing.bin")
+
+        async def run():
+            try:
+                await manager.download(f"{server.base_url}/missing", path)
+            finally:
+                await manager.aclose()
+
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(run())
+        assert not os.path.exists(path)
+        assert not os.path.exists(path + ".part")
+
+    def test_segment_download_and_base64(self, server, tmp_path):
+        """测试消息段通过共享下载器下载和获取 base64"""
+        image = Image(file="abc.png")
+        image.url = f"{server.base_url}/big"
+        path = image.download_sync(str(tmp_path))
+        assert _md5(path) == hashlib.md5(BIG_DATA).hexdigest()
+        assert image.get_base64().startswith("base64://")
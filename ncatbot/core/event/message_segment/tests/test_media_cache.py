@@ -0,0 +1,107 @@
+"""base64 编码缓存测试
+
+测试内容：
+- 命中/未命中计数
+- 文件修改后自动失效
+- 容量淘汰与磁盘溢出, 溢出文件写完整后才可见
+"""
+
+import base64
+import os
+
+from ncatbot.core.event.message_segment import media_cache
+from ncatbot.core.event.message_segment.media_cache import Base64Cache
+
+
+def _write(path, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+class TestBase64Cache:
+    """Base64Cache 测试类"""
+
+    def test_hit_and_miss(self, tmp_path):
+        """测试重复读取命中缓存"""
+        path = tmp_path / "a.png"
+        _write(path, b"hello")
+        cache = Base64Cache()
+        expected = "base64://" + base64.b64encode(b"hello").decode()
+        assert cache.get_base64(str(path)) == expected
+        assert cache.get_base64(str(path)) == expected
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+    def test_modified_file_invalidates(self, tmp_path):
+        """测试文件内容变化后重新编码"""
+        path = tmp_path / "a.png"
+        _write(path, b"hello")
+        cache = Base64Cache()
+        cache.get_base64(str(path))
+        _write(path, b"hello world")
+        os.utime(path, ns=(0, 10**9))
+        result = cache.get_base64(str(path))
+        assert result == "base64://" + base64.b64encode(b"hello world").decode()
+        assert cache.stats()["misses"] == 2
+
+    def test_eviction_by_bytes(self, tmp_path):
+        """测试按字节数淘汰最久未使用的条目"""
+        paths = []
+        for name in "abc":
+            path = tmp_path / f"{name}.bin"
+            _write(path, b"x" * 300)
+            paths.append(str(path))
+        # 每个条目约 409 字节, 只能容纳两个
+        cache = Base64Cache(max_bytes=900)
+        for path in paths:
+            cache.get_base64(path)
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= 900
+
+    def test_spill_to_disk(self, tmp_path):
+        """测试淘汰条目写入磁盘并在下次使用时读回"""
+        spill_dir = tmp_path / "spill"
+        first = tmp_path / "a.bin"
+        second = tmp_path / "b.bin"
+        _write(first, b"a" * 300)
+        _write(second, b"b" * 300)
+        cache = Base64Cache(max_bytes=500)
+        cache.configure(spill_dir=str(spill_dir))
+        expected = cache.get_base64(str(first))
+        cache.get_base64(str(second))
+        assert len(os.listdir(spill_dir)) == 1
+        assert cache.get_base64(str(first)) == expected
+        assert cache.stats()["spill_hits"] == 1
+
+    def test_spill_atomic(self, tmp_path, monkeypatch):
+        """测试溢出文件写入过程中读取不到不完整的内容"""
+        spill_dir = tmp_path / "spill"
+        first = tmp_path / "a.bin"
+        second = tmp_path / "b.bin"
+        _write(first, b"a" * 300)
+        _write(second, b"b" * 300)
+        cache = Base64Cache(max_bytes=500)
+        cache.configure(spill_dir=str(spill_dir))
+        expected = cache.get_base64(str(first))
+        key = next(iter(cache._entries))
+
+        during = []
+        replace = os.replace
+
+        def checked_replace(src, dst):
+            # 内容已写完, 但尚未替换到位时读取
+            during.append(cache._load_spill(key))
+            with open(src, encoding="ascii") as f:
+                during.append(f.read())
+            replace(src, dst)
+
+        monkeypatch.setattr(media_cache.os, "replace", checked_replace)
+        cache.get_base64(str(second))
+        assert during == [None, expected]
+        assert os.listdir(spill_dir) == [
+            os.path.basename(cache._spill_path(key, str(spill_dir))[1])
+        ]
+        assert cache._load_spill(key) == expected
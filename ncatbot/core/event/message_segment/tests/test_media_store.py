@@ -0,0 +1,77 @@
+"""媒体存储测试
+
+测试内容：
+- 相同内容只保存一份
+- 已保存的消息段不重复下载
+- 按大小和时间淘汰
+"""
+
+import asyncio
+import base64
+import os
+
+from ncatbot.core.event.message_segment import Image
+from ncatbot.core.event.message_segment.media_store import MediaStore
+
+
+def _image(data: bytes, file_id: str) -> Image:
+    image = Image(file="base64://" + base64.b64encode(data).decode())
+    image.file_id = file_id
+    return image
+
+
+class TestMediaStore:
+    """MediaStore 测试类"""
+
+    def test_same_content_deduplicated(self, tmp_path):
+        """测试不同来源的相同内容只保存一份"""
+        store = MediaStore(root=str(tmp_path / "store"))
+        first = asyncio.run(store.get_path(_image(b"meme", "id-1")))
+        second = asyncio.run(store.get_path(_image(b"meme", "id-2")))
+        assert first == second
+        with open(first, "rb") as f:
+            assert f.read() == b"meme"
+        stats = store.stats()
+        assert stats["files"] == 1
+        assert stats["refs"] == 2
+
+    def test_known_segment_not_downloaded(self, tmp_path):
+        """测试已保存过的 file_id 直接命中, 不再下载"""
+        store = MediaStore(root=str(tmp_path / "store"))
+        path = asyncio.run(store.get_path(_image(b"meme", "id-1")))
+
+        image = _image(b"meme", "id-1")
+
+        async def fail(*args, **kwargs):
+            raise AssertionError("不应重新下载")
+
+        image.download_to = fail
+        assert asyncio.run(store.get_path(image)) == path
+
+    def test_missing_blob_redownloaded(self, tmp_path):
+        """测试存储中的文件被删除后重新下载"""
+        store = MediaStore(root=str(tmp_path / "store"))
+        path = asyncio.run(store.get_path(_image(b"meme", "id-1")))
+        os.remove(path)
+        assert asyncio.run(store.get_path(_image(b"meme", "id-1"))) == path
+        assert os.path.exists(path)
+
+    def test_evict_by_size(self, tmp_path):
+        """测试超出容量时淘汰最久未访问的文件"""
+        store = MediaStore(root=str(tmp_path / "store"), max_bytes=250)
+        paths = [
+            asyncio.run(store.get_path(_image(bytes([i]) * 100, f"id-{i}")))
+            for i in range(3)
+        ]
+        assert not os.path.exists(paths[0])
+        assert os.path.exists(paths[1]) and os.path.exists(paths[2])
+        assert store.stats()["files"] == 2
+        assert store.lookup(["file_id:id-0"]) is None
+
+    def test_evict_by_age(self, tmp_path):
+        """测试超过保留时间的文件被淘汰"""
+        store = MediaStore(root=str(tmp_path / "store"))
+        path = asyncio.run(store.get_path(_image(b"old", "id-old")))
+        store.max_age = -1
+        assert store.evict() == 1
+        assert not os.path.exists(path)
@@ -0,0 +1,62 @@
+"""MessageArray 序列化测试
+
+测试内容：
+- DownloadableMessageSegment.to_dict 不修改自身
+- MessageArray.to_list 缓存复用与失效
+"""
+
+from ncatbot.core.event.message_segment import MessageArray, Image, File, Text
+
+
+class TestDownloadableToDict:
+    """可下载消息段序列化测试类"""
+
+    def test_to_dict_does_not_mutate(self):
+        """测试 to_dict 不修改 file 属性"""
+        image = Image(file="data:image/png;base64,AAAA")
+        result = image.to_dict()
+        assert result == {
+            "type": "image",
+            "data": {"file": "base64://AAAA", "summary": "[图片]", "sub_type": 0},
+        }
+        assert image.file == "data:image/png;base64,AAAA"
+
+    def test_file_name(self):
+        """测试 File 消息段附带文件名"""
+        result = File(file="http://example.com/a.txt").to_dict()
+        assert result["data"]["file"] == "http://example.com/a.txt"
+        assert result["data"]["name"] == "a.txt"
+
+
+class TestWireCache:
+    """to_list 缓存测试类"""
+
+    def test_repeated_to_list_reuses_result(self):
+        """测试重复序列化复用同一份结果"""
+        msg = MessageArray(Text("hello"), Image(file="http://example.com/a.png"))
+        first = msg.to_list()
+        assert msg.to_list() is first
+
+    def test_add_invalidates_cache(self):
+        """测试通过接口追加消息段后缓存失效"""
+        msg = MessageArray(Text("hello"))
+        first = msg.to_list()
+        msg.add_text("world")
+        second = msg.to_list()
+        assert second is not first
+        assert [seg["data"]["text"] for seg in second] == ["hello", "world"]
+
+    def test_direct_list_mutation_detected(self):
+        """测试直接替换 messages 中的消息段也能被检测到"""
+        msg = MessageArray(Text("hello"))
+        msg.to_list()
+        msg.messages[0] = Text("bye")
+        assert msg.to_list()[0]["data"]["text"] == "bye"
+
+    def test_manual_invalidate(self):
+        """测试原地修改消息段属性后手动失效"""
+        msg = MessageArray(Text("hello"))
+        msg.to_list()
+        msg.messages[0].text = "changed"
+        msg.invalidate_cache()
+        assert msg.to_list()[0]["data"]["text"] == "changed"
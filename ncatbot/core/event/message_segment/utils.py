@@ -1,10 +1,10 @@
 import re
 import os
-import base64
 import urllib.request
 from urllib.parse import urljoin
 from ncatbot.utils import ncatbot_config
 from ....utils import get_log
+from .media_cache import base64_cache
 
 LOG = get_log("MessageSegmentUtils")
 
@@ -52,11 +52,7 @@ def convert_uploadable_object(i):
     elif os.path.exists(i):
         if ncatbot_config.is_napcat_local():
             return os.path.abspath(i)
-        i = urljoin(
-            "file:",
-            f"base64://{base64.b64encode(open(i, 'rb').read()).decode('utf-8')}",
-        )
-        return i
+        return base64_cache.get_base64(i)
     else:
         # 文件不存在时同样规范处理(可能在 NapCat 机子上)
         file_url = urljoin("file:", urllib.request.pathname2url(os.path.abspath(i)))
@@ -1,3 +1,13 @@
 from .forward_constructor import ForwardConstructor
+from .broadcast import Broadcaster, BroadcastResult, TokenBucket
+from .chunker import ChunkedSender, split_text, shard_forward
 
-__all__ = ["ForwardConstructor"]
+__all__ = [
+    "ForwardConstructor",
+    "Broadcaster",
+    "BroadcastResult",
+    "TokenBucket",
+    "ChunkedSender",
+    "split_text",
+    "shard_forward",
+]
@@ -0,0 +1,246 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from ...utils import get_log
+from ..event import MessageArray
+
+if TYPE_CHECKING:
+    from ..api import BotAPI
+
+LOG = get_log("Broadcaster")
+
+# 单目标限速的令牌桶按 BotAPI 保存, 每次群发新建的 Broadcaster 共用同一组桶
+_target_buckets: "weakref.WeakKeyDictionary[BotAPI, Dict[Tuple[str, float], TokenBucket]]" = weakref.WeakKeyDictionary()
+
+
+class TokenBucket:
+    """令牌桶限速器
+
+    Args:
+        rate: 每秒补充的令牌数
+        burst: 桶容量, 即允许的突发数量
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+@dataclass
+class BroadcastResult:
+    """群发结果, 也可作为断点续发的进度"""
+
+    message_ids: Dict[str, str] = field(default_factory=dict)
+    errors: Dict[str, Exception] = field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> List[str]:
+        return list(self.message_ids)
+
+    @property
+    def failed(self) -> List[str]:
+        return list(self.errors)
+
+    def to_dict(self) -> dict:
+        return {
+            "message_ids": self.message_ids,
+            "errors": {k: repr(v) for k, v in self.errors.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BroadcastResult":
+        # 失败记录不恢复, 续发时会重新尝试
+        return cls(message_ids=dict(data.get("message_ids", {})))
+
+
+class Broadcaster:
+    """并发、限速的群发引擎
+
+    消息只序列化一次, 所有目标复用同一份消息数组. 单个目标失败不会中断群发,
+    结果和异常按目标收集在 BroadcastResult 中.
+
+    Args:
+        api: BotAPI 实例
+        concurrency: 同时进行的发送数
+        rate: 全局每秒发送数
+        burst: 全局令牌桶容量
+        per_target_rate: 单个目标每秒发送数, 同一 BotAPI 的多次群发共用限额, None 表示不限制
+        jitter: 每次发送前随机等待的最长秒数, 避免固定节奏触发风控
+        progress_file: 进度文件路径, 设置后每次成功都会记录, 中断后用同一条消息重新调用会跳过
+            已发送的目标; 全部发送成功后删除, 消息不同时忽略已有的进度
+    """
+
+    def __init__(
+        self,
+        api: "BotAPI",
+        concurrency: int = 4,
+        rate: float = 2.0,
+        burst: int = 1,
+        per_target_rate: Optional[float] = None,
+        jitter: float = 0.5,
+        progress_file: Optional[str] = None,
+    ):
+        self.api = api
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst)
+        self.per_target_rate = per_target_rate
+        self.jitter = jitter
+        self.progress_file = progress_file
+        self._progress_lock = asyncio.Lock()
+
+    # -------------------
+    # region 群发接口
+    # -------------------
+
+    async def broadcast_group(
+        self,
+        msg: MessageArray,
+        group_ids: Optional[Iterable[str]] = None,
+        resume: Optional[BroadcastResult] = None,
+    ) -> BroadcastResult:
+        """群发群聊消息, group_ids 为空时发送到所有群"""
+        if group_ids is None:
+            group_ids = await self.api.get_group_list()
+        return await self._run("group", msg, group_ids, self.api.send_group_msg, resume)
+
+    async def broadcast_private(
+        self,
+        msg: MessageArray,
+        user_ids: Iterable[str],
+        resume: Optional[BroadcastResult] = None,
+    ) -> BroadcastResult:
+        """群发私聊消息"""
+        return await self._run(
+            "private", msg, user_ids, self.api.send_private_msg, resume
+        )
+
+    # -------------------
+    # region 内部实现
+    # -------------------
+
+    @staticmethod
+    def _digest(kind: str, message: List[dict]) -> str:
+        """进度文件所属的群发, 按目标类型和消息内容区分"""
+        payload = json.dumps([kind, message], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _load_progress(self, digest: str) -> BroadcastResult:
+        if self.progress_file and os.path.exists(self.progress_file):
+            with open(self.progress_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("digest") == digest:
+                return BroadcastResult.from_dict(data)
+            LOG.info(f"进度文件 {self.progress_file} 属于另一次群发, 忽略")
+        return BroadcastResult()
+
+    def _clear_progress(self):
+        try:
+            os.remove(self.progress_file)
+        except FileNotFoundError:
+            pass
+
+    def _dump_progress(self, data: dict):
+        tmp = f"{self.progress_file}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, self.progress_file)
+
+    async def _save_progress(self, result: BroadcastResult, digest: str):
+        if not self.progress_file:
+            return
+        async with self._progress_lock:
+            data = dict(result.to_dict(), digest=digest)
+            await asyncio.to_thread(self._dump_progress, data)
+
+    def _target_bucket(self, target: str) -> Optional[TokenBucket]:
+        if self.per_target_rate is None:
+            return None
+        buckets = _target_buckets.setdefault(self.api, {})
+        key = (target, self.per_target_rate)
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TokenBucket(self.per_target_rate)
+        return bucket
+
+    async def _run(
+        self,
+        kind: str,
+        msg: MessageArray,
+        targets: Iterable[str],
+        send: Callable[[str, List[dict]], Awaitable[str]],
+        resume: Optional[BroadcastResult],
+    ) -> BroadcastResult:
+        message = msg.to_list()
+        digest = self._digest(kind, message)
+        if resume is None:
+            resume = await asyncio.to_thread(self._load_progress, digest)
+        result = BroadcastResult(message_ids=dict(resume.message_ids))
+        pending = [str(t) for t in targets if str(t) not in result.message_ids]
+        if result.message_ids:
+            LOG.info(f"断点续发: 跳过 {len(result.message_ids)} 个已发送目标")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send_one(target: str):
+            async with semaphore:
+                target_bucket = self._target_bucket(target)
+                if target_bucket is not None:
+                    await target_bucket.acquire()
+                await self.bucket.acquire()
+                if self.jitter > 0:
+                    await asyncio.sleep(random.uniform(0, self.jitter))
+                try:
+                    message_id = await send(target, message)
+                except Exception as e:
+                    LOG.warning(f"向 {target} 群发失败: {e}")
+                    result.errors[target] = e
+                    return
+                if not message_id:
+                    result.errors[target] = ValueError("消息发送失败, 未返回消息 ID")
+                    return
+                result.message_ids[target] = message_id
+                await self._save_progress(result, digest)
+
+        from ..api.scheduler import lane
+
+        # 开启出站调度时, 群发走 bulk 通道, 不阻塞交互回复
+        with lane("bulk"):
+            await asyncio.gather(*(send_one(target) for target in pending))
+        if self.progress_file and not result.errors:
+            # 全部发送成功, 之后的群发不应再跳过这些目标
+            async with self._progress_lock:
+                await asyncio.to_thread(self._clear_progress)
+        LOG.info(f"群发完成: 成功 {len(result.message_ids)}, 失败 {len(result.errors)}")
+        return result
@@ -0,0 +1,260 @@
+"""超长文本和合并转发的分段发送
+
+NapCat 对单条消息的长度和合并转发的节点数有限制, 超出时整条发送失败.
+- split_text 按字符数和字节数切分文本, 优先在段落、换行和句子处切分
+- shard_forward 按节点数拆分合并转发, 过长的文本节点也会切分
+- ChunkedSender 同一目标按提交顺序逐段发送, 不同目标并发发送;
+  某一段失败时剩余部分不再发送, submit_* 不等待结果时失败也会记录日志
+"""
+
+import asyncio
+import functools
+import weakref
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from ...utils import get_log
+from ..event import Forward, MessageArray, Node, PlainText
+
+if TYPE_CHECKING:
+    from ..api import BotAPI
+
+LOG = get_log("ChunkedSender")
+
+TargetKind = Literal["group", "private"]
+
+# 按优先级排列的切分位置, 切分点保留在前一段的末尾
+_BOUNDARIES = (
+    "\n\n",
+    "\n",
+    "。",
+    "！",
+    "？",
+    ". ",
+    "! ",
+    "? ",
+    "；",
+    "; ",
+    "，",
+    ", ",
+    " ",
+)
+
+
+def _cut_point(text: str, max_chars: int, max_bytes: Optional[int]) -> int:
+    limit = min(len(text), max_chars)
+    if max_bytes is not None:
+        encoded = text[:limit].encode("utf-8")
+        if len(encoded) > max_bytes:
+            # 截断到完整字符
+            limit = len(encoded[:max_bytes].decode("utf-8", "ignore"))
+    if limit >= len(text):
+        return len(text)
+    window = text[:limit]
+    for sep in _BOUNDARIES:
+        index = window.rfind(sep)
+        # 切分点太靠前时会产生过短的片段, 换下一种切分位置
+        if index >= limit // 2:
+            return index + len(sep)
+    return max(limit, 1)
+
+
+def split_text(
+    text: str, max_chars: int = 3000, max_bytes: Optional[int] = None
+) -> List[str]:
+    """按字符数和 UTF-8 字节数切分长文本, 优先在段落、换行、句子和空格处切分
+
+    Args:
+        text: 原文本
+        max_chars: 每段最多字符数
+        max_bytes: 每段最多字节数, None 表示不限制
+    """
+    chunks = []
+    while text:
+        cut = _cut_point(text, max_chars, max_bytes)
+        chunk = text[:cut].strip("\n")
+        if chunk:
+            chunks.append(chunk)
+        text = text[cut:]
+    return chunks
+
+
+def _node_text(node: Node) -> Optional[str]:
+    """纯文本节点的文本, 含其它消息段时返回 None"""
+    if node.content is None or not all(
+        isinstance(seg, PlainText) for seg in node.content
+    ):
+        return None
+    return "".join(seg.text for seg in node.content)
+
+
+def shard_forward(
+    forward: Forward,
+    max_nodes: int = 80,
+    max_chars: int = 3000,
+    max_bytes: Optional[int] = None,
+) -> List[Forward]:
+    """把节点过多的合并转发拆分为多条, 过长的纯文本节点拆分为多个节点"""
+    nodes: List[Node] = []
+    for node in forward.content or []:
+        text = _node_text(node)
+        if text is None or len(split_text(text, max_chars, max_bytes)) <= 1:
+            nodes.append(node)
+            continue
+        for chunk in split_text(text, max_chars, max_bytes):
+            nodes.append(
+                Node(node.user_id, node.nickname, MessageArray(PlainText(chunk)))
+            )
+    shards = []
+    for start in range(0, len(nodes), max_nodes):
+        shard = Forward(content=nodes[start : start + max_nodes])
+        shard.message_type = forward.message_type
+        shards.append(shard)
+    return shards
+
+
+class ChunkedSender:
+    """把超长文本和合并转发切分后按顺序发送
+
+    同一目标的各段依次发送, 保证顺序; 不同目标之间最多 concurrency 个同时发送.
+    切分是惰性的, 第一段发出时后面的段还没有序列化.
+
+    Args:
+        api: BotAPI 实例
+        max_chars: 每条文本消息最多字符数
+        max_bytes: 每条文本消息最多 UTF-8 字节数, None 表示不限制
+        max_nodes: 每条合并转发最多节点数
+        concurrency: 同时发送的目标数
+    """
+
+    def __init__(
+        self,
+        api: "BotAPI",
+        max_chars: int = 3000,
+        max_bytes: Optional[int] = None,
+        max_nodes: int = 80,
+        concurrency: int = 2,
+    ):
+        self.api = api
+        self.max_chars = max_chars
+        self.max_bytes = max_bytes
+        self.max_nodes = max_nodes
+        self.concurrency = concurrency
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        # 每个目标最后提交的任务, 后提交的任务等它完成后再发送
+        self._tails: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return semaphore
+
+    # -------------------
+    # region 发送接口
+    # -------------------
+
+    async def send_text(
+        self, kind: TargetKind, target: Union[str, int], text: str
+    ) -> List[str]:
+        """切分并发送长文本, 按顺序返回各段的消息 ID"""
+        return await self.submit_text(kind, target, text)
+
+    async def send_forward(
+        self, kind: TargetKind, target: Union[str, int], forward: Forward
+    ) -> List[str]:
+        """拆分并发送合并转发, 按顺序返回各条的消息 ID"""
+        return await self.submit_forward(kind, target, forward)
+
+    def submit_text(
+        self, kind: TargetKind, target: Union[str, int], text: str
+    ) -> "asyncio.Task[List[str]]":
+        """在后台发送长文本, 不等待发送完成"""
+
+        def senders() -> Iterator[Callable[[], Awaitable[str]]]:
+            for chunk in split_text(text, self.max_chars, self.max_bytes):
+                message = [PlainText(chunk).to_dict()]
+                if kind == "group":
+                    yield lambda m=message: self.api.send_group_msg(target, m)
+                else:
+                    yield lambda m=message: self.api.send_private_msg(target, m)
+
+        return self._submit(kind, target, senders())
+
+    def submit_forward(
+        self, kind: TargetKind, target: Union[str, int], forward: Forward
+    ) -> "asyncio.Task[List[str]]":
+        """在后台发送合并转发, 不等待发送完成"""
+
+        def senders() -> Iterator[Callable[[], Awaitable[str]]]:
+            shards = shard_forward(
+                forward, self.max_nodes, self.max_chars, self.max_bytes
+            )
+            for shard in shards:
+                if kind == "group":
+                    yield lambda s=shard: self.api.post_group_forward_msg(target, s)
+                else:
+                    yield lambda s=shard: self.api.post_private_forward_msg(target, s)
+
+        return self._submit(kind, target, senders())
+
+    # -------------------
+    # region 调度
+    # -------------------
+
+    def _submit(
+        self,
+        kind: TargetKind,
+        target: Union[str, int],
+        senders: Iterator[Callable[[], Awaitable[str]]],
+    ) -> "asyncio.Task[List[str]]":
+        key = (kind, str(target))
+        previous = self._tails.get(key)
+        task = asyncio.ensure_future(self._run(key, senders, previous))
+        # submit_* 的调用方可能不等待任务, 失败在这里取出并记录
+        task.add_done_callback(functools.partial(self._report, key))
+        self._tails[key] = task
+        return task
+
+    @staticmethod
+    def _report(key: Tuple[str, str], task: asyncio.Task) -> None:
+        if task.cancelled():
+            return
+        e = task.exception()
+        if e is not None:
+            LOG.error(f"向 {key[0]} {key[1]} 分段发送失败, 剩余部分不再发送: {e}")
+
+    async def _run(
+        self,
+        key: Tuple[str, str],
+        senders: Iterator[Callable[[], Awaitable[str]]],
+        previous: Optional[asyncio.Task],
+    ) -> List[str]:
+        try:
+            if (
+                previous is not None
+                and not previous.done()
+                and previous.get_loop() is asyncio.get_running_loop()
+            ):
+                await asyncio.wait([previous])
+            semaphore = self._semaphore()
+            message_ids = []
+            for send in senders:
+                # 每段单独占用额度, 长输出不会一直占住其它目标的发送机会
+                async with semaphore:
+                    message_ids.append(await send())
+            return message_ids
+        finally:
+            if self._tails.get(key) is asyncio.current_task():
+                del self._tails[key]
@@ -1,5 +1,5 @@
 from typing import List
-from ...utils import status, run_coroutine
+from ...utils import status, loop_bridge
 from ..event import (
     MessageArray,
     Image,
@@ -53,7 +53,7 @@ class ForwardConstructor:
     def attach_message_id(
         self, message_id: str, user_id: str = None, nickname: str = None
     ):
-        event = run_coroutine(status.global_api.get_msg, message_id)
+        event = loop_bridge.run(status.global_api.get_msg, message_id)
         user_id = user_id if user_id else event.user_id
         nickname = nickname if nickname else event.sender.nickname
         self.attach(event.message, user_id, nickname)
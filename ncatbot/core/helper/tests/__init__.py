@@ -0,0 +1 @@
+"""辅助工具测试模块"""
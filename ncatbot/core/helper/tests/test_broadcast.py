@@ -0,0 +1,214 @@
+"""群发引擎测试
+
+使用带模拟延迟的 MockAPIAdapter 测试：
+- 并发数限制
+- 失败收集不中断
+- 全局限速
+- 断点续发, 进度文件只对同一条消息有效
+- 单目标限速跨多次群发生效
+- 复用同一份序列化结果
+- post_all_group_array_msg 按群列表顺序返回, 失败时抛出异常
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from ncatbot.core.api import BotAPI
+from ncatbot.core.event import MessageArray, Text
+from ncatbot.core.helper import Broadcaster, BroadcastResult
+from ncatbot.utils.testing import MockAPIAdapter
+
+GROUPS = [str(i) for i in range(1, 41)]
+
+
+class _SlowAdapter(MockAPIAdapter):
+    """为每次调用添加延迟并记录并发数"""
+
+    def __init__(self, latency: float = 0.02, fail_groups=()):
+        super().__init__()
+        self.latency = latency
+        self.active = 0
+        self.max_active = 0
+        self.set_response(
+            "/get_group_list",
+            {"retcode": 0, "data": [{"group_id": g} for g in GROUPS]},
+        )
+        fail_groups = set(fail_groups)
+
+        def send_group_msg(endpoint, data):
+            if str(data["group_id"]) in fail_groups:
+                return {"retcode": 1200, "message": "风控"}
+            return {
+                "retcode": 0,
+                "data": {"message_id": self._generate_message_id()},
+            }
+
+        self.set_response("/send_group_msg", send_group_msg)
+
+    async def mock_callback(self, endpoint, data):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+            return await super().mock_callback(endpoint, data)
+        finally:
+            self.active -= 1
+
+
+def _broadcaster(adapter, **options) -> Broadcaster:
+    options.setdefault("rate", 10000)
+    options.setdefault("jitter", 0)
+    return Broadcaster(BotAPI(adapter.mock_callback), **options)
+
+
+class TestBroadcaster:
+    """Broadcaster 测试类"""
+
+    def test_concurrency_and_results(self):
+        """测试并发限制, 所有群都发送成功"""
+        adapter = _SlowAdapter()
+        broadcaster = _broadcaster(adapter, concurrency=5)
+        result = asyncio.run(broadcaster.broadcast_group(MessageArray(Text("hi"))))
+        assert sorted(result.succeeded, key=int) == GROUPS
+        assert not result.errors
+        assert adapter.max_active <= 5
+        assert adapter.get_call_count("/send_group_msg") == len(GROUPS)
+
+    def test_concurrent_faster_than_sequential(self):
+        """测试并发发送比逐个发送快"""
+        adapter = _SlowAdapter(latency=0.02)
+        start = time.perf_counter()
+        asyncio.run(
+            _broadcaster(adapter, concurrency=8).broadcast_group(MessageArray("hi"))
+        )
+        # 40 个群逐个发送至少 0.8 秒
+        assert time.perf_counter() - start < 0.6
+
+    def test_failures_collected(self):
+        """测试单个群失败不影响其它群"""
+        adapter = _SlowAdapter(fail_groups={"3", "7"})
+        result = asyncio.run(_broadcaster(adapter).broadcast_group(MessageArray("hi")))
+        assert sorted(result.failed) == ["3", "7"]
+        assert len(result.succeeded) == len(GROUPS) - 2
+
+    def test_rate_limit(self):
+        """测试全局令牌桶限速"""
+        adapter = _SlowAdapter(latency=0)
+        broadcaster = _broadcaster(adapter, concurrency=10, rate=50)
+        start = time.perf_counter()
+        asyncio.run(broadcaster.broadcast_group(MessageArray("hi"), GROUPS[:11]))
+        # 桶容量为 1, 11 条消息至少需要 10 / 50 秒
+        assert time.perf_counter() - start >= 0.19
+
+    def test_resume_from_progress_file(self, tmp_path):
+        """测试中断后从进度文件续发"""
+        progress = str(tmp_path / "progress.json")
+        adapter = _SlowAdapter(fail_groups={"5"})
+        first = asyncio.run(
+            _broadcaster(adapter, progress_file=progress).broadcast_group(
+                MessageArray("hi")
+            )
+        )
+        assert first.failed == ["5"]
+
+        retry = _SlowAdapter()
+        second = asyncio.run(
+            _broadcaster(retry, progress_file=progress).broadcast_group(
+                MessageArray("hi")
+            )
+        )
+        assert retry.get_call_count("/send_group_msg") == 1
+        assert len(second.succeeded) == len(GROUPS)
+        assert second.message_ids["1"] == first.message_ids["1"]
+        assert not os.path.exists(progress)
+
+    def test_progress_bound_to_message(self, tmp_path):
+        """测试不同消息的群发不使用已有的进度文件"""
+        progress = str(tmp_path / "progress.json")
+        adapter = _SlowAdapter(fail_groups={"5"})
+        asyncio.run(
+            _broadcaster(adapter, progress_file=progress).broadcast_group(
+                MessageArray("hi")
+            )
+        )
+        assert os.path.exists(progress)
+
+        other = _SlowAdapter()
+        asyncio.run(
+            _broadcaster(other, progress_file=progress).broadcast_group(
+                MessageArray("bye")
+            )
+        )
+        assert other.get_call_count("/send_group_msg") == len(GROUPS)
+
+    def test_per_target_rate_shared(self):
+        """测试单目标限速在同一 BotAPI 的多次群发之间生效"""
+        adapter = _SlowAdapter(latency=0)
+        api = BotAPI(adapter.mock_callback)
+
+        async def main():
+            for _ in range(3):
+                await api.broadcast_group_array_msg(
+                    MessageArray("hi"),
+                    GROUPS[:1],
+                    rate=1000,
+                    jitter=0,
+                    per_target_rate=20,
+                )
+
+        start = time.perf_counter()
+        asyncio.run(main())
+        # 同一个群 3 次发送至少间隔 2 / 20 秒
+        assert time.perf_counter() - start >= 0.09
+
+    def test_resume_from_result(self):
+        """测试使用上次结果续发"""
+        adapter = _SlowAdapter()
+        previous = BroadcastResult(message_ids={g: "1" for g in GROUPS[:30]})
+        asyncio.run(
+            _broadcaster(adapter).broadcast_group(MessageArray("hi"), resume=previous)
+        )
+        assert adapter.get_call_count("/send_group_msg") == 10
+
+    def test_payload_serialized_once(self):
+        """测试所有群复用同一份消息数组"""
+        adapter = _SlowAdapter()
+        asyncio.run(_broadcaster(adapter).broadcast_group(MessageArray("hi")))
+        payloads = adapter.get_calls_for_endpoint("/send_group_msg")
+        assert all(p["message"] is payloads[0]["message"] for p in payloads)
+
+    def test_broadcast_group_array_msg(self):
+        """测试 BotAPI.broadcast_group_array_msg 透传群发参数"""
+        adapter = _SlowAdapter(latency=0, fail_groups={"2"})
+        api = BotAPI(adapter.mock_callback)
+        result = asyncio.run(
+            api.broadcast_group_array_msg(
+                MessageArray("hi"), GROUPS[:3], rate=1000, jitter=0
+            )
+        )
+        assert sorted(result.succeeded) == ["1", "3"]
+        assert result.failed == ["2"]
+
+    def test_post_all_group_array_msg(self):
+        """测试 post_all_group_array_msg 返回与群列表对齐的消息 ID, 失败时抛出"""
+        groups = {"retcode": 0, "data": [{"group_id": g} for g in GROUPS[:3]]}
+
+        def send_group_msg(endpoint, data):
+            return {"retcode": 0, "data": {"message_id": f"m{data['group_id']}"}}
+
+        adapter = _SlowAdapter(latency=0)
+        adapter.set_response("/get_group_list", groups)
+        adapter.set_response("/send_group_msg", send_group_msg)
+        api = BotAPI(adapter.mock_callback)
+        message_ids = asyncio.run(api.post_all_group_array_msg(MessageArray("hi")))
+        assert message_ids == ["m1", "m2", "m3"]
+
+        failing = _SlowAdapter(latency=0, fail_groups={"2"})
+        failing.set_response("/get_group_list", groups)
+        api = BotAPI(failing.mock_callback)
+        with pytest.raises(Exception):
+            asyncio.run(api.post_all_group_array_msg(MessageArray("hi")))
+        assert failing.get_call_count("/send_group_msg") == 3
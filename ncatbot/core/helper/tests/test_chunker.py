@@ -0,0 +1,112 @@
+"""分段发送测试
+
+- 按字符数和字节数切分, 优先在换行和句子处切分
+- 合并转发按节点数拆分, 过长的文本节点拆分
+- 同一目标按顺序发送, 不同目标并发数受限
+- 不等待的后台发送失败时记录日志, 不产生未取出的异常
+"""
+
+import asyncio
+import gc
+import logging
+
+from ncatbot.core.api import BotAPI
+from ncatbot.core.event import Forward, MessageArray, Node, Text
+from ncatbot.core.helper import ChunkedSender, shard_forward, split_text
+
+
+class _Sender:
+    """记录发送内容和并发数的假 async_callback"""
+
+    def __init__(self, latency: float = 0.005):
+        self.latency = latency
+        self.sent = []
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, path, params=None):
+        self.sent.append((path, params))
+        message_id = len(self.sent)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.active -= 1
+        return {"retcode": 0, "data": {"message_id": message_id}}
+
+
+class TestSplit:
+    """切分测试类"""
+
+    def test_split_on_boundaries(self):
+        """测试优先在换行处切分, 拼接后内容不变"""
+        lines = [f"第 {i} 行内容" for i in range(200)]
+        text = "\n".join(lines)
+        chunks = split_text(text, max_chars=100)
+        assert all(len(c) <= 100 for c in chunks)
+        assert "\n".join(chunks) == text
+        assert all(c.split("\n")[-1] in lines for c in chunks)
+
+    def test_split_bytes(self):
+        """测试按 UTF-8 字节数切分不会截断字符"""
+        text = "中文" * 500
+        chunks = split_text(text, max_chars=10000, max_bytes=301)
+        assert all(len(c.encode("utf-8")) <= 301 for c in chunks)
+        assert "".join(chunks) == text
+
+    def test_shard_forward(self):
+        """测试按节点数拆分合并转发, 过长文本节点拆分为多个节点"""
+        nodes = [Node(1, "a", MessageArray(Text(f"n{i}"))) for i in range(10)]
+        nodes.append(Node(1, "a", MessageArray(Text("x " * 100))))
+        shards = shard_forward(Forward(content=nodes), max_nodes=4, max_chars=50)
+        sizes = [len(s.content) for s in shards]
+        assert sum(sizes) > 11 and max(sizes) == 4
+        assert shards[0].content[0].content.messages[0].text == "n0"
+
+
+class TestChunkedSender:
+    """ChunkedSender 测试类"""
+
+    def test_order_and_concurrency(self):
+        """测试同一目标按顺序发送, 并发数不超过上限"""
+        sender = _Sender()
+        api = BotAPI(sender)
+        chunker = ChunkedSender(api, max_chars=10, concurrency=2)
+        text = "\n".join(f"line{i:04d}" for i in range(20))
+
+        async def main():
+            tasks = [chunker.submit_text("group", g, text) for g in (1, 2, 3)]
+            tasks.append(chunker.submit_text("group", 1, "tail"))
+            return await asyncio.gather(*tasks)
+
+        results = asyncio.run(main())
+        assert sender.max_active == 2
+        assert [len(r) for r in results] == [20, 20, 20, 1]
+        group1 = [
+            p["message"][0]["data"]["text"]
+            for _, p in sender.sent
+            if p["group_id"] == 1
+        ]
+        assert group1 == [f"line{i:04d}" for i in range(20)] + ["tail"]
+
+    def test_submit_failure_retrieved(self, caplog):
+        """测试不等待结果的发送失败时记录日志, 异常已被取出"""
+
+        async def failing(path, params=None):
+            raise ConnectionError("WebSocket 未连接")
+
+        chunker = ChunkedSender(BotAPI(failing))
+        unhandled = []
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            loop.set_exception_handler(lambda _, context: unhandled.append(context))
+            chunker.submit_text("group", 1, "hello")
+            await asyncio.sleep(0.01)
+            gc.collect()
+
+        with caplog.at_level(logging.ERROR):
+            asyncio.run(main())
+        assert unhandled == []
+        assert "分段发送失败" in caplog.text
@@ -39,6 +39,8 @@ from .builtin_plugin.unified_registry import (
     group_filter,
     admin_private_filter,
     admin_group_filter,
+    rate_limit,
+    cooldown,
 )
 
 __all__ = [
@@ -74,4 +76,6 @@ __all__ = [
     "group_filter",
     "admin_group_filter",
     "admin_private_filter",
+    "rate_limit",
+    "cooldown",
 ]
@@ -1,5 +1,5 @@
 from .func_mixin import FunctionMixin, Filter, Func
-from typing import Callable, Any, List
+from typing import Callable, Any, List, Optional, Tuple
 from ncatbot.core.event import BaseMessageEvent
 from ncatbot.utils import PermissionGroup
 import asyncio
@@ -8,10 +8,11 @@ import functools
 
 class AliasFilter(Filter):
     def __init__(self, name: str, aliases: List[str]):
+        super().__init__()
         self.name = name
         self.aliases = aliases
 
-    def check(self, event: BaseMessageEvent) -> bool:
+    def _check(self, event: BaseMessageEvent) -> bool:
         if event.raw_message.startswith("/" + self.name):
             return True
         if self.aliases is not None:
@@ -20,6 +21,10 @@ class AliasFilter(Filter):
                     return True
         return False
 
+    def triggers(self) -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+        names = [self.name] + list(self.aliases or [])
+        return tuple("/" + name for name in names), ()
+
 
 class Command:
     def __init__(self, data: dict):
@@ -95,7 +100,7 @@ class CommandMixin(FunctionMixin):
         func = self._register_func(
             name,
             wrapped_handler,
-            AliasFilter(name, aliases).check,
+            AliasFilter(name, aliases),
             description=description,
             usage=usage,
             examples=examples,
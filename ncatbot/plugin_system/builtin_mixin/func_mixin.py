@@ -1,11 +1,12 @@
 import re
 import asyncio
-from typing import Callable, Optional, List, Dict, Any
+from typing import Callable, Optional, List, Dict, Any, Tuple, Union
 from typing import final
 from ncatbot.core.event import BaseMessageEvent
 from ncatbot.plugin_system.event import NcatBotEvent
 from ncatbot.utils.assets.literals import PermissionGroup
 from ncatbot.utils import get_log
+from .trigger_engine import trigger_engine
 
 LOG = get_log("FunctionMixin")
 
@@ -33,6 +34,10 @@ class Filter:
         """具体的过滤逻辑，由子类实现"""
         raise NotImplementedError
 
+    def triggers(self) -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+        """可交给触发引擎合并匹配的 (前缀, 正则)，无法合并时返回 None"""
+        return None
+
 
 class PrefixFilter(Filter):
     """前缀匹配过滤器"""
@@ -47,6 +52,9 @@ class PrefixFilter(Filter):
             return False
         return message.startswith(self.prefix)
 
+    def triggers(self) -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+        return (self.prefix,), ()
+
 
 class RegexFilter(Filter):
     """正则匹配过滤器"""
@@ -61,6 +69,9 @@ class RegexFilter(Filter):
             return False
         return bool(self.pattern.match(message))
 
+    def triggers(self) -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+        return (), (self.pattern.pattern,)
+
 
 class CustomFilter(Filter):
     """自定义过滤器"""
@@ -83,14 +94,16 @@ def create_filter(
     Args:
         prefix: 前缀匹配
         regex: 正则匹配
-        custom_filter: 自定义过滤函数
+        custom_filter: 自定义过滤函数或过滤器
 
     Returns:
         过滤器链的头部，如果所有参数都为None则返回None
     """
     filters = []
 
-    if custom_filter:
+    if isinstance(custom_filter, Filter):
+        filters.append(custom_filter)
+    elif custom_filter:
         filters.append(CustomFilter(custom_filter))
 
     if prefix:
@@ -119,6 +132,7 @@ class Func:
         self.tags = data["tags"]
         self.metadata = data["metadata"]
         self.handlder_id = data["handlder_id"]
+        self.filter: Optional[Filter] = data.get("filter")
 
     def __eq__(self, other: Any) -> bool:
         if isinstance(other, Func):
@@ -147,11 +161,18 @@ class FunctionMixin:
         for func in self._registered_funcs:
             if func.name == name:
                 self.unregister_handler(func.handlder_id)
+                trigger_engine.remove_chain(func.filter)
                 self._registered_funcs.remove(func)
                 break
         else:
             raise ValueError(f"插件 {self.name} 不存在功能 {name}")
 
+    @final
+    def _remove_func_triggers(self):
+        """插件卸载时从触发引擎中移除本插件的所有功能"""
+        for func in getattr(self, "_registered_funcs", []):
+            trigger_engine.remove_chain(func.filter)
+
     @final
     def _create_func_handler(
         self, name: str, handler: Callable, filter_chain
@@ -172,12 +193,16 @@ class FunctionMixin:
                 )
                 return None
             try:
+                # 消息不命中任何前缀和正则时直接跳过，不做权限检查
+                if not trigger_engine.may_match(current_filter, data):
+                    return None
+
                 permission = f"{self.name}.{current_name}"
                 if not self.rbac_manager.check_permission(data.user_id, permission):
                     # TODO: 权限不足反馈
                     return None
 
-                if not current_filter.check(data):
+                if not trigger_engine.check(current_filter, data):
                     return None
 
                 LOG.debug(f"插件 {self.name} 功能 {current_name} 正在执行")
@@ -200,7 +225,7 @@ class FunctionMixin:
         self,
         name: str,
         handler: Callable[[BaseMessageEvent], Any],
-        filter: Callable = None,
+        filter: Union[Callable, Filter] = None,
         prefix: str = None,
         regex: str = None,
         permission: PermissionGroup = PermissionGroup.USER.value,
@@ -224,6 +249,7 @@ class FunctionMixin:
                 prefix = f"/{self.name}.{name}"
 
             filter_chain = create_filter(prefix, regex, filter)
+            trigger_engine.add_chain(filter_chain)
             wrapped_handler = self._create_func_handler(name, handler, filter_chain)
             func = Func(
                 {
@@ -234,6 +260,7 @@ class FunctionMixin:
                     "examples": examples,
                     "tags": tags,
                     "metadata": metadata,
+                    "filter": filter_chain,
                     "handlder_id": self.register_handler(
                         "re:ncatbot.group_message_event|ncatbot.private_message_event",
                         wrapped_handler,
@@ -26,6 +26,7 @@ class NcatBotPlugin(BasePlugin, ConfigMixin, TimeTaskMixin, CommandMixin):
         if hasattr(self, "_time_task_jobs"):
             for name in self._time_task_jobs:
                 self.remove_scheduled_task(name)
+        self._remove_func_triggers()
         await super().__unload__(*a, **kw)
 
     @final
@@ -0,0 +1 @@
+"""内置 Mixin 测试模块"""
@@ -0,0 +1,103 @@
+"""功能触发引擎测试
+
+- 前缀和正则一次匹配得到所有命中的键
+- 无法合并的正则单独匹配, 带全局标志的正则不影响同一块的其他正则
+- 增删触发条件后结果与逐个过滤一致
+"""
+
+from ncatbot.plugin_system.builtin_mixin.command_mixin import AliasFilter
+from ncatbot.plugin_system.builtin_mixin.func_mixin import create_filter
+from ncatbot.plugin_system.builtin_mixin.trigger_engine import TriggerEngine
+from ncatbot.utils.testing import EventFactory
+
+
+class TestTriggerEngine:
+    """TriggerEngine 测试类"""
+
+    def test_match(self):
+        """测试前缀、合并的正则和单独匹配的正则"""
+        engine = TriggerEngine()
+        engine.add("hello", prefixes=["hi", "hello"])
+        engine.add("h", prefixes=["h"])
+        engine.add("num", patterns=[r"\d+$"])
+        engine.add("group", patterns=[r"(\w)\1"])
+        engine.add("flag", patterns=[r"(?i)ABC"])
+
+        assert engine.match("hello") == {"hello", "h"}
+        assert engine.match("123") == {"num"}
+        assert engine.match("aab") == {"group"}
+        assert engine.match("abcd") == {"flag"}
+        assert engine.match("x1") == set()
+
+    def test_conditional_group_isolated(self):
+        """测试按编号引用分组的条件正则单独匹配, 结果与 re.match 一致"""
+        engine = TriggerEngine()
+        engine.add("word", patterns=[r"(\w+)-"])
+        engine.add("cond", patterns=[r"(<)?a(?(1)>|b)"])
+
+        assert engine._separate.keys() == {"cond"}
+        assert engine.match("<a>") == {"cond"}
+        assert engine.match("abc") == {"cond"}
+        assert engine.match("<ab") == set()
+        assert engine.match("ab-") == {"cond", "word"}
+
+    def test_global_flags_isolated(self):
+        """测试带全局标志的正则单独匹配, 大小写敏感的正则不受影响"""
+        engine = TriggerEngine()
+        engine.add("lower", patterns=[r"World"])
+        engine.add("flag", patterns=[r"(?i)hello"])
+        engine.add("multi", patterns=[r"(?sm)x.y"])
+        engine.add("scoped", patterns=[r"(?i:abc)d"])
+
+        assert engine._separate.keys() == {"flag", "multi"}
+        assert engine.match("HELLO") == {"flag"}
+        assert engine.match("World") == {"lower"}
+        assert engine.match("world") == set()
+        assert engine.match("ABCd") == {"scoped"}
+        assert engine.match("ABCD") == set()
+        assert engine.match("x\ny") == {"multi"}
+
+    def test_incremental(self):
+        """测试删除后不再命中, 其它触发条件不受影响"""
+        engine = TriggerEngine()
+        for i in range(200):
+            engine.add(i, prefixes=[f"/cmd{i}"], patterns=[f"re{i}-"])
+        assert engine.match("/cmd12 x") == {1, 12}
+        assert engine.match("re150-") == {150}
+
+        for i in range(0, 200, 2):
+            engine.remove(i)
+        assert engine.match("/cmd12 x") == {1}
+        assert engine.match("re150-") == set()
+        assert engine.match("re151-") == {151}
+        assert len(engine) == 100
+
+    def test_chain_equivalence(self):
+        """测试过滤器链查表结果与逐个检查一致"""
+        engine = TriggerEngine()
+        chains = [
+            create_filter(prefix="/echo"),
+            create_filter(regex=r"天气\s*(\S+)"),
+            create_filter(prefix="签到", regex=r"^打卡"),
+            create_filter(custom_filter=lambda e: e.raw_message.endswith("!")),
+            create_filter(custom_filter=AliasFilter("ping", ["p"])),
+        ]
+        for chain in chains:
+            engine.add_chain(chain)
+        engine.remove_chain(chains[0])
+
+        messages = [
+            "/echo hi",
+            "天气 北京",
+            "签到",
+            "打卡啦",
+            "hey!",
+            "/p",
+            "/ping",
+            "x",
+        ]
+        for message in messages:
+            event = EventFactory.create_group_message(message)
+            for chain in chains[1:]:
+                assert engine.check(chain, event) == chain.check(event), message
+        assert engine.check(chains[0], event) == chains[0].check(event)
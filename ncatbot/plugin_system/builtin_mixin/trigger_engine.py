@@ -0,0 +1,232 @@
+"""功能触发引擎
+
+FunctionMixin 注册的每个功能带一条过滤器链（自定义函数 / 前缀 / 正则，任一通过即触发），
+原先每条消息要对每个功能逐一 startswith / re.match。这里把所有功能的触发条件合并:
+- 字面前缀放进前缀树，从消息开头走一遍得到所有命中的前缀
+- 正则分块合并，每个正则包在具名的零宽断言里，一次匹配得到块内所有命中的正则
+- 自定义函数无法合并，仍逐个调用
+
+一条消息的匹配结果记录在事件上，各功能的处理器只需查表。
+增删功能时前缀树直接增删，正则只重新编译发生变化的块。
+"""
+
+import re
+from typing import TYPE_CHECKING, Dict, FrozenSet, Hashable, Iterable, List, Tuple
+
+from ncatbot.utils import get_log
+
+if TYPE_CHECKING:
+    from ncatbot.core.event import BaseMessageEvent
+    from .func_mixin import Filter
+
+LOG = get_log("TriggerEngine")
+
+# 每块合并的正则数量，增删一个正则只需重新编译所在的块
+_CHUNK = 64
+
+# 按编号引用分组（反向引用 \1、条件分组 (?(1)...)）的正则合并后分组编号会变化，单独匹配
+_GROUP_REF = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+# 全局标志 (?i) 等作用于整个正则，合并后会影响同一块的其他正则（3.11 之前不报错），单独匹配
+_GLOBAL_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+
+
+class _PrefixNode:
+    __slots__ = ("children", "keys")
+
+    def __init__(self):
+        self.children: Dict[str, "_PrefixNode"] = {}
+        self.keys: List[Hashable] = []
+
+
+class _RegexChunk:
+    __slots__ = ("patterns", "compiled", "groups")
+
+    def __init__(self):
+        # 组名 → (键, 正则)
+        self.patterns: Dict[str, Tuple[Hashable, str]] = {}
+        self.compiled = None
+        # (分组编号, 键)
+        self.groups: List[Tuple[int, Hashable]] = []
+
+    def compile(self) -> None:
+        self.compiled = re.compile(
+            "".join(
+                f"(?:(?=(?P<{name}>{pattern})))?"
+                for name, (_, pattern) in self.patterns.items()
+            )
+        )
+        self.groups = [
+            (self.compiled.groupindex[name], key)
+            for name, (key, _) in self.patterns.items()
+        ]
+
+    def match(self, text: str, matched: set) -> None:
+        if self.compiled is None:
+            self.compile()
+        groups = self.compiled.match(text).groups()
+        for index, key in self.groups:
+            if groups[index - 1] is not None:
+                matched.add(key)
+
+
+class TriggerEngine:
+    """合并匹配所有功能的前缀和正则触发条件"""
+
+    def __init__(self):
+        self._prefixes = _PrefixNode()
+        self._chunks: List[_RegexChunk] = []
+        # 无法合并的正则: 键 → 编译后的正则
+        self._separate: Dict[Hashable, List["re.Pattern"]] = {}
+        # 键 → (前缀, 正则所在的 (块, 组名))
+        self._entries: Dict[Hashable, Tuple[Tuple[str, ...], list]] = {}
+        # 过滤器链 → 需要逐个调用的过滤器
+        self._chains: Dict["Filter", List["Filter"]] = {}
+        self._names = 0
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # -------------------
+    # region 增删
+    # -------------------
+
+    def add(
+        self, key: Hashable, prefixes: Iterable[str] = (), patterns: Iterable[str] = ()
+    ) -> None:
+        """添加一组触发条件，消息以任一前缀开头或从开头匹配任一正则时命中 key"""
+        if key in self._entries:
+            self.remove(key)
+        prefixes = tuple(dict.fromkeys(p for p in prefixes if p))
+        for prefix in prefixes:
+            node = self._prefixes
+            for char in prefix:
+                node = node.children.setdefault(char, _PrefixNode())
+            node.keys.append(key)
+
+        slots = []
+        for pattern in dict.fromkeys(patterns):
+            compiled = re.compile(pattern)
+            if not self._combinable(compiled):
+                LOG.debug(f"正则 {pattern} 无法合并，单独匹配")
+                self._separate.setdefault(key, []).append(compiled)
+                continue
+            if not self._chunks or len(self._chunks[-1].patterns) >= _CHUNK:
+                self._chunks.append(_RegexChunk())
+            chunk = self._chunks[-1]
+            name = f"t{self._names}"
+            self._names += 1
+            chunk.patterns[name] = (key, pattern)
+            chunk.compiled = None
+            slots.append((chunk, name))
+
+        self._entries[key] = (prefixes, slots)
+        self.version += 1
+
+    @staticmethod
+    def _combinable(compiled: "re.Pattern") -> bool:
+        pattern = compiled.pattern
+        return not (
+            compiled.groupindex
+            or (compiled.groups and _GROUP_REF.search(pattern))
+            or _GLOBAL_FLAGS.search(pattern)
+        )
+
+    def remove(self, key: Hashable) -> bool:
+        """删除 key 的触发条件"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        prefixes, slots = entry
+        for prefix in prefixes:
+            trail = []
+            node = self._prefixes
+            for char in prefix:
+                trail.append((node, char))
+                node = node.children[char]
+            node.keys.remove(key)
+            for parent, char in reversed(trail):
+                child = parent.children[char]
+                if child.keys or child.children:
+                    break
+                del parent.children[char]
+
+        for chunk, name in slots:
+            del chunk.patterns[name]
+            chunk.compiled = None
+        self._chunks = [chunk for chunk in self._chunks if chunk.patterns]
+        self._separate.pop(key, None)
+        self.version += 1
+        return True
+
+    def add_chain(self, chain: "Filter") -> None:
+        """登记一条过滤器链，可合并的前缀和正则交给引擎，其余的逐个调用"""
+        prefixes, patterns, dynamic = [], [], []
+        link = chain
+        while link is not None:
+            triggers = link.triggers()
+            if triggers is None:
+                dynamic.append(link)
+            else:
+                prefixes.extend(triggers[0])
+                patterns.extend(triggers[1])
+            link = link.next_filter
+        self._chains[chain] = dynamic
+        self.add(chain, prefixes, patterns)
+
+    def remove_chain(self, chain: "Filter") -> None:
+        """注销一条过滤器链"""
+        self._chains.pop(chain, None)
+        self.remove(chain)
+
+    # -------------------
+    # region 匹配
+    # -------------------
+
+    def match(self, text: str) -> FrozenSet[Hashable]:
+        """返回 text 命中的所有键"""
+        matched = set()
+        node = self._prefixes
+        for char in text:
+            node = node.children.get(char)
+            if node is None:
+                break
+            matched.update(node.keys)
+        for chunk in self._chunks:
+            chunk.match(text, matched)
+        for key, compiled_list in self._separate.items():
+            if key not in matched and any(c.match(text) for c in compiled_list):
+                matched.add(key)
+        return frozenset(matched)
+
+    def matches(self, event: "BaseMessageEvent") -> FrozenSet[Hashable]:
+        """事件消息命中的所有键，同一事件只匹配一次"""
+        memo = getattr(event, "_trigger_matches", None)
+        if memo is not None and memo[0] is self and memo[1] == self.version:
+            return memo[2]
+        message = event.raw_message
+        # 与逐个过滤时一致，空消息不命中任何前缀和正则
+        matched = self.match(message) if message else frozenset()
+        event._trigger_matches = (self, self.version, matched)
+        return matched
+
+    def may_match(self, chain: "Filter", event: "BaseMessageEvent") -> bool:
+        """过滤器链是否可能通过，只含前缀和正则的链可以直接从查表得到结果"""
+        dynamic = self._chains.get(chain)
+        return dynamic is None or bool(dynamic) or chain in self.matches(event)
+
+    def check(self, chain: "Filter", event: "BaseMessageEvent") -> bool:
+        """等价于 chain.check(event)，前缀和正则的结果从合并匹配中查表"""
+        dynamic = self._chains.get(chain)
+        if dynamic is None:
+            return chain.check(event)
+        # 自定义函数在链中排在前面，保持原有的调用顺序
+        for link in dynamic:
+            if link._check(event):
+                return True
+        return chain in self.matches(event)
+
+
+# 全局单例
+trigger_engine = TriggerEngine()
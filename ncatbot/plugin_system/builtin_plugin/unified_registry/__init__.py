@@ -44,6 +44,8 @@ from .filter_system.decorators import (
     group_filter,
     admin_group_filter,
     admin_private_filter,
+    rate_limit,
+    cooldown,
 )
 from .command_system.registry import option, param, option_group
 
@@ -53,6 +55,7 @@ from .command_system import (
     get_subclass_recursive,
     command_registry,
 )
+from .trigger.context import ParseContext, get_parse_context
 
 
 # 向后兼容导出
@@ -78,6 +81,8 @@ __all__ = [
     "group_filter",
     "admin_group_filter",
     "admin_private_filter",
+    "rate_limit",
+    "cooldown",
     "on_message",
     "on_message_sent",
     "option",
@@ -102,4 +107,6 @@ __all__ = [
     # 命令相关
     "FuncAnalyser",
     "get_subclass_recursive",
+    "ParseContext",
+    "get_parse_context",
 ]
@@ -1,8 +1,10 @@
 """命令分析器模块"""
 
 from .func_analyzer import FuncAnalyser, get_subclass_recursive
+from .compiled_binder import CompiledBinder
 
 __all__ = [
     "FuncAnalyser",
+    "CompiledBinder",
     "get_subclass_recursive",
 ]
@@ -0,0 +1,72 @@
+"""预编译参数绑定
+
+命令的签名、选项和参数在注册后不再变化，注册时一次性算好：
+- 必需位置参数个数
+- 选项名/选项组取值 → (形参名, 值) 的字典
+- 命名参数名 → (形参名, 转换函数) 的字典
+- 每个位置的转换函数
+"""
+
+import inspect
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from ..utils import CommandSpec
+
+
+def _to_bool(value: Any) -> bool:
+    return value.lower() not in ["false", "0"]
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _converter(target_type: type) -> Callable[[Any], Any]:
+    if target_type is bool:
+        return _to_bool
+    return target_type
+
+
+class CompiledBinder:
+    """单个命令的参数绑定表
+
+    Args:
+        spec: 命令规格
+        actual_params: 实际命令参数（不含 self 和 event）
+    """
+
+    __slots__ = ("required_count", "options", "params", "converters")
+
+    def __init__(self, spec: CommandSpec, actual_params: Sequence[inspect.Parameter]):
+        self.required_count = sum(
+            1
+            for param in actual_params
+            if param.default is inspect.Parameter.empty
+            and param.kind
+            in (
+                inspect.Parameter.POSITIONAL_ONLY,
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            )
+        )
+
+        # 与 CommandSpec.get_kw_binding 的查找顺序一致：先选项，后选项组
+        self.options: Dict[str, Tuple[str, Any]] = {}
+        for option in spec.options:
+            self.options.setdefault(option.name, (option.name, True))
+            if option.short_name:
+                self.options.setdefault(option.short_name, (option.name, True))
+        for group in spec.option_groups:
+            for choice in group.choices:
+                self.options.setdefault(choice, (group.name, choice))
+
+        self.params: Dict[str, Tuple[str, Callable[[Any], Any]]] = {}
+        for param in spec.params:
+            self.params.setdefault(
+                param.name, (param.name, _converter(spec.args_types[param.index]))
+            )
+
+        # 基础类型从文本转换，其余类型（消息段）原样传入
+        self.converters: List[Callable[[Any], Any]] = [
+            _converter(t) if t in (bool, str, float, int) else _identity
+            for t in spec.args_types
+        ]
@@ -4,6 +4,7 @@ from typing import Callable, List
 from ncatbot.utils import get_log
 from .sig_validator import SigValidator
 from .param_validator import ParamsValidator
+from .compiled_binder import CompiledBinder
 from ..utils import CommandSpec, FuncSpec
 from ...utils import get_func_plugin_name
 
@@ -46,4 +47,5 @@ class FuncAnalyser:
         )
         spec = self.params_validator.analyze_params()
         spec.plugin_name = get_func_plugin_name(self.func_descriptor.func)
+        spec.binder = CompiledBinder(spec, self.actual_params)
         return spec
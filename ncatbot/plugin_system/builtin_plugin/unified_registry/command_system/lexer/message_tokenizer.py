@@ -25,35 +25,46 @@ class MessageTokenizer:
     def __init__(self):
         self.command_parser = AdvancedCommandParser()
 
-    def tokenize(self, message_array) -> List[Token]:
-        """将 MessageArray 转换为 Token 序列
+    def tokenize_segments(self, message_array) -> List[List[Token]]:
+        """逐段分词
 
         Args:
             message_array: MessageArray 对象
 
         Returns:
-            Token 序列，包含文本 Token 和 NonTextToken
+            每个消息段对应一个 Token 列表：文本段为去掉 EOF 的文本 Token，
+            非文本段为单个 NonTextToken
         """
-        tokens = []
-
+        segments = []
         for segment in message_array.messages:
             if self._is_text_segment(segment):
-                # 文本段：使用 StringTokenizer 分析
-                text_tokenizer = StringTokenizer(segment.text)
-                text_tokens = text_tokenizer.tokenize()
-
-                # 过滤 EOF，添加到结果中
-                for token in text_tokens:
-                    if token.type != TokenType.EOF:
-                        # 调整 token 位置为全局位置
-                        token.position = len(tokens)
-                        tokens.append(token)
+                # 文本段：使用 StringTokenizer 分析，过滤 EOF
+                text_tokens = StringTokenizer(segment.text).tokenize()
+                segments.append([t for t in text_tokens if t.type != TokenType.EOF])
             else:
                 # 非文本段：创建 NonTextToken
-                non_text_token = NonTextToken(segment, len(tokens))
-                tokens.append(non_text_token)
+                segments.append([NonTextToken(segment, 0)])
+        return segments
+
+    def tokenize(self, message_array) -> List[Token]:
+        """将 MessageArray 转换为 Token 序列
+
+        Args:
+            message_array: MessageArray 对象
 
-        # 添加最终的 EOF
+        Returns:
+            Token 序列，包含文本 Token 和 NonTextToken
+        """
+        return self.join_segments(self.tokenize_segments(message_array))
+
+    @staticmethod
+    def join_segments(segments: List[List[Token]]) -> List[Token]:
+        """拼接逐段分词结果，token 位置调整为全局位置，末尾添加 EOF"""
+        tokens = []
+        for segment_tokens in segments:
+            for token in segment_tokens:
+                token.position = len(tokens)
+                tokens.append(token)
         tokens.append(Token(TokenType.EOF, "", len(tokens)))
         return tokens
 
@@ -91,6 +102,10 @@ class MessageTokenizer:
         )
 
 
+# 分词器和解析器都不保存解析状态，全局复用一个实例
+_default_tokenizer = MessageTokenizer()
+
+
 # 便捷函数
 def parse_message_command(message_array) -> ParsedCommand:
     """便捷函数：直接解析 MessageArray
@@ -101,5 +116,4 @@ def parse_message_command(message_array) -> ParsedCommand:
     Returns:
         ParsedCommand 解析结果
     """
-    tokenizer = MessageTokenizer()
-    return tokenizer.parse_message(message_array)
+    return _default_tokenizer.parse_message(message_array)
@@ -3,9 +3,10 @@
 支持命令行参数解析，包括短选项、长选项、参数赋值和转义字符串处理。
 """
 
+import re
 from enum import Enum
 from dataclasses import dataclass
-from typing import List, Optional, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any
 from ncatbot.utils import NcatBotError
 
 
@@ -33,6 +34,8 @@ class QuoteState(Enum):
 class Token:
     """词法单元"""
 
+    __slots__ = ("type", "value", "position")
+
     type: TokenType
     value: str
     position: int
@@ -48,6 +51,8 @@ class Token:
 class NonTextToken(Token):
     """非文本元素 Token"""
 
+    __slots__ = ("segment", "element_type")
+
     segment: Any  # MessageSegment，使用 Any 避免循环导入
     element_type: str
 
@@ -94,6 +99,23 @@ class InvalidEscapeSequenceError(NcatBotError):
         self.sequence = sequence
 
 
+# 常见 token（单词、选项、分隔符）由一个总正则识别；引号字符串和不规则的
+# "-"/"--" 开头内容归入 other，交给逐个解析的方法处理
+_TOKEN = re.compile(
+    r"""\s*(?:
+        --(?P<long>[^\s=]+)
+        |-(?P<short>[^\W\d_]+)
+        |(?P<sep>=)
+        |(?P<word>[^\s="-][^\s="]*|-\Z)
+        |(?P<other>\S)
+    )""",
+    re.VERBOSE,
+)
+_NON_WHITESPACE = re.compile(r"\S*")
+_OPTION_NAME = re.compile(r"[^\s=]*")
+_QUOTED_CHUNK = re.compile(r'[^"\\]*')
+
+
 class StringTokenizer:
     """字符串分词器
 
@@ -123,165 +145,112 @@ class StringTokenizer:
 
     def tokenize(self) -> List[Token]:
         """执行分词，返回 Token 列表"""
-        self.tokens = []
-        self.position = 0
-
-        while self.position < self.length:
-            self._skip_whitespace()
-            if self.position >= self.length:
-                break
-
-            char = self.text[self.position]
-
-            # 检查引号字符串
-            if char == '"':
-                self._parse_quoted_string()
-            # 检查长选项 --
-            elif char == "-" and self._peek() == "-":
-                self._parse_long_option()
-            # 检查短选项 -
-            elif char == "-" and self._peek() and self._peek() != "-":
-                self._parse_short_option()
-            # 检查分隔符 =
-            elif char == "=":
-                self._add_token(TokenType.SEPARATOR, char)
-                self.position += 1
-            # 普通单词
-            else:
-                self._parse_word()
+        text = self.text
+        tokens = self.tokens = []
+        append = tokens.append
+        WORD, LONG, SHORT, SEP = (
+            TokenType.WORD,
+            TokenType.LONG_OPTION,
+            TokenType.SHORT_OPTION,
+            TokenType.SEPARATOR,
+        )
+        pos = 0
+        resume = True
+        while resume:
+            resume = False
+            for m in _TOKEN.finditer(text, pos):
+                kind = m.lastgroup
+                start = m.start(kind)
+                if kind == "word":
+                    append(Token(WORD, m.group(kind), start))
+                elif kind == "long":
+                    append(Token(LONG, m.group(kind), start))
+                elif kind == "short" and m.group(kind).isalpha():
+                    append(Token(SHORT, m.group(kind), start))
+                elif kind == "sep":
+                    # 分隔符位置沿用旧实现：等号前一个字符
+                    append(Token(SEP, "=", start - 1))
+                else:
+                    # 逐个解析后从结束位置继续匹配
+                    if kind == "short":
+                        start -= 1
+                    if text[start] == '"':
+                        pos = self._parse_quoted_string(start)
+                    elif text.startswith("--", start):
+                        pos = self._parse_long_option(start)
+                    else:
+                        pos = self._parse_short_option(start)
+                    resume = True
+                    break
 
         # 添加 EOF 标记
-        self._add_token(TokenType.EOF, "")
-        return self.tokens
-
-    def _peek(self, offset: int = 1) -> Optional[str]:
-        """查看后续字符，不移动位置"""
-        peek_pos = self.position + offset
-        if peek_pos < self.length:
-            return self.text[peek_pos]
-        return None
-
-    def _skip_whitespace(self):
-        """跳过空白字符"""
-        while self.position < self.length and self.text[self.position].isspace():
-            self.position += 1
-
-    def _add_token(self, token_type: TokenType, value: str):
-        """添加 Token"""
-        token = Token(token_type, value, self.position - len(value))
-        self.tokens.append(token)
-
-    def _parse_quoted_string(self):
-        """解析引用字符串 "content" """
-        start_pos = self.position
-        self.position += 1  # 跳过开始引号
-
-        value = ""
-        while self.position < self.length:
-            char = self.text[self.position]
-
-            if char == '"':
+        self.position = self.length
+        append(Token(TokenType.EOF, "", self.length))
+        return tokens
+
+    def _parse_quoted_string(self, start: int) -> int:
+        """解析引用字符串 "content"，返回结束位置"""
+        text = self.text
+        pos = start + 1  # 跳过开始引号
+        parts = []
+        while True:
+            end = _QUOTED_CHUNK.match(text, pos).end()
+            parts.append(text[pos:end])
+            if end >= self.length:
+                # 到达字符串末尾但没有找到结束引号
+                self.tokens.append(Token(TokenType.WORD, text[start:], start))
+                return self.length
+            if text[end] == '"':
                 # 结束引号
-                self.position += 1
-                self._add_token(TokenType.QUOTED_STRING, value)
-                return
-            elif char == "\\":
-                # 转义序列
-                self.position += 1
-                if self.position >= self.length:
-                    raise InvalidEscapeSequenceError(self.position - 1, "EOF")
-
-                escape_char = self.text[self.position]
-                if escape_char in self.ESCAPE_SEQUENCES:
-                    value += self.ESCAPE_SEQUENCES[escape_char]
-                else:
-                    raise InvalidEscapeSequenceError(self.position - 1, escape_char)
-                self.position += 1
-            else:
-                value += char
-                self.position += 1
-
-        # 到达字符串末尾但没有找到结束引号
-        self._add_token(TokenType.WORD, self.text[start_pos : self.position])
-        return
-
-    def _parse_long_option(self):
-        """解析长选项 --option 或 --option=value"""
-        start_pos = self.position
-        self.position += 2  # 跳过 --
-
-        # 读取选项名
-        option_name = ""
-        while (
-            self.position < self.length
-            and not self.text[self.position].isspace()
-            and self.text[self.position] != "="
-        ):
-            option_name += self.text[self.position]
-            self.position += 1
-
-        if not option_name:
-            while (
-                self.position < self.length and not self.text[self.position].isspace()
-            ):
-                self.position += 1
-            self._add_token(TokenType.WORD, self.text[start_pos : self.position])
-            return
-
-        # 检查是否有参数赋值
-        if self.position < self.length and self.text[self.position] == "=":
-            # 有赋值，解析为 LONG_OPTION=value
-            self._add_token(TokenType.LONG_OPTION, option_name)
-            # 分隔符会在下一次循环中处理
+                value = "".join(parts)
+                pos = end + 1
+                self.tokens.append(
+                    Token(TokenType.QUOTED_STRING, value, pos - len(value))
+                )
+                return pos
+            # 转义序列
+            if end + 1 >= self.length:
+                raise InvalidEscapeSequenceError(end, "EOF")
+            escape_char = text[end + 1]
+            if escape_char not in self.ESCAPE_SEQUENCES:
+                raise InvalidEscapeSequenceError(end, escape_char)
+            parts.append(self.ESCAPE_SEQUENCES[escape_char])
+            pos = end + 2
+
+    def _parse_long_option(self, start: int) -> int:
+        """解析长选项 --option 或 --option=value，返回结束位置
+
+        赋值的分隔符留给主循环处理。
+        """
+        text = self.text
+        end = _OPTION_NAME.match(text, start + 2).end()
+        if end == start + 2:
+            end = _NON_WHITESPACE.match(text, end).end()
+            self.tokens.append(Token(TokenType.WORD, text[start:end], start))
         else:
-            # 无赋值，纯选项
-            self._add_token(TokenType.LONG_OPTION, option_name)
-
-    def _parse_short_option(self):
-        """解析短选项 -v 或 -xvf 或 -p=value"""
-        start_pos = self.position
-        self.position += 1  # 跳过 -
-
-        # 读取选项字符
-        options = ""
-        while self.position < self.length and self.text[self.position].isalpha():
-            options += self.text[self.position]
-            self.position += 1
-
-        if not options:
-            while (
-                self.position < self.length and not self.text[self.position].isspace()
-            ):
-                self.position += 1
-            self._add_token(TokenType.WORD, self.text[start_pos : self.position])
-            return
-
-        # 检查是否有参数赋值（只对单个选项）
-        if (
-            len(options) == 1
-            and self.position < self.length
-            and self.text[self.position] == "="
-        ):
-            # 单个选项有赋值
-            self._add_token(TokenType.SHORT_OPTION, options)
-            # 分隔符会在下一次循环中处理
+            self.tokens.append(
+                Token(TokenType.LONG_OPTION, text[start + 2 : end], start + 2)
+            )
+        return end
+
+    def _parse_short_option(self, start: int) -> int:
+        """解析短选项 -v 或 -xvf 或 -p=value，返回结束位置
+
+        赋值的分隔符留给主循环处理。
+        """
+        text = self.text
+        length = self.length
+        end = start + 1
+        while end < length and text[end].isalpha():
+            end += 1
+        if end == start + 1:
+            end = _NON_WHITESPACE.match(text, end).end()
+            self.tokens.append(Token(TokenType.WORD, text[start:end], start))
         else:
-            # 多个选项组合或无赋值
-            self._add_token(TokenType.SHORT_OPTION, options)
-
-    def _parse_word(self):
-        """解析普通单词"""
-        value = ""
-        while (
-            self.position < self.length
-            and not self.text[self.position].isspace()
-            and self.text[self.position] not in '="'
-        ):
-            value += self.text[self.position]
-            self.position += 1
-
-        if value:
-            self._add_token(TokenType.WORD, value)
+            self.tokens.append(
+                Token(TokenType.SHORT_OPTION, text[start + 1 : end], start + 1)
+            )
+        return end
 
 
 @dataclass
@@ -3,7 +3,7 @@
 核心注册器类，管理命令定义、路由和执行。
 """
 
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 from ..analyzer.func_analyzer import FuncAnalyser
 from ..utils import (
     CommandRegistrationError,
@@ -34,6 +34,14 @@ class CommandGroup:
         self.commands: Dict[Tuple[str, ...], CommandSpec] = {}
         self.aliases: Dict[Tuple[str, ...], CommandSpec] = {}
         self.subgroups: Dict[str, "CommandGroup"] = {}
+        self.root: "CommandGroup" = parent.root if parent else self
+        if parent is None:
+            # 插件名 → 该插件注册的 (完整路径, 命令)，别名路径只有别名本身
+            self.plugin_commands: Dict[
+                Optional[str], List[Tuple[Tuple[str, ...], CommandSpec]]
+            ] = {}
+            # 上次 pop_changed_plugins 之后命令有变化的插件
+            self.changed_plugins: Set[Optional[str]] = set()
 
         # 可继承的配置
         self.prefixes: List[str] = prefixes
@@ -98,6 +106,13 @@ class CommandGroup:
         for aliases in command_spec.aliases:
             self.aliases[aliases] = command_spec
 
+        # 按插件记录，重载插件时只需处理该插件的命令
+        root = self.root
+        entries = root.plugin_commands.setdefault(command_spec.plugin_name, [])
+        entries.append((self.get_full_name()[1:] + (command_spec.name,), command_spec))
+        entries.extend(((alias,), command_spec) for alias in command_spec.aliases)
+        root.changed_plugins.add(command_spec.plugin_name)
+
     def get_full_name(self) -> Tuple[str, ...]:
         """获取完整组名"""
         if self.parent:
@@ -148,6 +163,25 @@ class CommandGroup:
         for alias_name in deleted_aliases:
             del self.aliases[alias_name]
 
+        if self.parent is None and self.plugin_commands.pop(plugin_name, None):
+            self.changed_plugins.add(plugin_name)
+
+    def get_plugin_commands(
+        self, plugin_name: Optional[str]
+    ) -> List[Tuple[Tuple[str, ...], CommandSpec]]:
+        """获取插件注册的 (完整路径, 命令)，包括别名"""
+        return list(self.root.plugin_commands.get(plugin_name, ()))
+
+    def pop_changed_plugins(self) -> List[Optional[str]]:
+        """取出并清空自上次调用以来命令有变化的插件"""
+        changed = list(self.root.changed_plugins)
+        self.root.changed_plugins.clear()
+        return changed
+
+    def mark_changed(self, plugin_names: Iterable[Optional[str]]) -> None:
+        """把插件重新记为有变化，下次同步时再处理"""
+        self.root.changed_plugins.update(plugin_names)
+
 
 class ModernRegistry:
     """现代化命令注册器
@@ -188,6 +222,20 @@ class ModernRegistry:
         """获取所有别名"""
         return self.root_group.get_all_aliases()
 
+    def get_plugin_commands(
+        self, plugin_name: Optional[str]
+    ) -> List[Tuple[Tuple[str, ...], CommandSpec]]:
+        """获取插件注册的 (完整路径, 命令)，包括别名"""
+        return self.root_group.get_plugin_commands(plugin_name)
+
+    def pop_changed_plugins(self) -> List[Optional[str]]:
+        """取出并清空自上次调用以来命令有变化的插件"""
+        return self.root_group.pop_changed_plugins()
+
+    def mark_changed(self, plugin_names: Iterable[Optional[str]]) -> None:
+        """把插件重新记为有变化，下次同步时再处理"""
+        self.root_group.mark_changed(plugin_names)
+
     @classmethod
     def get_registry(cls, prefixes: Optional[List[str]] = None) -> "ModernRegistry":
         """获取注册器"""
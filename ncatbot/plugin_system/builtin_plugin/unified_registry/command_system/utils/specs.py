@@ -97,6 +97,8 @@ class CommandSpec:
         self.args_types: List[type] = args_types
         self.func: Callable = func
         self.plugin_name: Optional[str] = None
+        # 预编译的参数绑定表，由 FuncAnalyser.analyze 设置
+        self.binder = None
 
         # 必须外部重新设置的属性
         self.aliases = []  # 默认为空列表而不是None
@@ -53,8 +53,12 @@ from .decorators import (
     root_filter,
     admin_group_filter,
     admin_private_filter,
+    rate_limit,
+    cooldown,
 )
+from .rate_limit import GCRALimiter, RateLimitFilter
 from .validator import FilterValidator
+from .index import FilterIndex
 
 __all__ = [
     # 核心类
@@ -70,6 +74,8 @@ __all__ = [
     "GroupOwnerFilter",
     "RootFilter",
     "CustomFilter",
+    "RateLimitFilter",
+    "GCRALimiter",
     # 注册器实例
     "filter_registry",
     "filter",
@@ -82,6 +88,10 @@ __all__ = [
     "root_filter",
     "admin_group_filter",
     "admin_private_filter",
+    "rate_limit",
+    "cooldown",
     # 验证器
     "FilterValidator",
+    # 分发索引
+    "FilterIndex",
 ]
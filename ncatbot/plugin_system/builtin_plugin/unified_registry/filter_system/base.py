@@ -1,7 +1,7 @@
 """过滤器基础模块 v2.0"""
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Callable, Hashable, Optional
 
 if TYPE_CHECKING:
     from ncatbot.core.event import BaseMessageEvent
@@ -13,6 +13,9 @@ class BaseFilter(ABC):
     简化设计：过滤器函数只接受 event 参数
     """
 
+    # 检查有副作用（如限流计数）的过滤器，在同一函数的其它过滤器都通过后才检查
+    stateful = False
+
     def __init__(self, name: str = None):
         self.name = name or self.__class__.__name__
 
@@ -28,6 +31,13 @@ class BaseFilter(ABC):
         """
         pass
 
+    def intern_key(self) -> Optional[Hashable]:
+        """配置相同的过滤器返回相同的键，注册时复用同一个实例
+
+        过滤器需是只依赖事件的纯判断。返回 None 表示不复用。
+        """
+        return None
+
     def __call__(self, func: Callable) -> Callable:
         """使过滤器实例可作为装饰器使用"""
 
@@ -66,6 +76,15 @@ class CombinedFilter(BaseFilter):
         if mode not in ("or", "and"):
             raise ValueError("mode must be 'or' or 'and'")
         self.mode = mode
+        self.stateful = left.stateful or right.stateful
+
+    def intern_key(self) -> Optional[Hashable]:
+        if type(self) is not CombinedFilter:
+            return None
+        left, right = self.left.intern_key(), self.right.intern_key()
+        if left is None or right is None:
+            return None
+        return (CombinedFilter, self.mode, left, right)
 
     def check(self, event: "BaseMessageEvent") -> bool:
         if self.mode == "or":
@@ -1,6 +1,6 @@
 """内置过滤器实现 v2.0"""
 
-from typing import TYPE_CHECKING, Callable, Optional, Union, Iterable
+from typing import TYPE_CHECKING, Callable, Hashable, Optional, Union, Iterable
 from ncatbot.core import BaseMessageEvent, MessageSentEvent
 from ncatbot.utils import status
 from ncatbot.utils.assets.literals import PermissionGroup
@@ -11,6 +11,11 @@ if TYPE_CHECKING:
     from ncatbot.core.event import BaseMessageEvent
 
 
+def _stateless_key(filter_instance: BaseFilter, cls: type) -> Optional[Hashable]:
+    """无配置的内置过滤器按类型复用，子类可能带状态，不复用"""
+    return (cls,) if type(filter_instance) is cls else None
+
+
 class GroupFilter(BaseFilter):
     """群聊消息过滤器"""
 
@@ -39,6 +44,12 @@ class GroupFilter(BaseFilter):
                 except TypeError:
                     raise TypeError("allowed must be str|int or an iterable of str|int")
 
+    def intern_key(self) -> Optional[Hashable]:
+        if type(self) is not GroupFilter:
+            return None
+        allowed = frozenset(self.allowed) if self.allowed is not None else None
+        return (GroupFilter, allowed)
+
     def check(self, event: "BaseMessageEvent") -> bool:
         """检查是否为群聊消息且（可选）群号在允许列表中"""
         if not event.is_group_event():
@@ -54,6 +65,9 @@ class GroupFilter(BaseFilter):
 class PrivateFilter(BaseFilter):
     """私聊消息过滤器"""
 
+    def intern_key(self) -> Optional[Hashable]:
+        return _stateless_key(self, PrivateFilter)
+
     def check(self, event: "BaseMessageEvent") -> bool:
         """检查是否为私聊消息"""
         return not event.is_group_event()
@@ -62,6 +76,9 @@ class PrivateFilter(BaseFilter):
 class MessageSentFilter(BaseFilter):
     """自身上报消息过滤器"""
 
+    def intern_key(self) -> Optional[Hashable]:
+        return _stateless_key(self, MessageSentFilter)
+
     def check(self, event: "BaseMessageEvent") -> bool:
         """检查是否为自身上报的消息"""
         return isinstance(event, MessageSentEvent)
@@ -70,6 +87,9 @@ class MessageSentFilter(BaseFilter):
 class AdminFilter(BaseFilter):
     """管理员权限过滤器"""
 
+    def intern_key(self) -> Optional[Hashable]:
+        return _stateless_key(self, AdminFilter)
+
     def check(self, event: "BaseMessageEvent") -> bool:
         """检查用户是否有管理员权限"""
         if not status.global_access_manager:
@@ -86,6 +106,9 @@ class AdminFilter(BaseFilter):
 class GroupAdminFilter(BaseFilter):
     """群管理员权限过滤器"""
 
+    def intern_key(self) -> Optional[Hashable]:
+        return _stateless_key(self, GroupAdminFilter)
+
     def check(self, event: "BaseMessageEvent") -> bool:
         """检查用户是否为群管理员"""
         group_id = getattr(event, "group_id", None)
@@ -100,6 +123,9 @@ class GroupAdminFilter(BaseFilter):
 class GroupOwnerFilter(BaseFilter):
     """群主权限过滤器"""
 
+    def intern_key(self) -> Optional[Hashable]:
+        return _stateless_key(self, GroupOwnerFilter)
+
     def check(self, event: "BaseMessageEvent") -> bool:
         """检查用户是否为群主"""
         # 与 GroupAdminFilter 类似，考虑重构
@@ -115,6 +141,9 @@ class GroupOwnerFilter(BaseFilter):
 class RootFilter(BaseFilter):
     """Root权限过滤器"""
 
+    def intern_key(self) -> Optional[Hashable]:
+        return _stateless_key(self, RootFilter)
+
     def check(self, event: "BaseMessageEvent") -> bool:
         """检查用户是否有root权限"""
         if not status.global_access_manager:
@@ -129,6 +158,9 @@ class RootFilter(BaseFilter):
 class NonSelfFilter(BaseFilter):
     """非自身消息过滤器"""
 
+    def intern_key(self) -> Optional[Hashable]:
+        return _stateless_key(self, NonSelfFilter)
+
     def check(self, event: "BaseMessageEvent") -> bool:
         return not isinstance(event, MessageSentEvent)
 
@@ -136,6 +168,9 @@ class NonSelfFilter(BaseFilter):
 class TrueFilter(BaseFilter):
     """True过滤器, 用于注册发送消息时调用的功能"""
 
+    def intern_key(self) -> Optional[Hashable]:
+        return _stateless_key(self, TrueFilter)
+
     def check(self, event: "BaseMessageEvent") -> bool:
         return True
 
@@ -154,6 +189,11 @@ class CustomFilter(BaseFilter):
         super().__init__(name or getattr(filter_func, "__name__", "custom"))
         self.filter_func = filter_func
 
+    def intern_key(self) -> Optional[Hashable]:
+        if type(self) is not CustomFilter:
+            return None
+        return (CustomFilter, self.filter_func)
+
     def check(self, event: "BaseMessageEvent") -> bool:
         """执行自定义过滤器检查"""
         return self.filter_func(event)
@@ -1,6 +1,6 @@
 """过滤器装饰器 v2.0"""
 
-from typing import Callable, Union, TYPE_CHECKING
+from typing import Callable, Hashable, Optional, Union, TYPE_CHECKING
 
 from .builtin import (
     GroupFilter,
@@ -15,8 +15,10 @@ from .builtin import (
 )
 from .base import BaseFilter
 from .base import CombinedFilter
+from .rate_limit import RateLimitFilter
 
 if TYPE_CHECKING:
+    from ncatbot.core.event import BaseMessageEvent
     from .base import BaseFilter
 
 
@@ -187,3 +189,28 @@ admin_group_filter = FilterDecorator(
 admin_private_filter = FilterDecorator(
     CombinedFilter(PrivateFilter(), AdminFilter(), "and")
 )
+
+
+# 限流装饰器
+def rate_limit(
+    rate: int,
+    per: float = 60,
+    scope: Union[str, Callable[["BaseMessageEvent"], Hashable]] = "user",
+    burst: Optional[int] = None,
+    message: Optional[str] = None,
+    max_keys: int = 100_000,
+) -> FilterDecorator:
+    """限流装饰器，每个周期最多触发 rate 次，参数见 RateLimitFilter"""
+    return FilterDecorator(
+        RateLimitFilter(rate, per, scope, burst, message, max_keys=max_keys)
+    )
+
+
+def cooldown(
+    seconds: float,
+    scope: Union[str, Callable[["BaseMessageEvent"], Hashable]] = "user",
+    message: Optional[str] = None,
+    max_keys: int = 100_000,
+) -> FilterDecorator:
+    """冷却装饰器，两次触发至少间隔 seconds 秒"""
+    return rate_limit(1, seconds, scope, 1, message, max_keys)
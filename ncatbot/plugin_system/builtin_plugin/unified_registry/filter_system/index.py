@@ -0,0 +1,144 @@
+"""纯过滤器函数索引
+
+大多数过滤器只区分消息类型和群号，初始化时据此把函数分桶：
+- 事件类型：群聊 / 私聊，是否为自身发送的消息
+- 群号：GroupFilter 的允许列表
+
+分发时只取出可能通过的函数，再由 FilterValidator 做完整检查。
+其它过滤器（权限、自定义函数等）无法静态判断，视为不限范围。
+"""
+
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from ncatbot.core.event import BaseMessageEvent, MessageSentEvent
+from .base import BaseFilter, CombinedFilter
+from .builtin import (
+    GroupAdminFilter,
+    GroupFilter,
+    GroupOwnerFilter,
+    MessageSentFilter,
+    NonSelfFilter,
+    PrivateFilter,
+)
+
+GROUP = "group"
+PRIVATE = "private"
+GROUP_SENT = "group_sent"
+PRIVATE_SENT = "private_sent"
+ALL_KINDS = (GROUP, PRIVATE, GROUP_SENT, PRIVATE_SENT)
+
+# 事件类型 → 允许的群号集合，None 表示不限群号
+Scope = Dict[str, Optional[FrozenSet[str]]]
+
+
+def event_kind(event: BaseMessageEvent) -> str:
+    """事件所属的类型"""
+    kind = GROUP if event.is_group_event() else PRIVATE
+    if isinstance(event, MessageSentEvent):
+        kind += "_sent"
+    return kind
+
+
+def _scope_of_kinds(*kinds: str) -> Scope:
+    return {kind: None for kind in kinds}
+
+
+def _intersect(a: Scope, b: Scope) -> Scope:
+    scope = {}
+    for kind in a.keys() & b.keys():
+        if a[kind] is None:
+            scope[kind] = b[kind]
+        elif b[kind] is None:
+            scope[kind] = a[kind]
+        else:
+            scope[kind] = a[kind] & b[kind]
+    return scope
+
+
+def _union(a: Scope, b: Scope) -> Scope:
+    scope = dict(a)
+    for kind, groups in b.items():
+        if kind not in scope:
+            scope[kind] = groups
+        elif scope[kind] is None or groups is None:
+            scope[kind] = None
+        else:
+            scope[kind] = scope[kind] | groups
+    return scope
+
+
+def filter_scope(filter_instance: BaseFilter) -> Scope:
+    """过滤器可能放行的事件范围
+
+    按精确类型判断, 重写了 check 的子类放行范围未知, 不做限制
+    """
+    kind = type(filter_instance)
+    if kind is GroupFilter:
+        groups = (
+            frozenset(filter_instance.allowed)
+            if filter_instance.allowed is not None
+            else None
+        )
+        return {GROUP: groups, GROUP_SENT: groups}
+    if kind is GroupAdminFilter or kind is GroupOwnerFilter:
+        return _scope_of_kinds(GROUP, GROUP_SENT)
+    if kind is PrivateFilter:
+        return _scope_of_kinds(PRIVATE, PRIVATE_SENT)
+    if kind is MessageSentFilter:
+        return _scope_of_kinds(GROUP_SENT, PRIVATE_SENT)
+    if kind is NonSelfFilter:
+        return _scope_of_kinds(GROUP, PRIVATE)
+    if kind is CombinedFilter:
+        left = filter_scope(filter_instance.left)
+        right = filter_scope(filter_instance.right)
+        if filter_instance.mode == "and":
+            return _intersect(left, right)
+        return _union(left, right)
+    return _scope_of_kinds(*ALL_KINDS)
+
+
+def function_scope(func: Callable) -> Scope:
+    """函数所有过滤器同时通过时的事件范围"""
+    scope = _scope_of_kinds(*ALL_KINDS)
+    for filter_instance in getattr(func, "__filters__", []):
+        scope = _intersect(scope, filter_scope(filter_instance))
+    return scope
+
+
+class _Bucket:
+    __slots__ = ("any_group", "by_group")
+
+    def __init__(self):
+        # (注册顺序, 函数)
+        self.any_group: List[Tuple[int, Callable]] = []
+        self.by_group: Dict[str, List[Tuple[int, Callable]]] = {}
+
+
+class FilterIndex:
+    """按事件类型和群号索引的纯过滤器函数"""
+
+    def __init__(self, functions: Iterable[Callable] = ()):
+        self._buckets: Dict[str, _Bucket] = {kind: _Bucket() for kind in ALL_KINDS}
+        self.size = 0
+        for func in functions:
+            self.add(func)
+
+    def add(self, func: Callable) -> None:
+        order = self.size
+        self.size += 1
+        for kind, groups in function_scope(func).items():
+            bucket = self._buckets[kind]
+            if groups is None:
+                bucket.any_group.append((order, func))
+            else:
+                for group_id in groups:
+                    bucket.by_group.setdefault(group_id, []).append((order, func))
+
+    def candidates(self, event: BaseMessageEvent) -> List[Callable]:
+        """可能通过过滤器的函数，按注册顺序排列"""
+        bucket = self._buckets[event_kind(event)]
+        group_id = getattr(event, "group_id", None)
+        matched = bucket.by_group.get(str(group_id)) if group_id is not None else None
+        if not matched:
+            return [func for _, func in bucket.any_group]
+        return [func for _, func in sorted(bucket.any_group + matched)]
@@ -0,0 +1,193 @@
+"""限流过滤器
+
+基于 GCRA（通用信元速率算法）按键限流，每个键只保存一个“理论到达时间”：
+- 到达时间早于当前时刻的键与从未出现过等价，随访问逐步清除
+- 键的数量有上限，超出时淘汰最久未访问的键（被淘汰的键重新计数）
+
+使用示例（装饰器见 decorators.py）:
+    @rate_limit(3, per=60)  # 每个用户每分钟 3 次
+    @command_registry.command("draw")
+    async def draw(self, event, prompt: str):
+        ...
+
+    @cooldown(10, scope="group", message="本群冷却中，{retry_after:.0f} 秒后再试")
+    @command_registry.command("roll")
+    async def roll(self, event):
+        ...
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Hashable, Optional, Set, Tuple, Union
+
+from ncatbot.utils import get_log
+from .base import BaseFilter
+
+if TYPE_CHECKING:
+    from ncatbot.core.event import BaseMessageEvent
+
+LOG = get_log("RateLimit")
+
+# 每次访问顺带检查的过期键数量，清理开销摊到每次访问上
+_SWEEP = 2
+
+
+class GCRALimiter:
+    """按键限流器
+
+    Args:
+        rate: 每个周期允许的次数
+        per: 周期长度（秒）
+        burst: 连续允许的最大次数，默认等于 rate
+        max_keys: 最多记录的键数量
+        clock: 时钟函数，默认 time.monotonic
+    """
+
+    def __init__(
+        self,
+        rate: int,
+        per: float,
+        burst: Optional[int] = None,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0 or per <= 0:
+            raise ValueError("rate 和 per 必须为正数")
+        self.interval = per / rate
+        self.burst = burst if burst is not None else rate
+        if self.burst <= 0:
+            raise ValueError("burst 必须为正数")
+        self.max_keys = max_keys
+        self.clock = clock
+        # 键 → 理论到达时间，按最近访问排序
+        self._tat: "OrderedDict[Hashable, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    def acquire(self, key: Hashable) -> Tuple[bool, float]:
+        """尝试消耗一次额度
+
+        Returns:
+            (是否允许, 被拒绝时距下次允许的秒数)
+        """
+        now = self.clock()
+        tats = self._tat
+        tat = tats.get(key, now)
+        base = tat if tat > now else now
+        # 等价于 now < base + interval - burst * interval，先加后减的舍入误差会误拒新键
+        wait = base - now - (self.burst - 1) * self.interval
+        if wait > 0:
+            return False, wait
+
+        tats[key] = base + self.interval
+        tats.move_to_end(key)
+        # 清除最久未访问且已过期的键，新写入的键尚未过期，循环总会停下
+        for _ in range(_SWEEP):
+            oldest = next(iter(tats))
+            if tats[oldest] > now:
+                break
+            del tats[oldest]
+        if len(tats) > self.max_keys:
+            tats.popitem(last=False)
+        return True, 0.0
+
+    def reset(self, key: Optional[Hashable] = None) -> None:
+        """清除一个键的记录，不指定时清除全部"""
+        if key is None:
+            self._tat.clear()
+        else:
+            self._tat.pop(key, None)
+
+
+def _user_key(event: "BaseMessageEvent") -> Hashable:
+    return str(event.user_id)
+
+
+def _group_key(event: "BaseMessageEvent") -> Hashable:
+    # 私聊没有群号，按用户单独计数
+    group_id = getattr(event, "group_id", None)
+    if group_id is None:
+        return ("private", str(event.user_id))
+    return str(group_id)
+
+
+def _member_key(event: "BaseMessageEvent") -> Hashable:
+    return (str(getattr(event, "group_id", None)), str(event.user_id))
+
+
+def _global_key(event: "BaseMessageEvent") -> Hashable:
+    return None
+
+
+_SCOPES = {
+    "user": _user_key,
+    "group": _group_key,
+    "member": _member_key,
+    "global": _global_key,
+}
+
+
+class RateLimitFilter(BaseFilter):
+    """限流过滤器
+
+    每个过滤器实例独立计数，装饰在哪个命令上就限制哪个命令；
+    多个命令共用同一个实例即共用额度。
+
+    Args:
+        rate: 每个周期允许的次数
+        per: 周期长度（秒）
+        scope: 计数范围，"user" / "group" / "member"（群内的单个用户）/ "global"，
+            或从事件计算键的函数
+        burst: 连续允许的最大次数，默认等于 rate
+        message: 被限流时回复的内容，可使用 {retry_after} 占位；
+            同一个键每个周期最多提示一次，None 表示不提示
+        max_keys: 最多记录的键数量
+        clock: 时钟函数，默认 time.monotonic
+    """
+
+    stateful = True
+
+    def __init__(
+        self,
+        rate: int,
+        per: float = 60,
+        scope: Union[str, Callable[["BaseMessageEvent"], Hashable]] = "user",
+        burst: Optional[int] = None,
+        message: Optional[str] = None,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+        name: str = None,
+    ):
+        if callable(scope):
+            self.key_func = scope
+        elif scope in _SCOPES:
+            self.key_func = _SCOPES[scope]
+        else:
+            raise ValueError(f"不支持的限流范围: {scope}")
+        scope_name = scope if isinstance(scope, str) else "custom"
+        super().__init__(name or f"RateLimit({rate}/{per}s,{scope_name})")
+        self.limiter = GCRALimiter(rate, per, burst, max_keys, clock)
+        self.message = message
+        self._notice = GCRALimiter(1, per, 1, max_keys, clock)
+        self._tasks: Set[asyncio.Task] = set()
+
+    def check(self, event: "BaseMessageEvent") -> bool:
+        key = self.key_func(event)
+        allowed, retry_after = self.limiter.acquire(key)
+        if not allowed:
+            LOG.debug(f"{self.name} 拦截: {key}, {retry_after:.1f} 秒后可用")
+            if self.message is not None and self._notice.acquire(key)[0]:
+                self._feedback(event, retry_after)
+        return allowed
+
+    def _feedback(self, event: "BaseMessageEvent", retry_after: float) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        text = self.message.format(retry_after=retry_after)
+        task = loop.create_task(event.reply(text))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
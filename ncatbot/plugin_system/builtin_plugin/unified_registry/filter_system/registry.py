@@ -1,8 +1,8 @@
 """过滤器注册器 v2.0"""
 
-from typing import Dict, List, Callable, Optional, Union, Any
+from typing import Dict, Hashable, Iterable, List, Callable, Optional, Set, Union, Any
 from dataclasses import dataclass
-from .base import BaseFilter
+from .base import BaseFilter, CombinedFilter
 from .builtin import CustomFilter
 from ncatbot.utils import get_log
 from ..utils import get_func_plugin_name
@@ -30,6 +30,10 @@ class FilterRegistry:
     def __init__(self):
         self._filters: Dict[str, FilterEntry] = {}
         self._function_filters: Dict[str, Callable] = {}
+        # 函数或其过滤器变化时递增，用于判断分发索引是否过期
+        self.version = 0
+        # 配置相同的过滤器共用一个实例，同一事件上的检查结果可以复用
+        self._interned: Dict[Hashable, BaseFilter] = {}
         from .decorators import admin_filter, root_filter, private_filter, group_filter
 
         self.admin_filter = admin_filter
@@ -121,6 +125,7 @@ class FilterRegistry:
             self._function_filters[function_name] = func
 
         filter_list: List[BaseFilter] = getattr(func, "__filters__")
+        self.version += 1
 
         for filter_item in filters:
             if isinstance(filter_item, str):
@@ -130,13 +135,20 @@ class FilterRegistry:
                 else:
                     LOG.error(f"未找到名为 {filter_item} 的过滤器")
             elif isinstance(filter_item, BaseFilter):
-                filter_list.append(filter_item)
+                filter_list.append(self.intern(filter_item))
             else:
                 LOG.error(f"不支持的过滤器类型: {type(filter_item)}")
 
         LOG.debug(f"为函数 {func.__name__} 添加了 {len(filters)} 个过滤器")
         return func
 
+    def intern(self, filter_instance: BaseFilter) -> BaseFilter:
+        """返回与给定过滤器配置相同的已有实例，没有时登记并返回它本身"""
+        key = filter_instance.intern_key()
+        if key is None:
+            return filter_instance
+        return self._interned.setdefault(key, filter_instance)
+
     # 查询方法
     def get_filter(self, name: str) -> Optional[FilterEntry]:
         """获取过滤器条目"""
@@ -160,14 +172,46 @@ class FilterRegistry:
         """清除所有注册的过滤器"""
         self._filters.clear()
         self._function_filters.clear()
+        self._interned.clear()
+        self.version += 1
 
     def revoke_plugin(self, plugin_name: str):
         """撤销插件的过滤器"""
         deleted_filters = [
-            name for name in self._function_filters.keys() if name.split("::")[0] == plugin_name
+            name
+            for name in self._function_filters.keys()
+            if name.split("::")[0] == plugin_name
         ]
-        for name in deleted_filters:
-            del self._function_filters[name]
+        revoked = [self._function_filters.pop(name) for name in deleted_filters]
+        if revoked:
+            # 只被撤销的函数使用的复用实例不再保留，否则会一直引用插件的函数
+            dropped = _reachable(revoked) - _reachable(
+                self._function_filters.values(),
+                [entry.filter_instance for entry in self._filters.values()],
+            )
+            self._interned = {
+                key: instance
+                for key, instance in self._interned.items()
+                if instance not in dropped
+            }
+        self.version += 1
+
+
+def _reachable(
+    funcs: Iterable[Callable], filters: Iterable[BaseFilter] = ()
+) -> Set[BaseFilter]:
+    """函数的过滤器及组合过滤器中的所有子过滤器"""
+    pending = [f for func in funcs for f in getattr(func, "__filters__", [])]
+    pending.extend(filters)
+    found: Set[BaseFilter] = set()
+    while pending:
+        filter_instance = pending.pop()
+        if filter_instance in found:
+            continue
+        found.add(filter_instance)
+        if isinstance(filter_instance, CombinedFilter):
+            pending.extend((filter_instance.left, filter_instance.right))
+    return found
 
 
 # 全局单例
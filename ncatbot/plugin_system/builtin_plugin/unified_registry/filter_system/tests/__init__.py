@@ -0,0 +1 @@
+"""过滤器系统测试模块"""
@@ -0,0 +1,79 @@
+"""纯过滤器函数索引测试
+
+- 私聊消息不会取到只处理群聊的函数
+- 群消息只取到不限群号或允许该群的函数
+- 组合过滤器按与/或计算范围, 无法静态判断的过滤器不限范围
+- 重写 check 的内置过滤器子类不限范围
+"""
+
+from ncatbot.plugin_system.builtin_plugin.unified_registry.filter_system import (
+    AdminFilter,
+    FilterIndex,
+    FilterRegistry,
+    GroupFilter,
+    PrivateFilter,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.filter_system.builtin import (
+    NonSelfFilter,
+)
+from ncatbot.utils.testing import EventFactory
+
+
+def _func(registry, name, *filters):
+    def func(event):
+        pass
+
+    func.__name__ = name
+    return registry.add_filter_to_function(func, *filters)
+
+
+def _names(index, event):
+    return [func.__name__ for func in index.candidates(event)]
+
+
+class TestFilterIndex:
+    """FilterIndex 测试类"""
+
+    def test_buckets(self):
+        """测试按事件类型和群号取出候选函数, 保持注册顺序"""
+        registry = FilterRegistry()
+        funcs = [
+            _func(registry, "any_group", GroupFilter(), NonSelfFilter()),
+            _func(registry, "group_100", GroupFilter([100, 200])),
+            _func(registry, "private", PrivateFilter()),
+            _func(registry, "admin", AdminFilter()),
+            _func(registry, "group_300", GroupFilter(300)),
+            _func(registry, "either", GroupFilter(300) | PrivateFilter()),
+            _func(registry, "nowhere", GroupFilter() & PrivateFilter()),
+        ]
+        index = FilterIndex(funcs)
+
+        group_100 = EventFactory.create_group_message("hi", group_id="100")
+        group_300 = EventFactory.create_group_message("hi", group_id="300")
+        private = EventFactory.create_private_message("hi")
+        assert _names(index, group_100) == ["any_group", "group_100", "admin"]
+        assert _names(index, group_300) == ["any_group", "admin", "group_300", "either"]
+        assert _names(index, private) == ["private", "admin", "either"]
+
+    def test_subclass_unrestricted(self):
+        """测试内置过滤器的子类按自己的 check 判断, 不沿用父类的范围"""
+
+        class GroupOrPrivate(GroupFilter):
+            def check(self, event):
+                return True
+
+        registry = FilterRegistry()
+        func = _func(registry, "sub", GroupOrPrivate())
+        index = FilterIndex([func])
+        private = EventFactory.create_private_message("hi")
+        assert _names(index, private) == ["sub"]
+
+    def test_version(self):
+        """测试添加和撤销函数后注册器版本变化"""
+        registry = FilterRegistry()
+        version = registry.version
+        _func(registry, "f", GroupFilter())
+        assert registry.version > version
+        version = registry.version
+        registry.revoke_plugin("UnknownPlugin")
+        assert registry.version > version
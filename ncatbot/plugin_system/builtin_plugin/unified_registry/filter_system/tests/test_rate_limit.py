@@ -0,0 +1,121 @@
+"""限流过滤器测试
+
+- 连续额度用完后按速率恢复, 被拒绝时给出等待时间
+- 键的数量有上限, 过期的键被清除
+- 限流在其它过滤器之后检查, 被拦截的消息不消耗额度
+- 同一个键每个周期最多提示一次
+"""
+
+import asyncio
+
+from ncatbot.plugin_system.builtin_plugin.unified_registry.filter_system import (
+    FilterRegistry,
+    FilterValidator,
+    GCRALimiter,
+    PrivateFilter,
+    RateLimitFilter,
+)
+from ncatbot.utils.testing import EventFactory
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Event:
+    """只带限流所需字段的假事件"""
+
+    def __init__(self, user_id, group_id=None):
+        self.user_id = user_id
+        if group_id is not None:
+            self.group_id = group_id
+        self.replies = []
+
+    async def reply(self, text):
+        self.replies.append(text)
+
+
+class TestGCRALimiter:
+    """GCRALimiter 测试类"""
+
+    def test_burst_and_refill(self):
+        """测试连续额度和按速率恢复"""
+        clock = _Clock()
+        limiter = GCRALimiter(3, 60, clock=clock)
+        assert [limiter.acquire("u")[0] for _ in range(4)] == [True] * 3 + [False]
+        assert limiter.acquire("u")[1] == 20
+        assert limiter.acquire("v")[0]
+
+        clock.now += 20
+        assert limiter.acquire("u") == (True, 0.0)
+        assert not limiter.acquire("u")[0]
+
+    def test_new_key_rounding(self):
+        """测试 now + interval - interval 舍入后大于 now 时新键仍被放行"""
+        clock = _Clock()
+        clock.now = 497.5352828678935
+        limiter = GCRALimiter(1, 60, clock=clock)
+        assert limiter.acquire("u") == (True, 0.0)
+        assert not limiter.acquire("u")[0]
+
+    def test_bounded_keys(self):
+        """测试键数量不超过上限, 过期的键随访问清除"""
+        clock = _Clock()
+        limiter = GCRALimiter(1, 10, max_keys=100, clock=clock)
+        for i in range(1000):
+            limiter.acquire(i)
+        assert len(limiter) == 100
+
+        clock.now += 10
+        for i in range(50):
+            limiter.acquire(f"new{i}")
+        assert len(limiter) == 50
+
+
+class TestRateLimitFilter:
+    """RateLimitFilter 测试类"""
+
+    def test_checked_last(self):
+        """测试被其它过滤器拦截的消息不消耗限流额度"""
+        registry = FilterRegistry()
+        limit = RateLimitFilter(1, 60)
+
+        def func(event):
+            pass
+
+        registry.add_filter_to_function(func, limit, PrivateFilter())
+        validator = FilterValidator()
+        for _ in range(3):
+            event = EventFactory.create_group_message("hi")
+            assert not validator.validate_filters(func, event)
+        assert len(limit.limiter) == 0
+
+        event = EventFactory.create_private_message("hi")
+        assert validator.validate_filters(func, event)
+        assert validator.validate_filters(func, event)
+        assert not validator.validate_filters(
+            func, EventFactory.create_private_message("hi")
+        )
+
+    def test_scope_and_feedback(self):
+        """测试按群计数, 同一个群每个周期只提示一次"""
+        clock = _Clock()
+        limit = RateLimitFilter(
+            1, 30, scope="group", message="{retry_after:.0f} 秒后再试", clock=clock
+        )
+
+        async def main():
+            events = [_Event(i, group_id=1) for i in range(3)]
+            results = [limit.check(e) for e in events]
+            results.append(limit.check(_Event(9, group_id=2)))
+            results.append(limit.check(_Event(9)))
+            await asyncio.sleep(0)
+            return results, events
+
+        results, events = asyncio.run(main())
+        assert results == [True, False, False, True, True]
+        assert [e.replies for e in events] == [[], ["30 秒后再试"], []]
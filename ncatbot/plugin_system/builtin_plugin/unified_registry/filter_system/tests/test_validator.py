@@ -0,0 +1,120 @@
+"""过滤器验证测试
+
+- 配置相同的过滤器注册后共用一个实例
+- 同一事件上同一过滤器只检查一次
+- 便宜且常拦截的过滤器先检查
+- 撤销插件后不再引用其过滤器
+"""
+
+import gc
+import time
+
+from ncatbot.plugin_system.builtin_plugin.unified_registry.filter_system import (
+    AdminFilter,
+    CustomFilter,
+    FilterRegistry,
+    FilterValidator,
+    GroupFilter,
+    PrivateFilter,
+    RateLimitFilter,
+)
+from ncatbot.utils.testing import EventFactory
+
+
+def _func(registry, *filters):
+    def func(event):
+        pass
+
+    return registry.add_filter_to_function(func, *filters)
+
+
+class TestFilterValidator:
+    """FilterValidator 测试类"""
+
+    def test_intern(self):
+        """测试相同配置复用实例, 带状态的子类不复用"""
+
+        class MyAdmin(AdminFilter):
+            pass
+
+        registry = FilterRegistry()
+        a = _func(registry, GroupFilter([1, 2]), PrivateFilter() | AdminFilter())
+        b = _func(registry, GroupFilter(["2", 1]), PrivateFilter() | AdminFilter())
+        assert a.__filters__[0] is b.__filters__[0]
+        assert a.__filters__[1] is b.__filters__[1]
+        assert registry.intern(MyAdmin()) is not registry.intern(MyAdmin())
+
+    def test_revoke_releases_filters(self):
+        """测试撤销插件后只被它使用的复用实例和统计被释放"""
+
+        def check(event):
+            return True
+
+        def revoked(event):
+            pass
+
+        def kept(event):
+            pass
+
+        registry = FilterRegistry()
+        registry.add_filter_to_function(
+            revoked, GroupFilter(), CustomFilter(check) | PrivateFilter()
+        )
+        registry.add_filter_to_function(kept, GroupFilter())
+        # 测试中的函数都不在插件目录下, 手动改为另一个插件的函数
+        registry._function_filters["other::kept"] = registry._function_filters.pop(
+            "ncatbot::kept"
+        )
+        assert len(registry._interned) == 2
+
+        registry.revoke_plugin("ncatbot")
+        assert list(registry._interned.values()) == [kept.__filters__[0]]
+
+        validator = FilterValidator()
+        limit = RateLimitFilter(1, 60)
+        validator.validate_filters(
+            _func(registry, limit), EventFactory.create_group_message("hi")
+        )
+        assert len(validator.stats()) == 1
+        del limit
+        registry.clear()
+        gc.collect()
+        assert validator.stats() == []
+
+    def test_memoize_per_event(self):
+        """测试同一事件上的过滤器结果被多个函数复用"""
+        calls = []
+
+        def expensive(event):
+            calls.append(event)
+            return True
+
+        registry = FilterRegistry()
+        shared = CustomFilter(expensive)
+        funcs = [_func(registry, shared, GroupFilter()) for _ in range(5)]
+        validator = FilterValidator()
+
+        for _ in range(2):
+            event = EventFactory.create_group_message("hi")
+            assert all(validator.validate_filters(f, event) for f in funcs)
+        assert len(calls) == 2
+        stats = {s["filter"]: s for s in validator.stats()}
+        assert stats[str(shared)]["calls"] == 2
+        assert stats[str(shared)]["memo_hits"] == 8
+
+    def test_cost_order(self):
+        """测试测量后先检查便宜且总是拦截的过滤器"""
+        calls = []
+
+        def slow(event):
+            calls.append(event)
+            time.sleep(0.002)
+            return True
+
+        registry = FilterRegistry()
+        func = _func(registry, CustomFilter(slow), PrivateFilter())
+        validator = FilterValidator()
+        for _ in range(5):
+            event = EventFactory.create_group_message("hi")
+            assert not validator.validate_filters(func, event)
+        assert len(calls) == 1
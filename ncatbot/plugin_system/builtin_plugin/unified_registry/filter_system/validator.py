@@ -1,6 +1,8 @@
 """过滤器验证器 v2.0"""
 
-from typing import Callable, List, TYPE_CHECKING
+import time
+import weakref
+from typing import Callable, Dict, List, TYPE_CHECKING
 from .base import BaseFilter
 from ncatbot.utils import get_log
 
@@ -10,8 +12,69 @@ if TYPE_CHECKING:
 LOG = get_log("Validator")
 
 
+class FilterStats:
+    """单个过滤器实例的检查统计"""
+
+    __slots__ = ("calls", "passed", "memo_hits", "total_time")
+
+    def __init__(self):
+        self.calls = 0
+        self.passed = 0
+        self.memo_hits = 0
+        self.total_time = 0.0
+
+    @property
+    def pass_rate(self) -> float:
+        return self.passed / self.calls if self.calls else 0.0
+
+    @property
+    def avg_cost(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def rank(self) -> float:
+        """排序依据：平均耗时 / 拦截率，越小越先检查；未测量过的先检查"""
+        if not self.calls:
+            return 0.0
+        return self.avg_cost / max(1.0 - self.pass_rate, 0.01)
+
+
 class FilterValidator:
-    """过滤器验证器 v2.0"""
+    """过滤器验证器 v2.0
+
+    - 同一事件上，同一过滤器实例只检查一次，结果记录在事件上供其它函数复用
+    - 一个函数的多个过滤器按实测的耗时和拦截率排序，便宜且常拦截的先检查
+    - 有副作用的过滤器（如限流）最后检查，被其它过滤器拦截时不消耗额度
+    """
+
+    def __init__(self):
+        # 弱引用，插件卸载后不再使用的过滤器（如限流器的状态）随之释放
+        self._stats: "weakref.WeakKeyDictionary[BaseFilter, FilterStats]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _check(self, filter_instance: BaseFilter, event: "BaseMessageEvent") -> bool:
+        stats = self._stats.get(filter_instance)
+        if stats is None:
+            stats = self._stats[filter_instance] = FilterStats()
+        start = time.perf_counter()
+        try:
+            result = bool(filter_instance.check(event))
+        except Exception as e:
+            LOG.error(f"过滤器验证失败: {filter_instance}, 错误: {e}")
+            result = False
+        stats.total_time += time.perf_counter() - start
+        stats.calls += 1
+        stats.passed += result
+        return result
+
+    def _rank(self, filter_instance: BaseFilter, results: Dict[BaseFilter, bool]):
+        if filter_instance in results:
+            # 本事件已有结果，不需要再检查
+            return -1.0
+        if filter_instance.stateful:
+            return float("inf")
+        stats = self._stats.get(filter_instance)
+        return stats.rank() if stats is not None else 0.0
 
     def validate_filters(self, func: Callable, event: "BaseMessageEvent") -> bool:
         """验证函数的所有过滤器
@@ -29,15 +92,35 @@ class FilterValidator:
             # 没有过滤器的函数默认通过
             return True
 
+        results: Dict[BaseFilter, bool] = getattr(event, "_filter_results", None)
+        if results is None:
+            results = event._filter_results = {}
+        if len(filters) > 1:
+            filters = sorted(filters, key=lambda f: self._rank(f, results))
+
         # 执行所有过滤器验证
         for filter_instance in filters:
-            try:
-                if not filter_instance.check(event):
-                    LOG.debug(f"函数 {func.__name__} 被过滤器 {filter_instance} 拦截")
-                    return False
-            except Exception as e:
-                LOG.error(f"过滤器验证失败: {filter_instance}, 错误: {e}")
+            result = results.get(filter_instance)
+            if result is None:
+                result = results[filter_instance] = self._check(filter_instance, event)
+            elif filter_instance in self._stats:
+                self._stats[filter_instance].memo_hits += 1
+            if not result:
+                LOG.debug(f"函数 {func.__name__} 被过滤器 {filter_instance} 拦截")
                 return False
 
         LOG.debug(f"函数 {func.__name__} 通过所有过滤器验证")
         return True
+
+    def stats(self) -> List[Dict[str, object]]:
+        """各过滤器实例的检查次数、通过率、复用次数和平均耗时（微秒）"""
+        return [
+            {
+                "filter": str(filter_instance),
+                "calls": stats.calls,
+                "pass_rate": stats.pass_rate,
+                "memo_hits": stats.memo_hits,
+                "avg_cost_us": stats.avg_cost * 1e6,
+            }
+            for filter_instance, stats in list(self._stats.items())
+        ]
@@ -12,10 +12,10 @@ from ncatbot.utils import get_log
 from ...builtin_mixin import NcatBotPlugin
 from .trigger.binder import BindResult
 from .trigger.preprocessor import MessagePreprocessor, PreprocessResult
-from .command_system.lexer.tokenizer import StringTokenizer, Token
+from .trigger.context import get_parse_context
 from .trigger.resolver import CommandResolver
 from .trigger.binder import ArgumentBinder
-from .filter_system import filter_registry, FilterValidator
+from .filter_system import filter_registry, FilterIndex, FilterValidator
 from .command_system.registry.registry import command_registry
 from .legacy_registry import legacy_registry
 
@@ -64,13 +64,15 @@ class UnifiedRegistryPlugin(NcatBotPlugin):
         self._filter_validator = FilterValidator()
 
         # 初始化插件映射
-        self.func_plugin_map: Dict[Callable, NcatBotPlugin] = {}
+        self.func_plugin_map: Dict[Callable, Optional[NcatBotPlugin]] = {}
 
         # 触发引擎延迟到首次收到消息时再初始化
         self.filter_registry = filter_registry
         self.command_registry = command_registry
         self._trigger_engine = None
         self._binder = ArgumentBinder()
+        self._filter_index = FilterIndex()
+        self._filter_index_version = -1
         self._initialized = False
 
     def _normalize_case(self, s: str) -> str:
@@ -80,15 +82,25 @@ class UnifiedRegistryPlugin(NcatBotPlugin):
     async def handle_plugin_unload_event(self, event: NcatBotEvent) -> None:
         """处理插件卸载事件，清理相关缓存"""
         LOG.debug(f"处理插件卸载事件: {event.data['name']}")
-        self._initialized = False
         self.command_registry.root_group.revoke_plugin(event.data["name"])
         self.filter_registry.revoke_plugin(event.data["name"])
-        self.initialize_if_needed()
+        # 只清除属于被卸载插件的绑定
+        self.func_plugin_map = {
+            func: plugin
+            for func, plugin in self.func_plugin_map.items()
+            if plugin is None or plugin.name != event.data["name"]
+        }
+        self._refresh_if_initialized()
 
     async def handle_plugin_load_event(self, event: NcatBotEvent) -> None:
         """处理插件加载事件，清理相关缓存"""
-        self._initialized = False
-        self.initialize_if_needed()
+        # 新插件可能是之前找不到归属的函数的所有者，重新查找这些函数
+        self.func_plugin_map = {
+            func: plugin
+            for func, plugin in self.func_plugin_map.items()
+            if plugin is not None
+        }
+        self._refresh_if_initialized()
 
     async def _execute_function(self, func: Callable, *args, **kwargs):
         """执行函数
@@ -112,13 +124,29 @@ class UnifiedRegistryPlugin(NcatBotPlugin):
             LOG.error(f"执行函数 {func.__name__} 时发生错误: {e}")
             return False
 
-    async def _run_pure_filters(self, event: "BaseMessageEvent") -> None:
-        """遍历执行纯过滤器函数（不含命令函数）。"""
-        for func in filter_registry._function_filters.values():
+    def _build_filter_index(self) -> None:
+        """按事件类型和群号索引纯过滤器函数（不含命令函数）。"""
+        self._filter_index = FilterIndex(
+            func
+            for func in filter_registry._function_filters.values()
             # 额外防御：若误标记，仍跳过命令函数
-            if getattr(func, "__is_command__", False):
-                continue
-            await self._execute_function(func, event)
+            if not getattr(func, "__is_command__", False)
+        )
+        self._filter_index_version = filter_registry.version
+
+    async def _run_pure_filters(self, event: "BaseMessageEvent") -> None:
+        """并发执行可能通过过滤器的纯过滤器函数。"""
+        if self._filter_index_version != filter_registry.version:
+            self._build_filter_index()
+        candidates = self._filter_index.candidates(event)
+        if candidates:
+            await asyncio.gather(
+                *(self._execute_function(func, event) for func in candidates)
+            )
+
+    def filter_stats(self) -> List[Dict[str, object]]:
+        """各过滤器的检查次数、通过率、复用次数和平均耗时"""
+        return self._filter_validator.stats()
 
     async def _run_command(self, event: "BaseMessageEvent") -> None:
         # 前置检查与提取首段文本（用于前缀与命令词匹配）
@@ -127,22 +155,16 @@ class UnifiedRegistryPlugin(NcatBotPlugin):
             # 不符合前置条件（例如不要求前缀但为空/非文本）
             return False
 
-        # 解析首段文本为 token（用于命令匹配）
+        # 首个单词不是任何命令（含前缀）时直接返回，不做分词
         text = pre.command_text
-        hit = [
-            command
-            for command in self._resolver.get_commands()
-            if text.split(" ")[0].endswith(command.path_words[0])
-        ]
-        if not hit:
+        if not self._resolver.match_first_word(text):
             return False
 
-        tokenizer = StringTokenizer(text)
-        tokens: List[Token] = tokenizer.tokenize()
-
         # 从首段 token 流解析命令（严格无前缀冲突则应唯一）
+        # 分词结果缓存在事件上，参数绑定和过滤器直接复用
+        tokens = get_parse_context(event).head_tokens
         prefix, match = self._resolver.resolve_from_tokens(tokens)
-        if match is None or prefix not in match.command.prefixes:
+        if match is None:
             return False
 
         LOG.debug(f"命中命令: {match.command.func.__name__}")
@@ -150,6 +172,10 @@ class UnifiedRegistryPlugin(NcatBotPlugin):
         func = match.command.func
         ignore_words = match.path_words  # 用于参数绑定的 ignore 计数
 
+        # 过滤器（含限流）先于参数绑定检查，结果记录在事件上，执行时直接复用
+        if not self._filter_validator.validate_filters(func, event):
+            return False
+
         try:
             bind_result: BindResult = self._binder.bind(
                 match.command, event, ignore_words, [prefix]
@@ -181,17 +207,8 @@ class UnifiedRegistryPlugin(NcatBotPlugin):
 
         self._initialized = True
 
-        self.prefixes = list(
-            dict.fromkeys(
-                prefix
-                for registry in command_registry.command_registries
-                for prefix in registry.prefixes
-            )
-        )
-        if "" in self.prefixes:
-            self.prefixes.remove("")
-        LOG.info(f"命令前缀集合: {self.prefixes}")
-
+        # 前缀列表与预处理器共享，刷新时原地更新
+        self.prefixes: List[str] = []
         self._preprocessor = MessagePreprocessor(
             prefixes=self.prefixes,
             require_prefix=False,
@@ -203,17 +220,49 @@ class UnifiedRegistryPlugin(NcatBotPlugin):
             prefixes=self.prefixes,
             case_sensitive=False,
         )
+        self._refresh()
 
-        # 1) 检查消息级前缀集合冲突
-        norm_prefixes = [self._normalize_case(p) for p in self._preprocessor.prefixes]
-        for i, p1 in enumerate(norm_prefixes):
-            for j, p2 in enumerate(norm_prefixes):
-                if i == j:
-                    continue
-                if p2.startswith(p1):
+    def _refresh_if_initialized(self) -> None:
+        """插件加载或卸载后增量更新分发表，尚未初始化时等首次消息再构建。"""
+        if self._initialized:
+            self._refresh_plugins()
+
+    def _update_prefixes(self) -> None:
+        """按注册器当前内容更新消息级前缀，只检查新增前缀的冲突。"""
+        prefixes = list(
+            dict.fromkeys(
+                prefix
+                for registry in command_registry.command_registries
+                for prefix in registry.prefixes
+                if prefix != ""
+            )
+        )
+        if prefixes == self.prefixes:
+            return
+
+        norm_prefixes = [self._normalize_case(p) for p in self.prefixes]
+        for prefix in prefixes:
+            if prefix in self.prefixes:
+                continue
+            p1 = self._normalize_case(prefix)
+            for p2 in norm_prefixes:
+                if p2.startswith(p1) or p1.startswith(p2):
                     # 严格：前缀包含不允许（例如 '!' 与 '!!'）
                     LOG.error(f"消息前缀冲突: '{p1}' 与 '{p2}' 存在包含关系")
                     raise ValueError(f"prefix conflict: {p1} vs {p2}")
+            norm_prefixes.append(p1)
+
+        self.prefixes[:] = prefixes
+        self._resolver.prefixes_tuple = tuple(prefixes)
+        LOG.info(f"命令前缀集合: {self.prefixes}")
+
+    def _refresh(self) -> None:
+        """按注册器全部内容同步命令分发表、过滤器索引和插件绑定。"""
+        # 全量同步已包含所有插件，之前记录的变化不需要再处理
+        command_registry.pop_changed_plugins()
+
+        # 1) 检查消息级前缀集合冲突
+        self._update_prefixes()
 
         # 2) 采集命令定义（仅带 __is_command__ 的函数）
         # CommandGroup.get_all_commands 返回 {path_tuple: func}
@@ -233,11 +282,54 @@ class UnifiedRegistryPlugin(NcatBotPlugin):
             if getattr(command.func, "__is_command__", False):
                 filtered_aliases[path] = command
 
-        # 3) 交给 resolver 构建并做冲突检测
-        self._resolver.build_index(filtered_commands, filtered_aliases)
-        print(filtered_commands.keys(), filtered_aliases.keys())
+        # 3) 交给 resolver 增量更新并做冲突检测
+        added, removed = self._resolver.sync(filtered_commands, filtered_aliases)
+
+        # 4) 纯过滤器函数分发索引与插件绑定
+        self._refresh_bindings([command.func for command in filtered_commands.values()])
         LOG.debug(
-            f"TriggerEngine 初始化完成：命令={len(filtered_commands)}, 别名={len(filtered_aliases)}"
+            f"TriggerEngine 更新完成：命令={len(filtered_commands)}, "
+            f"别名={len(filtered_aliases)}, 新增={added}, 删除={removed}"
+        )
+
+    def _refresh_plugins(self) -> None:
+        """只同步命令有变化的插件，开销与被加载或卸载的插件的命令数成正比。"""
+        self._update_prefixes()
+
+        added = removed = 0
+        funcs: List[Callable] = []
+        failed: List[Tuple[Optional[str], ValueError]] = []
+        for plugin_name in command_registry.pop_changed_plugins():
+            entries = [
+                (path, command)
+                for path, command in command_registry.get_plugin_commands(plugin_name)
+                if getattr(command.func, "__is_command__", False)
+            ]
+            try:
+                counts = self._resolver.sync_plugin(plugin_name, entries)
+            except ValueError as e:
+                # 单个插件冲突不影响其它插件，冲突的插件下次刷新时重试
+                LOG.error(f"插件 {plugin_name} 的命令同步失败: {e}")
+                failed.append((plugin_name, e))
+                continue
+            added, removed = added + counts[0], removed + counts[1]
+            funcs.extend(command.func for _, command in entries)
+
+        self._refresh_bindings(funcs)
+        LOG.debug(f"TriggerEngine 增量更新完成：新增={added}, 删除={removed}")
+        if failed:
+            command_registry.mark_changed(name for name, _ in failed)
+            raise failed[0][1]
+
+    def _refresh_bindings(self, command_funcs: List[Callable]) -> None:
+        if self._filter_index_version != filter_registry.version:
+            self._build_filter_index()
+        # 绑定命令和过滤器函数所属的插件，已绑定的函数会直接跳过
+        self._bind_plugins(
+            command_funcs
+            + list(filter_registry._function_filters.values())
+            + legacy_registry._notice_event
+            + legacy_registry._request_event
         )
 
     async def handle_legacy_event(self, event: NcatBotEvent) -> bool:
@@ -251,21 +343,32 @@ class UnifiedRegistryPlugin(NcatBotPlugin):
                 await self._execute_function(func, event_data)
         return True
 
+    def _bind_plugins(self, funcs: List[Callable]) -> None:
+        """为尚未绑定的函数查找所属插件，找不到时记为 None"""
+        unbound = [func for func in funcs if func not in self.func_plugin_map]
+        if not unbound:
+            return
+        owners: Dict[Callable, NcatBotPlugin] = {}
+        for plugin in self.list_plugins(obj=True):
+            for value in plugin.__class__.__dict__.values():
+                try:
+                    owners.setdefault(value, plugin)
+                except TypeError:
+                    # 不可哈希的类属性不会是注册的函数
+                    continue
+        for func in unbound:
+            self.func_plugin_map[func] = owners.get(func)
+        LOG.debug(f"绑定插件函数: {len(unbound)} 个")
+
     def _find_plugin_for_function(self, func: Callable) -> "NcatBotPlugin":
         """查找函数所属的插件"""
-        # 缓存查找结果
+        # 注册表初始化时已绑定，包括找不到归属的函数
         if func in self.func_plugin_map:
             return self.func_plugin_map[func]
 
-        # 遍历所有插件查找函数归属
-        plugins = self.list_plugins(obj=True)
-        for plugin in plugins:
-            plugin_class = plugin.__class__
-            if func in plugin_class.__dict__.values():
-                self.func_plugin_map[func] = plugin
-                return plugin
-
-        return None
+        # 初始化之后才注册的函数
+        self._bind_plugins([func])
+        return self.func_plugin_map[func]
 
     def clear(self):
         """清理缓存"""
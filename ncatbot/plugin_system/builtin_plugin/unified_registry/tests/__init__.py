@@ -0,0 +1 @@
+"""统一注册插件测试模块"""
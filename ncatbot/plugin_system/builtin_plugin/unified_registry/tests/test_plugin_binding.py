@@ -0,0 +1,141 @@
+"""插件绑定测试
+
+- 注册表初始化时一次性绑定函数所属插件, 找不到归属的函数也记录下来
+- 分发时不再遍历插件
+- 卸载插件只清除该插件的绑定
+- 按插件同步命令时, 一个插件冲突不影响其它插件
+"""
+
+import asyncio
+
+import pytest
+
+from ncatbot.core.event import BaseMessageEvent
+from ncatbot.plugin_system.builtin_plugin.unified_registry import (
+    UnifiedRegistryPlugin,
+    plugin as plugin_module,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.registry.registry import (
+    CommandGroup,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.trigger.resolver import (
+    CommandResolver,
+)
+from ncatbot.plugin_system.event.event import NcatBotEvent
+
+
+class _PluginA:
+    name = "A"
+
+    def handler(self, event):
+        pass
+
+
+class _PluginB:
+    name = "B"
+
+    def handler(self, event):
+        pass
+
+
+def orphan(event):
+    pass
+
+
+class _Registry:
+    """只记录撤销调用的假注册器"""
+
+    def __init__(self):
+        self.root_group = self
+        self.revoked = []
+
+    def revoke_plugin(self, name):
+        self.revoked.append(name)
+
+
+def _registry_plugin(plugins):
+    plugin = UnifiedRegistryPlugin.__new__(UnifiedRegistryPlugin)
+    plugin.func_plugin_map = {}
+    plugin.scans = 0
+
+    def list_plugins(obj=False):
+        plugin.scans += 1
+        return plugins
+
+    plugin.list_plugins = list_plugins
+    plugin._initialized = False
+    return plugin
+
+
+class TestPluginBinding:
+    """插件绑定测试类"""
+
+    def test_bind_once(self):
+        """测试一次绑定后查找不再遍历插件, 包括找不到归属的函数"""
+        a, b = _PluginA(), _PluginB()
+        plugin = _registry_plugin([a, b])
+        plugin._bind_plugins([_PluginA.handler, _PluginB.handler, orphan])
+        assert plugin.scans == 1
+
+        for _ in range(3):
+            assert plugin._find_plugin_for_function(_PluginA.handler) is a
+            assert plugin._find_plugin_for_function(_PluginB.handler) is b
+            assert plugin._find_plugin_for_function(orphan) is None
+        assert plugin.scans == 1
+
+    def test_unload_clears_only_that_plugin(self):
+        """测试卸载插件只清除它的绑定, 加载插件时重新查找无归属的函数"""
+        a, b = _PluginA(), _PluginB()
+        plugin = _registry_plugin([a, b])
+        plugin.command_registry = plugin.filter_registry = _Registry()
+        plugin._bind_plugins([_PluginA.handler, _PluginB.handler, orphan])
+
+        event = NcatBotEvent("ncatbot.plugin_unload", {"name": "A"})
+        asyncio.run(plugin.handle_plugin_unload_event(event))
+        assert plugin.func_plugin_map == {_PluginB.handler: b, orphan: None}
+        assert plugin.command_registry.revoked == ["A", "A"]
+
+        event = NcatBotEvent("ncatbot.plugin_load", {"name": "C"})
+        asyncio.run(plugin.handle_plugin_load_event(event))
+        assert plugin.func_plugin_map == {_PluginB.handler: b}
+
+    def test_refresh_conflict_isolated(self, monkeypatch):
+        """测试一个插件命令冲突时其它插件照常同步, 冲突的插件留到下次重试"""
+
+        async def ping(self, event: BaseMessageEvent):
+            pass
+
+        async def pong(self, event: BaseMessageEvent):
+            pass
+
+        registry = CommandGroup("root", prefixes=["/"])
+        registry.command_registries = []
+        registry.command("ping")(ping)
+        registry.command("pong")(pong)
+        registry.pop_changed_plugins()
+        commands = registry.get_all_commands()
+        # 测试中的函数不在插件目录下, 手动指定所属插件
+        commands[("ping",)].plugin_name = "Conflict"
+        commands[("pong",)].plugin_name = "Clean"
+        registry.plugin_commands = {
+            "Conflict": [(("ping",), commands[("ping",)])],
+            "Clean": [(("pong",), commands[("pong",)])],
+        }
+        registry.mark_changed(["Conflict", "Clean"])
+        monkeypatch.setattr(plugin_module, "command_registry", registry)
+
+        plugin = _registry_plugin([])
+        plugin.prefixes = []
+        plugin._filter_index_version = -1
+        plugin._resolver = CommandResolver(
+            case_sensitive=False, prefixes=["/"], allow_hierarchical=False
+        )
+        existing = CommandGroup("existing", prefixes=["/"])
+        existing.command("ping")(ping)
+        plugin._resolver.sync_plugin("Other", existing.get_all_commands().items())
+
+        with pytest.raises(ValueError, match="命令重复"):
+            plugin._refresh_plugins()
+        paths = {e.path_words for e in plugin._resolver.get_commands()}
+        assert paths == {("ping",), ("pong",)}
+        assert registry.pop_changed_plugins() == ["Conflict"]
@@ -1,13 +1,13 @@
 """参数绑定器（基于 message_tokenizer 结果）
 
 策略：
-- 使用 MessageTokenizer.parse_message(event.message) 获取 ParsedCommand
-- 使用 FuncAnalyser 仅做签名与类型约束（detect_args_type、默认值收集）
+- 使用事件的解析上下文获取 ParsedCommand（与命令解析共用一次分词）
+- 使用 FuncAnalyser 注册时生成的 CompiledBinder（必需参数个数、选项/参数查找表、逐位置转换函数）
 - 位置参数绑定来源：ParsedCommand.elements（已剔除选项与命名参数）
 - Sentence 类型吞剩余文本元素；MessageSegment 子类按元素匹配；基础类型从文本元素解析
 """
 
-import inspect
+import logging
 from dataclasses import dataclass
 from typing import Tuple, List, Any, Dict
 
@@ -15,7 +15,7 @@ from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.utils.
     CommandSpec,
 )
 from ncatbot.utils import get_log
-from ..command_system.lexer.message_tokenizer import MessageTokenizer
+from .context import get_parse_context
 from ncatbot.core.event import BaseMessageEvent
 
 LOG = get_log(__name__)
@@ -52,13 +52,12 @@ class ArgumentBinder:
         try:
             # TODO: 绑定错误回报提示
             # 解析消息为 ParsedCommand（elements 已去除选项/命名参数）
-            tokenizer = MessageTokenizer()
-            parsed = tokenizer.parse_message(event.message)
-            elements = list(parsed.elements)  # copy
-            LOG.debug(
-                f"解析后的元素: {elements}, 命名参数: {parsed.named_params}, 选项: {parsed.options}"
-            )
-            LOG.debug(f"路径词: {path_words}")
+            parsed = get_parse_context(event).parsed
+            elements = parsed.elements
+            if LOG.isEnabledFor(logging.DEBUG):
+                LOG.debug(
+                    f"解析后的元素: {elements}, 命名参数: {parsed.named_params}, 选项: {parsed.options}, 路径词: {path_words}"
+                )
             # 跳过命令词（仅匹配前置的 text 元素）
             skip_idx = 0
             pw = list(path_words)
@@ -76,51 +75,37 @@ class ArgumentBinder:
                     break
 
             # 缺少参数主动抛出异常
-            actual_args_count = len(elements[skip_idx:])
-            sig = inspect.signature(spec.func)
-            required_args = [
-                name
-                for name, param in sig.parameters.items()
-                if param.default is inspect.Parameter.empty
-                and param.kind
-                in (
-                    inspect.Parameter.POSITIONAL_ONLY,
-                    inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            compiled = spec.binder
+            positional = elements[skip_idx:]
+            if len(positional) < compiled.required_count:
+                raise Exception(
+                    f"参数不足：需要 {compiled.required_count} 个，实际传入 {len(positional)} 个"
                 )
-            ]
-            required_args_count = (
-                len(required_args) - 2
-            )  # 减去 self 和 cls 之类的固定参数
-            if actual_args_count < required_args_count:
+            if len(positional) > len(compiled.converters):
                 raise Exception(
-                    f"参数不足：需要 {required_args_count} 个，实际传入 {actual_args_count} 个"
+                    f"参数过多：最多 {len(compiled.converters)} 个，实际传入 {len(positional)} 个"
                 )
 
-            LOG.debug(f"跳过索引: {skip_idx}")
-            idx = skip_idx
-            bound_args: List[Any] = []
             bound_kwargs: Dict[str, Any] = {}
 
             for k, v in parsed.named_params.items():
-                result = spec.get_param_binding(k, v)
-                if result is None:
+                binding = compiled.params.get(k)
+                if binding is None:
                     raise InvalidParamError(k)
-                bound_kwargs.update(result)
+                name, convert = binding
+                bound_kwargs[name] = convert(v)
 
             for o in parsed.options:
-                result = spec.get_kw_binding(o)
-                if result is None:
+                binding = compiled.options.get(o)
+                if binding is None:
                     raise InvalidOptionError(o)
-                bound_kwargs.update(result)
-
-            for idx, element in enumerate(elements[skip_idx:]):
-                content = element.content
-                if spec.args_types[idx] is bool:
-                    bound_args.append(content.lower() not in ["false", "0"])
-                elif spec.args_types[idx] in (str, float, int):
-                    bound_args.append(spec.args_types[idx](content))
-                else:
-                    bound_args.append(element.content)
+                name, value = binding
+                bound_kwargs[name] = value
+
+            bound_args = [
+                convert(element.content)
+                for convert, element in zip(compiled.converters, positional)
+            ]
 
             return BindResult(True, tuple(bound_args), bound_kwargs, "")
         except Exception as e:
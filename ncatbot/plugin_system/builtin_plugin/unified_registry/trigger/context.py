@@ -0,0 +1,64 @@
+"""消息解析上下文
+
+同一条消息在命令解析、参数绑定和过滤器中只分词一次：
+- 首次访问时逐段分词，结果缓存在上下文中
+- 上下文挂在事件对象上，通过 get_parse_context 获取
+"""
+
+from typing import List, Optional
+
+from ncatbot.core.event import BaseMessageEvent
+from ..command_system.lexer.message_tokenizer import MessageTokenizer
+from ..command_system.lexer.tokenizer import ParsedCommand, Token, TokenType
+
+# 分词器和解析器都不保存解析状态，所有事件共用
+_tokenizer = MessageTokenizer()
+
+
+class ParseContext:
+    """单条消息的分词和解析结果，按需计算并缓存"""
+
+    __slots__ = ("message", "_segments", "_tokens", "_parsed")
+
+    def __init__(self, message):
+        self.message = message
+        self._segments: Optional[List[List[Token]]] = None
+        self._tokens: Optional[List[Token]] = None
+        self._parsed: Optional[ParsedCommand] = None
+
+    def _get_segments(self) -> List[List[Token]]:
+        if self._segments is None:
+            self._segments = _tokenizer.tokenize_segments(self.message)
+        return self._segments
+
+    @property
+    def head_tokens(self) -> List[Token]:
+        """首个消息段的 token（以 EOF 结尾），首段不是文本时只有 EOF"""
+        segments = self._get_segments()
+        head = segments[0] if segments else []
+        if head and head[0].type == TokenType.NON_TEXT_ELEMENT:
+            head = []
+        return head + [Token(TokenType.EOF, "", len(head))]
+
+    @property
+    def tokens(self) -> List[Token]:
+        """整条消息的 token 序列"""
+        if self._tokens is None:
+            self._tokens = _tokenizer.join_segments(self._get_segments())
+        return self._tokens
+
+    @property
+    def parsed(self) -> ParsedCommand:
+        """整条消息的解析结果（选项、命名参数和剩余元素）"""
+        if self._parsed is None:
+            self._parsed = _tokenizer.command_parser.parse(self.tokens)
+        return self._parsed
+
+
+def get_parse_context(event: BaseMessageEvent) -> ParseContext:
+    """获取事件的解析上下文，同一事件多次调用返回同一个对象"""
+    context = getattr(event, "_parse_context", None)
+    if context is None or context.message is not event.message:
+        context = ParseContext(event.message)
+        event._parse_context = context
+    return context
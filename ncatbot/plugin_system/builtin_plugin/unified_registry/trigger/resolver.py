@@ -4,12 +4,16 @@
 - 从注册器构建命令索引
 - 严格冲突检测（默认禁止前缀重叠）
 - 基于 token 的命令匹配（首段文本 tokens）
+
+索引是一棵以"前缀 + 首个命令词"为根、后续命令词为子节点的前缀树,
+非命令消息只需一次首词哈希查找即可排除.
 """
 
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
-from typing import Dict, List, Union, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Union, Tuple
 
 from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.utils.specs import (
     CommandSpec,
@@ -19,6 +23,8 @@ from ..command_system.lexer.tokenizer import Token, TokenType
 
 LOG = get_log(__name__)
 
+_FIRST_WORD = re.compile(r"\s*(\S+)")
+
 
 @dataclass
 class CommandEntry:
@@ -26,6 +32,32 @@ class CommandEntry:
     command: CommandSpec
 
 
+class _TrieNode:
+    __slots__ = ("children", "entry", "prefix", "candidates")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.entry: Optional[CommandEntry] = None
+        self.prefix: str = ""
+        # 落在同一节点上的 (前缀, 条目)，entry/prefix 是其中生效的一个
+        self.candidates: List[Tuple[str, CommandEntry]] = []
+
+    def select(self) -> None:
+        # 同一个键既可由带前缀又可由无前缀的路径得到时，无前缀的优先
+        self.entry, self.prefix = None, ""
+        for prefix, entry in self.candidates:
+            if self.entry is None or (prefix == "" and self.prefix != ""):
+                self.entry, self.prefix = entry, prefix
+
+
+class _PathNode:
+    __slots__ = ("children", "entry")
+
+    def __init__(self):
+        self.children: Dict[str, "_PathNode"] = {}
+        self.entry: Optional[CommandEntry] = None
+
+
 class CommandResolver:
     def __init__(
         self, *, case_sensitive: bool, prefixes: List[str], allow_hierarchical: bool
@@ -35,10 +67,19 @@ class CommandResolver:
         self.prefixes_tuple = tuple(prefix for prefix in prefixes)
         # 哈希索引：规范化路径字符串 → CommandEntry
         self._index: Dict[Tuple[str, ...], CommandEntry] = {}
+        # 前缀树：规范化的 "前缀 + 首个命令词" → 节点，后续命令词逐层向下
+        self._roots: Dict[str, _TrieNode] = {}
+        # 路径树：规范化路径逐词向下，用于 O(路径长度) 的冲突检测
+        self._paths = _PathNode()
+        # 插件名 → 该插件的规范化路径，按插件增量更新时只需处理这些路径
+        self._plugins: Dict[Optional[str], Set[Tuple[str, ...]]] = {}
 
     def clear(self):
         """清除索引"""
         self._index.clear()
+        self._roots.clear()
+        self._paths = _PathNode()
+        self._plugins.clear()
 
     def _normalize(self, s: str) -> str:
         return s if self.case_sensitive else s.lower()
@@ -46,39 +87,199 @@ class CommandResolver:
     def _path_to_norm(self, path: Tuple[str, ...]) -> Tuple[str, ...]:
         return tuple(self._normalize(p) for p in path)
 
+    def _desired_entries(
+        self,
+        commands: Dict[Tuple[str, ...], CommandSpec],
+        aliases: Dict[Tuple[str, ...], CommandSpec],
+    ) -> Dict[Tuple[str, ...], CommandSpec]:
+        desired: Dict[Tuple[str, ...], CommandSpec] = {}
+        for mapping in (commands, aliases):
+            for path, command in mapping.items():
+                norm_path = self._path_to_norm(path)
+                if norm_path in desired:
+                    raise ValueError(f"命令重复: {' '.join(norm_path)}")
+                desired[norm_path] = command
+        return desired
+
     def build_index(
         self,
         commands: Dict[Tuple[str, ...], CommandSpec],
         aliases: Dict[Tuple[str, ...], CommandSpec],
     ) -> None:
-        """构建索引并进行严格冲突检测。"""
-        entries: Dict[Tuple[str, ...], CommandEntry] = {}
+        """重新构建索引并进行严格冲突检测，失败时保留原索引。"""
+        desired = self._desired_entries(commands, aliases)
+        saved = (self._index, self._roots, self._paths, self._plugins)
+        self._index, self._roots, self._paths, self._plugins = {}, {}, _PathNode(), {}
+        try:
+            for norm_path, command in desired.items():
+                self.add(norm_path, command)
+        except ValueError:
+            self._index, self._roots, self._paths, self._plugins = saved
+            raise
+        LOG.debug(f"Resolver 索引构建完成: {len(self._index)}")
+
+    def sync(
+        self,
+        commands: Dict[Tuple[str, ...], CommandSpec],
+        aliases: Dict[Tuple[str, ...], CommandSpec],
+    ) -> Tuple[int, int]:
+        """按注册器当前内容增量更新索引，只增删有变化的路径。
+
+        失败时回滚到更新前的状态。
+
+        Returns:
+            (新增条目数, 删除条目数)
+        """
+        desired = self._desired_entries(commands, aliases)
+        return self._apply(desired, self._index)
 
-        def add_entry(path: Tuple[str, ...], command: CommandSpec):
+    def sync_plugin(
+        self,
+        plugin_name: Optional[str],
+        entries: Iterable[Tuple[Tuple[str, ...], CommandSpec]],
+    ) -> Tuple[int, int]:
+        """按一个插件当前的 (路径, 命令) 增量更新索引，只处理该插件的路径。
+
+        失败时回滚到更新前的状态。
+
+        Returns:
+            (新增条目数, 删除条目数)
+        """
+        desired: Dict[Tuple[str, ...], CommandSpec] = {}
+        for path, command in entries:
             norm_path = self._path_to_norm(path)
-            if norm_path in entries:
+            if norm_path in desired:
                 raise ValueError(f"命令重复: {' '.join(norm_path)}")
-            entries[norm_path] = CommandEntry(path_words=norm_path, command=command)
-
-        for path, command in commands.items():
-            add_entry(path, command)
-        for path, command in aliases.items():
-            add_entry(path, command)
-
-        # 严格：不允许任意两条路径存在前缀关系
-        paths = list(entries.keys())
-        for i in range(len(paths)):
-            for j in range(i + 1, len(paths)):
-                a, b = paths[i], paths[j]
-                min_len = min(len(a), len(b))
-                if a[:min_len] == b[:min_len] and a != b:
-                    if not self.allow_hierarchical:
-                        raise ValueError(
-                            f"命令前缀冲突: {' '.join(a)} vs {' '.join(b)}"
-                        )
-
-        self._index = entries
-        LOG.debug(f"Resolver 索引构建完成: {len(self._index)}")
+            desired[norm_path] = command
+        current = {
+            norm_path: self._index[norm_path]
+            for norm_path in self._plugins.get(plugin_name, ())
+        }
+        return self._apply(desired, current)
+
+    def _apply(
+        self,
+        desired: Dict[Tuple[str, ...], CommandSpec],
+        current: Dict[Tuple[str, ...], CommandEntry],
+    ) -> Tuple[int, int]:
+        """把 current 中的条目更新为 desired，冲突时回滚"""
+        removed = [
+            entry
+            for norm_path, entry in current.items()
+            if desired.get(norm_path) is not entry.command
+        ]
+        for entry in removed:
+            self.remove(entry.path_words)
+        added = []
+        try:
+            for norm_path, command in desired.items():
+                # 不属于 current 的同名路径也要经过冲突检测
+                entry = current.get(norm_path)
+                if entry is None or entry.command is not command:
+                    self.add(norm_path, command)
+                    added.append(norm_path)
+        except ValueError:
+            for norm_path in added:
+                self.remove(norm_path)
+            for entry in removed:
+                self.add(entry.path_words, entry.command)
+            raise
+        if added or removed:
+            LOG.debug(f"Resolver 索引更新: +{len(added)} -{len(removed)}")
+        return len(added), len(removed)
+
+    def add(self, path: Tuple[str, ...], command: CommandSpec) -> CommandEntry:
+        """添加一条命令路径，与已有路径重复或存在前缀关系时抛出 ValueError。"""
+        norm_path = self._path_to_norm(path)
+        self._check_conflict(norm_path)
+        entry = CommandEntry(path_words=norm_path, command=command)
+
+        node = self._paths
+        for word in norm_path:
+            node = node.children.setdefault(word, _PathNode())
+        node.entry = entry
+        self._index[norm_path] = entry
+        self._plugins.setdefault(command.plugin_name, set()).add(norm_path)
+
+        head, rest = norm_path[0], norm_path[1:]
+        for prefix in dict.fromkeys(command.prefixes or []):
+            trie_node = self._roots.setdefault(
+                self._normalize(prefix) + head, _TrieNode()
+            )
+            for word in rest:
+                trie_node = trie_node.children.setdefault(word, _TrieNode())
+            trie_node.candidates.append((prefix, entry))
+            trie_node.select()
+        return entry
+
+    def remove(self, path: Tuple[str, ...]) -> Optional[CommandEntry]:
+        """删除一条命令路径，返回被删除的条目。"""
+        norm_path = self._path_to_norm(path)
+        entry = self._index.pop(norm_path, None)
+        if entry is None:
+            return None
+        paths = self._plugins[entry.command.plugin_name]
+        paths.discard(norm_path)
+        if not paths:
+            del self._plugins[entry.command.plugin_name]
+
+        self._prune(
+            self._paths.children, norm_path, lambda node: setattr(node, "entry", None)
+        )
+
+        head, rest = norm_path[0], norm_path[1:]
+
+        def drop(node: _TrieNode):
+            node.candidates = [c for c in node.candidates if c[1] is not entry]
+            node.select()
+
+        for prefix in dict.fromkeys(entry.command.prefixes or []):
+            self._prune(self._roots, (self._normalize(prefix) + head,) + rest, drop)
+        return entry
+
+    @staticmethod
+    def _prune(children: dict, keys: Tuple[str, ...], update) -> None:
+        """沿 keys 找到节点并更新，然后自底向上删除空节点"""
+        trail = []
+        for key in keys:
+            node = children.get(key)
+            if node is None:
+                return
+            trail.append((children, key, node))
+            children = node.children
+        update(trail[-1][2])
+        for parent, key, node in reversed(trail):
+            if node.entry is not None or node.children:
+                break
+            del parent[key]
+
+    def _check_conflict(self, norm_path: Tuple[str, ...]) -> None:
+        node = self._paths
+        for depth, word in enumerate(norm_path):
+            node = node.children.get(word)
+            if node is None:
+                return
+            if (
+                node.entry is not None
+                and depth < len(norm_path) - 1
+                and not self.allow_hierarchical
+            ):
+                raise ValueError(
+                    f"命令前缀冲突: {' '.join(node.entry.path_words)} vs {' '.join(norm_path)}"
+                )
+        if node.entry is not None:
+            raise ValueError(f"命令重复: {' '.join(norm_path)}")
+        if node.children and not self.allow_hierarchical:
+            while node.entry is None:
+                node = next(iter(node.children.values()))
+            raise ValueError(
+                f"命令前缀冲突: {' '.join(norm_path)} vs {' '.join(node.entry.path_words)}"
+            )
+
+    def match_first_word(self, text: str) -> bool:
+        """首个单词是否可能是命令（前缀 + 首个命令词），用于快速排除普通消息。"""
+        m = _FIRST_WORD.match(text)
+        return m is not None and self._normalize(m.group(1)) in self._roots
 
     def resolve_from_tokens(
         self, tokens: List[Token]
@@ -87,31 +288,20 @@ class CommandResolver:
 
         策略：仅接收 TokenType.WORD/QUOTED_STRING 序列作为命令词；
         遇到第一个非上述类型 token 即停止命令词聚合。
-        在严格模式下，应当保证不会出现“多匹配”。
+        沿前缀树取最长匹配，返回命中的前缀和命令条目。
         """
-        words: List[str] = []
+        node = None
+        prefix, match = None, None
         for t in tokens:
-            if t.type in (TokenType.WORD, TokenType.QUOTED_STRING):
-                words.append(t.value)
-            else:
+            if t.type not in (TokenType.WORD, TokenType.QUOTED_STRING):
                 break
-
-        if not words:
-            return None, None
-        # 尝试从最长到最短匹配（兼容 allow_hierarchical=true 的场景）
-        for k in range(len(words), 0, -1):
-            candidate = tuple(self._normalize(w) for w in words[:k])
-            if candidate in self._index:
-                return "", self._index[candidate]
-
-        if words[0].startswith(self.prefixes_tuple):
-            prefix = words[0][0]
-            words[0] = words[0][1:]
-            for k in range(len(words), 0, -1):
-                candidate = tuple(self._normalize(w) for w in words[:k])
-                if candidate in self._index:
-                    return prefix, self._index[candidate]
-        return None, None
+            word = self._normalize(t.value)
+            node = self._roots.get(word) if node is None else node.children.get(word)
+            if node is None:
+                break
+            if node.entry is not None:
+                prefix, match = node.prefix, node.entry
+        return prefix, match
 
     def get_commands(self) -> List[CommandEntry]:
         """获取所有已注册的命令条目。"""
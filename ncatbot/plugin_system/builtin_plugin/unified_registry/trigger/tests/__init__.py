@@ -0,0 +1 @@
+"""触发器测试模块"""
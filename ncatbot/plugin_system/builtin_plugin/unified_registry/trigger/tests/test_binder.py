@@ -0,0 +1,86 @@
+"""参数绑定测试
+
+- 注册时生成绑定表, 选项、选项组、命名参数按表查找
+- 位置参数按预先确定的类型转换
+- 参数个数不符和未知选项报错
+"""
+
+import pytest
+
+from ncatbot.core.event import BaseMessageEvent
+from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.registry import (
+    option,
+    option_group,
+    param,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.registry.registry import (
+    CommandGroup,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.trigger.binder import (
+    ArgumentBinder,
+    InvalidOptionError,
+)
+from ncatbot.utils.testing import EventFactory
+
+
+def _deploy_spec():
+    root = CommandGroup("root", prefixes=["/"])
+
+    @root.command("deploy")
+    @option("v", "verbose")
+    @option("f")
+    @option_group(choices=["xml", "yaml"], name="fmt", default="xml")
+    @param("port", default=80)
+    async def deploy(
+        self,
+        event: BaseMessageEvent,
+        app: str,
+        replicas: int,
+        dry: bool = False,
+        verbose: bool = False,
+        f: bool = False,
+        fmt: str = "xml",
+        port: int = 80,
+    ):
+        pass
+
+    return root.commands["deploy"]
+
+
+def _bind(spec, text):
+    event = EventFactory.create_group_message(text)
+    return ArgumentBinder().bind(spec, event, ("deploy",), ["/"])
+
+
+class TestCompiledBinder:
+    """CompiledBinder 测试类"""
+
+    def test_tables(self):
+        """测试注册时生成的查找表和必需参数个数"""
+        binder = _deploy_spec().binder
+        assert binder.required_count == 2
+        assert binder.options["v"] == ("verbose", True)
+        assert binder.options["verbose"] == ("verbose", True)
+        assert binder.options["yaml"] == ("fmt", "yaml")
+        assert binder.params["port"][0] == "port"
+
+    def test_bind(self):
+        """测试位置参数转换、选项和命名参数绑定"""
+        result = _bind(_deploy_spec(), "/deploy web 3 false -vf --yaml --port=8080")
+        assert result.args == ("web", 3, False)
+        assert result.named_args == {
+            "verbose": True,
+            "f": True,
+            "fmt": "yaml",
+            "port": 8080,
+        }
+
+    def test_errors(self):
+        """测试参数不足、参数过多和未知选项"""
+        spec = _deploy_spec()
+        with pytest.raises(Exception, match="参数不足"):
+            _bind(spec, "/deploy web")
+        with pytest.raises(Exception, match="参数过多"):
+            _bind(spec, "/deploy " + " ".join(["1"] * 9))
+        with pytest.raises(InvalidOptionError):
+            _bind(spec, "/deploy web 1 -x")
@@ -0,0 +1,65 @@
+"""解析上下文测试
+
+- 同一事件只分词一次, 命令解析和参数绑定共用结果
+- 首段 token 只包含首个文本段
+"""
+
+from ncatbot.core.event import At, BaseMessageEvent, MessageArray, Text
+from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.lexer import (
+    TokenType,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.lexer.message_tokenizer import (
+    MessageTokenizer,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.registry.registry import (
+    CommandGroup,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.trigger.binder import (
+    ArgumentBinder,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.trigger.context import (
+    get_parse_context,
+)
+from ncatbot.utils.testing import EventFactory
+
+
+class TestParseContext:
+    """ParseContext 测试类"""
+
+    def test_tokenize_once(self, monkeypatch):
+        """测试命令解析、参数绑定和重复获取只分词一次"""
+        calls = []
+        original = MessageTokenizer.tokenize_segments
+
+        def counting(self, message_array):
+            calls.append(message_array)
+            return original(self, message_array)
+
+        monkeypatch.setattr(MessageTokenizer, "tokenize_segments", counting)
+
+        async def kick(self, event: BaseMessageEvent, user: At, reason: str = ""):
+            pass
+
+        root = CommandGroup("root", prefixes=["/"])
+        root.command("kick")(kick)
+        spec = root.commands["kick"]
+
+        event = EventFactory.create_group_message(
+            MessageArray(Text("/kick "), At("123"), Text(" 刷屏"))
+        )
+        context = get_parse_context(event)
+        head = [t.value for t in context.head_tokens]
+        assert head == ["/kick", ""]
+
+        result = ArgumentBinder().bind(spec, event, ("kick",), ["/"])
+        assert result.args[0].qq == "123" and result.args[1] == "刷屏"
+        assert get_parse_context(event) is context
+        assert context.parsed.elements[1].type == "at"
+        assert len(calls) == 1
+
+    def test_non_text_head(self):
+        """测试首段不是文本时首段 token 只有 EOF"""
+        event = EventFactory.create_group_message(MessageArray(At("1"), Text("/x")))
+        context = get_parse_context(event)
+        assert [t.type for t in context.head_tokens] == [TokenType.EOF]
+        assert [e.type for e in context.parsed.elements] == ["at", "text"]
@@ -0,0 +1,166 @@
+"""命令解析器测试
+
+- 首词快速排除非命令消息
+- 前缀树最长匹配, 返回命中的前缀
+- 未声明的前缀不会命中
+- 增量增删命令, 冲突时回滚
+- 按插件增量更新, 只处理该插件的路径
+"""
+
+import pytest
+
+from ncatbot.core.event import BaseMessageEvent
+from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.lexer import (
+    StringTokenizer,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.registry.registry import (
+    CommandGroup,
+)
+from ncatbot.plugin_system.builtin_plugin.unified_registry.trigger.resolver import (
+    CommandResolver,
+)
+
+
+def _handler():
+    async def handler(self, event: BaseMessageEvent, name: str = ""):
+        pass
+
+    return handler
+
+
+def _root() -> CommandGroup:
+    root = CommandGroup("root", prefixes=["/", "!"])
+    root.command("echo", aliases=["e"])(_handler())
+    root.command("Hello", prefixes=[""])(_handler())
+    root.group("admin").command("kick")(_handler())
+    return root
+
+
+_ROOT = _root()
+
+
+def _commands():
+    return _ROOT.get_all_commands()
+
+
+def _resolver() -> CommandResolver:
+    resolver = CommandResolver(
+        case_sensitive=False, prefixes=["/", "!"], allow_hierarchical=False
+    )
+    resolver.build_index(_ROOT.get_all_commands(), _ROOT.get_all_aliases())
+    return resolver
+
+
+def _resolve(resolver: CommandResolver, text: str):
+    return resolver.resolve_from_tokens(StringTokenizer(text).tokenize())
+
+
+class TestCommandResolver:
+    """CommandResolver 测试类"""
+
+    def test_first_word(self):
+        """测试首词查找只接受 前缀 + 首个命令词"""
+        resolver = _resolver()
+        assert resolver.match_first_word("/echo hi")
+        assert resolver.match_first_word("  !E hi")
+        assert resolver.match_first_word("hello")
+        assert resolver.match_first_word("/admin kick")
+        assert not resolver.match_first_word("echo hi")
+        assert not resolver.match_first_word("/hello")
+        assert not resolver.match_first_word("随便聊聊")
+        assert not resolver.match_first_word("")
+
+    def test_resolve(self):
+        """测试按路径匹配命令并返回前缀"""
+        resolver = _resolver()
+        prefix, entry = _resolve(resolver, "/admin kick 123 -v")
+        assert prefix == "/" and entry.path_words == ("admin", "kick")
+        prefix, entry = _resolve(resolver, "!e 你好")
+        assert prefix == "!" and entry.command.name == "echo"
+        prefix, entry = _resolve(resolver, "HELLO world")
+        assert prefix == "" and entry.command.name == "Hello"
+        assert _resolve(resolver, "/admin") == (None, None)
+        assert _resolve(resolver, "/admin ban") == (None, None)
+        assert _resolve(resolver, "-v /echo") == (None, None)
+
+    def test_sync(self):
+        """测试增量增删命令后解析结果与重建一致"""
+        root = CommandGroup("root", prefixes=["/"])
+        root.command("echo")(_handler())
+        resolver = CommandResolver(
+            case_sensitive=False, prefixes=["/"], allow_hierarchical=False
+        )
+        assert resolver.sync(root.get_all_commands(), {}) == (1, 0)
+
+        other = CommandGroup("other", prefixes=["/"])
+        other.group("admin").command("kick")(_handler())
+        commands = {**root.get_all_commands(), **other.get_all_commands()}
+        assert resolver.sync(commands, {}) == (1, 0)
+        assert _resolve(resolver, "/admin kick")[1].path_words == ("admin", "kick")
+
+        assert resolver.sync(root.get_all_commands(), {}) == (0, 1)
+        assert not resolver.match_first_word("/admin kick")
+        assert _resolve(resolver, "/echo")[1].command.name == "echo"
+
+    def test_conflict_rollback(self):
+        """测试重复和前缀冲突的命令被拒绝, 索引保持原样"""
+        resolver = _resolver()
+        before = {e.path_words for e in resolver.get_commands()}
+
+        conflict = CommandGroup("conflict", prefixes=["/"])
+        conflict.command("admin")(_handler())
+        commands = {**_commands(), **conflict.get_all_commands()}
+        with pytest.raises(ValueError, match="命令前缀冲突"):
+            resolver.sync(commands, {})
+        with pytest.raises(ValueError, match="命令重复"):
+            resolver.add(("ECHO",), next(iter(commands.values())))
+
+        assert {e.path_words for e in resolver.get_commands()} == before
+        assert _resolve(resolver, "/admin kick")[1].path_words == ("admin", "kick")
+
+    def test_sync_plugin(self):
+        """测试按插件增量更新, 其他插件的命令不受影响"""
+        root = CommandGroup("root", prefixes=["/"])
+        root.command("echo", aliases=["e"])(_handler())
+        root.command("ping", aliases=["p"])(_handler())
+        # 测试中的函数不在插件目录下, 手动指定所属插件
+        commands = root.get_all_commands()
+        commands[("echo",)].plugin_name = "A"
+        commands[("ping",)].plugin_name = "B"
+        entries = root.get_plugin_commands("ncatbot")
+        by_plugin = {
+            name: [(p, c) for p, c in entries if c.plugin_name == name]
+            for name in ("A", "B")
+        }
+        resolver = CommandResolver(
+            case_sensitive=False, prefixes=["/"], allow_hierarchical=False
+        )
+        assert resolver.sync_plugin("A", by_plugin["A"]) == (2, 0)
+        assert resolver.sync_plugin("B", by_plugin["B"]) == (2, 0)
+
+        assert resolver.sync_plugin("A", []) == (0, 2)
+        assert _resolve(resolver, "/echo") == (None, None)
+        assert _resolve(resolver, "/p")[1].command.name == "ping"
+
+        conflict = CommandGroup("conflict", prefixes=["/"])
+        conflict.command("ping")(_handler())
+        spec = conflict.get_all_commands()[("ping",)]
+        spec.plugin_name = "C"
+        with pytest.raises(ValueError, match="命令重复"):
+            resolver.sync_plugin("C", [(("ping",), spec)])
+        assert {e.path_words for e in resolver.get_commands()} == {("ping",), ("p",)}
+
+    def test_registry_plugin_changes(self):
+        """测试注册器按插件记录命令, 撤销插件时记为有变化"""
+        root = CommandGroup("root", prefixes=["/"])
+        root.group("admin").command("kick", aliases=["k"])(_handler())
+        assert root.pop_changed_plugins() == ["ncatbot"]
+        assert root.pop_changed_plugins() == []
+        assert [path for path, _ in root.get_plugin_commands("ncatbot")] == [
+            ("admin", "kick"),
+            ("k",),
+        ]
+
+        root.revoke_plugin("ncatbot")
+        assert root.pop_changed_plugins() == ["ncatbot"]
+        assert root.get_plugin_commands("ncatbot") == []
@@ -266,6 +266,40 @@ class PluginConfig(BaseConfig):
             os.makedirs(self.plugins_dir)
 
 
+@dataclass(frozen=False)
+class APIPolicyConfig(BaseConfig):
+    """API 调用的超时、重试和熔断策略。"""
+
+    enable: bool = True
+    """是否启用调用策略, 关闭后所有调用使用 Adapter 的默认超时且不重试"""
+    read_timeout: float = 20.0
+    """查询类接口(get_*)的总超时预算(秒), 包含重试"""
+    write_timeout: float = 120.0
+    """其它接口的超时(秒)"""
+    upload_timeout: float = 300.0
+    """上传和文件类接口的超时(秒)"""
+    read_retries: int = 2
+    """查询类接口失败后的最大重试次数, 发送等非幂等接口不重试"""
+    retry_backoff: float = 0.5
+    """首次重试前的等待时间(秒), 之后每次翻倍"""
+    retry_backoff_max: float = 5.0
+    """重试等待时间上限(秒)"""
+    breaker_window: int = 20
+    """熔断器统计最近多少次调用"""
+    breaker_min_calls: int = 10
+    """窗口内至少多少次调用才会触发熔断"""
+    breaker_failure_ratio: float = 0.5
+    """窗口内失败比例达到该值时熔断"""
+    breaker_open_seconds: float = 30.0
+    """熔断持续时间(秒), 之后放行一次试探调用"""
+    endpoints: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    """按接口覆盖 timeout / retries, 如 {"/get_group_member_list": {"timeout": 60}}"""
+
+    def asdict(self) -> Dict[str, Any]:
+        # 基类只保存整数等类型, 这里的浮点数和字典也需要保存
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
 @dataclass(frozen=False)
 class Config(BaseConfig):
     """NcatBot 配置类。"""
@@ -278,6 +312,10 @@ class Config(BaseConfig):
     plugin: PluginConfig = field(default_factory=PluginConfig)
     """插件配置"""
 
+    # API 调用策略
+    api: APIPolicyConfig = field(default_factory=APIPolicyConfig)
+    """API 调用的超时、重试和熔断策略"""
+
     # 需要保留的默认值
     _default_bt_uin: str = "123456"
     _default_root: str = "123456"
@@ -312,13 +350,14 @@ class Config(BaseConfig):
         """将实例转换为字典。"""
         napcat = self.napcat.asdict()
         plugin = self.plugin.asdict()
+        api = self.api.asdict()
         base = {
             k: v
             for k, v in self.__dict__.items()
             if isinstance(v, (str, int, bool, type(None), tuple, list))
             and not k.startswith("_")
         }
-        return {**base, "napcat": napcat, "plugin": plugin}
+        return {**base, "napcat": napcat, "plugin": plugin, "api": api}
 
     @classmethod
     def create_from_file(cls, path: str) -> "Config":
@@ -358,6 +397,7 @@ class Config(BaseConfig):
             config = cls(
                 napcat=NapCatConfig.from_dict(napcat_dict),
                 plugin=PluginConfig.from_dict(plugin_dict),
+                api=APIPolicyConfig.from_dict(conf_dict.get("api") or {}),
             )
 
             # 将其它设置直接应用于 Config 对象
@@ -460,6 +500,7 @@ class Config(BaseConfig):
 ATTRIBUTE_RECURSIVE = {
     "napcat": NapCatConfig,
     "plugin": PluginConfig,
+    "api": APIPolicyConfig,
 }
 
 # 处理未知字段时要忽略的属性
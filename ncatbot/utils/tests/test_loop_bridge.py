@@ -0,0 +1,91 @@
+"""LoopBridge 测试
+
+- 主循环运行时, 其它线程的调用提交到主循环
+- 主循环未运行时使用常驻的桥接循环
+- 同步 API 通过桥接执行
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from ncatbot.core.api import BotAPI
+from ncatbot.utils.testing import MockAPIAdapter
+from ncatbot.utils.thread_pool import LoopBridge
+
+
+async def _current_loop():
+    return asyncio.get_running_loop()
+
+
+async def _fail():
+    raise ValueError("boom")
+
+
+class TestLoopBridge:
+    """LoopBridge 测试类"""
+
+    def test_reuses_bridge_loop(self):
+        """测试没有主循环时, 多次调用复用同一个后台循环"""
+        bridge = LoopBridge()
+        first = bridge.run(_current_loop)
+        second = bridge.run(_current_loop)
+        assert first is second
+        assert first.is_running()
+
+    def test_submits_to_main_loop(self):
+        """测试主循环运行时, 其它线程中的调用在主循环执行"""
+        bridge = LoopBridge()
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            bridge.set_main_loop(loop)
+            result = await asyncio.to_thread(bridge.run, _current_loop)
+            return loop, result
+
+        loop, result = asyncio.run(main())
+        assert result is loop
+
+    def test_call_on_main_loop_thread(self):
+        """测试在主循环线程中同步调用不会死锁"""
+        bridge = LoopBridge()
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            bridge.set_main_loop(loop)
+            return loop, bridge.run(_current_loop)
+
+        loop, result = asyncio.run(main())
+        assert result is not loop
+
+    def test_call_on_bridge_loop(self):
+        """测试在桥接循环中嵌套同步调用不会死锁"""
+        bridge = LoopBridge()
+
+        async def nested():
+            return bridge.run(_current_loop)
+
+        assert bridge.run(nested) is not bridge.run(_current_loop)
+
+    def test_exception_propagates(self):
+        """测试协程异常传递给调用方"""
+        with pytest.raises(ValueError):
+            LoopBridge().run(_fail)
+
+    def test_sync_api(self):
+        """测试同步 API 在多个线程中并发调用"""
+        adapter = MockAPIAdapter()
+        api = BotAPI(adapter.mock_callback)
+        results = []
+
+        def worker():
+            results.append(api.send_group_text_sync(123456789, "hi"))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(set(results)) == 8
+        assert adapter.get_call_count("/send_group_msg") == 8
@@ -3,7 +3,7 @@ import queue
 import time
 import os
 from concurrent.futures import Future
-from typing import Callable, Any, Dict, TypeVar, Coroutine, List
+from typing import Callable, Any, Dict, TypeVar, Coroutine, List, Optional
 import inspect
 import asyncio
 import traceback
@@ -39,7 +39,68 @@ def run_coroutine(func: Callable[..., Coroutine[Any, Any, T]], *args, **kwargs):
     if not inspect.iscoroutinefunction(func):
         return func(*args, **kwargs)
 
-    result: List[T] = []
+    return _run_in_new_thread(func, *args, **kwargs)
+
+
+class LoopBridge:
+    """同步代码调用协程的桥接器, 供各 `*_sync` 接口使用
+
+    - 在其它线程(如同步事件处理器所在的线程池)中调用时, 协程通过
+      run_coroutine_threadsafe 提交到 Bot 主事件循环执行, 与 WebSocket 处于同一循环
+    - 主循环未运行(启动前、测试环境)或在主循环线程中调用时, 提交到一个常驻的
+      后台桥接循环执行
+
+    相比 run_coroutine, 不再为每次调用创建新的线程和事件循环.
+    """
+
+    def __init__(self):
+        self._main_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._bridge_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def set_main_loop(self, loop: Optional[asyncio.AbstractEventLoop]):
+        """设置 Bot 主事件循环, 传入 None 取消设置"""
+        self._main_loop = loop
+
+    def _get_bridge_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._bridge_loop is None or self._bridge_loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="ncatbot-loop-bridge", daemon=True
+                )
+                thread.start()
+                self._bridge_loop = loop
+            return self._bridge_loop
+
+    def _target_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """选择执行协程的事件循环, 返回 None 表示当前线程无法安全地阻塞等待"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        main = self._main_loop
+        if main is not None and main.is_running() and running is not main:
+            return main
+        bridge = self._get_bridge_loop()
+        if running is bridge:
+            # 在桥接循环中同步等待自己会死锁
+            return None
+        return bridge
+
+    def run(self, func: Callable[..., Coroutine[Any, Any, T]], *args, **kwargs) -> T:
+        """同步执行协程函数并返回结果"""
+        if not inspect.iscoroutinefunction(func):
+            return func(*args, **kwargs)
+        loop = self._target_loop()
+        if loop is None:
+            return _run_in_new_thread(func, *args, **kwargs)
+        future = asyncio.run_coroutine_threadsafe(func(*args, **kwargs), loop)
+        return future.result()
+
+
+def _run_in_new_thread(func, *args, **kwargs):
+    result: List[Any] = []
 
     def runner():
         try:
@@ -55,6 +116,9 @@ def run_coroutine(func: Callable[..., Coroutine[Any, Any, T]], *args, **kwargs):
     return result[0]
 
 
+loop_bridge = LoopBridge()
+
+
 class ThreadPool:
     """
     线程池实现类，支持提交同步和异步任务，并对相同函数的任务进行并发限制